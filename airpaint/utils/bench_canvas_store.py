@@ -0,0 +1,111 @@
+"""
+Benchmark: canvas em memória vs. canvas num ficheiro mapeado (CanvasStore).
+
+Uso:
+    python bench_canvas_store.py [--width 1280] [--height 720] [--frames 3000] [--interval 2.0]
+                                 [--path canvas_bench.map]
+
+Simula uma mão a desenhar com o pincel (um segmento por frame, como no bench_drawing.py)
+a 30 fps de relógio simulado, com o canvas:
+- em memória (np.zeros, como sem CANVAS_MMAP_PATH)
+- num ficheiro mapeado, com tick() em todos os frames e flush das linhas alteradas
+  no máximo a cada 'interval' segundos
+Mostra o tempo médio por frame (desenho + tick), o custo de cada flush e o tempo de
+recuperação do canvas a partir do ficheiro, e confirma que o canvas recuperado é igual.
+"""
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+
+import config as cfg
+import drawing
+from canvas_store import CanvasStore
+from compositor import Compositor
+
+
+def path(w, h, frames, speed=25):
+    """
+    Pontos de uma espiral percorrida a 'speed' px por frame.
+    """
+    cx, cy = w // 2, h // 2
+    points = []
+    angle = 0.0
+    for i in range(frames):
+        radius = 40 + (min(w, h) // 2 - 60) * (i % 600) / 600
+        angle += speed / radius
+        points.append((int(cx + radius * math.cos(angle)), int(cy + radius * math.sin(angle))))
+    return points
+
+
+def run(points, h, w, store, fps=30.0):
+    """
+    Desenha todos os pontos (um por frame) e devolve (ms por frame, ms por flush).
+    """
+    cfg.canvas_store = store
+    cfg.canvas = store.canvas if store is not None else np.zeros((h, w, 3), np.uint8)
+    cfg.compositor = Compositor(h, w)
+    cfg.last_point.clear()
+
+    # Relógio simulado (frame / fps) em vez de time.monotonic()
+    if store is not None:
+        store.last_flush = 0.0
+
+    flush_ms = 0.0
+    start = time.perf_counter()
+    for i, (x, y) in enumerate(points):
+        drawing.draw_brush(x, y)
+        if i % 60 == 59:
+            drawing.end_stroke()
+        if store is not None:
+            flushes = store.flushes
+            t = time.perf_counter()
+            store.tick(i / fps)
+            if store.flushes != flushes:
+                flush_ms += (time.perf_counter() - t) * 1000
+    elapsed = (time.perf_counter() - start) * 1000
+    drawing.end_stroke()
+
+    flushes = store.flushes if store is not None else 0
+    return elapsed / len(points), flush_ms / flushes if flushes else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--interval", type=float, default=2.0, help="segundos entre flushes")
+    parser.add_argument("--path", default="canvas_bench.map", help="ficheiro do canvas mapeado")
+    args = parser.parse_args()
+
+    w, h = args.width, args.height
+    points = path(w, h, args.frames)
+    if os.path.exists(args.path):
+        os.remove(args.path)
+
+    print(f"[bench_canvas_store] {w}x{h}, {args.frames} frames, flush a cada {args.interval} s")
+
+    memory_ms, _ = run(points, h, w, None)
+    print(f"  memória:        {memory_ms:7.4f} ms/frame")
+
+    store = CanvasStore(args.path, h, w, args.interval)
+    mapped_ms, flush_ms = run(points, h, w, store)
+    print(f"  ficheiro (mmap): {mapped_ms:7.4f} ms/frame  ({store.flushes} flushes, {flush_ms:.2f} ms/flush)")
+    store.close()
+    drawn = cfg.canvas.copy()
+
+    start = time.perf_counter()
+    restored = CanvasStore(args.path, h, w, args.interval)
+    restore_ms = (time.perf_counter() - start) * 1000
+    same = restored.restored and np.array_equal(restored.canvas, drawn)
+    print(f"  recuperação:    {restore_ms:7.2f} ms  (canvas igual: {same})")
+    restored.close()
+
+    os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
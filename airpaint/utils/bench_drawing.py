@@ -0,0 +1,87 @@
+"""
+Benchmark: pincel/spray antigos (um cv2.circle por chamada em Python) vs. motor de traços.
+
+Uso:
+    python bench_drawing.py [--width 1280] [--height 720] [--frames 2000] [--speed 60]
+
+Simula uma mão a desenhar um círculo grande, deslocando-se 'speed' px por frame:
+- brush: um círculo por frame (antigo) vs. segmento contínuo desde o ponto anterior
+- spray: 20 chamadas a np.random.randint + cv2.circle (antigo) vs. pontos em bloco (NumPy)
+Mostra o tempo médio por chamada e os pixels pintados (o pincel antigo deixa falhas).
+O tempo do motor novo inclui o registo no histórico de undo e no compositor; o spray
+novo desenha mais pontos quando a mão se desloca mais do que o alcance do spray.
+"""
+import argparse
+import math
+import time
+
+import cv2
+import numpy as np
+
+import config as cfg
+import drawing
+
+
+def legacy_brush(x, y):
+    cv2.circle(cfg.canvas, (x, y), cfg.thickness, cfg.current_color, -1)
+
+
+def legacy_spray(x, y):
+    for i in range(20):
+        dx = np.random.randint(-20, 20)
+        dy = np.random.randint(-20, 20)
+        cv2.circle(cfg.canvas, (x + dx, y + dy), 2, cfg.current_color, -1)
+
+
+def path(w, h, frames, speed):
+    """
+    Pontos de uma trajetória circular percorrida a 'speed' px por frame.
+    """
+    cx, cy = w // 2, h // 2
+    radius = min(w, h) // 3
+    step = speed / radius
+    return [
+        (int(cx + radius * math.cos(i * step)), int(cy + radius * math.sin(i * step)))
+        for i in range(frames)
+    ]
+
+
+def run(fn, points, stroke):
+    """
+    Desenha todos os pontos com 'fn' num canvas limpo e devolve (ms por chamada, pixels pintados).
+    """
+    cfg.canvas[:] = 0
+    drawing.end_stroke()
+    start = time.perf_counter()
+    for x, y in points:
+        fn(x, y)
+    elapsed = time.perf_counter() - start
+    if stroke:
+        drawing.end_stroke()
+    return elapsed * 1000 / len(points), int(cfg.canvas.any(axis=2).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--speed", type=float, default=60)
+    args = parser.parse_args()
+
+    drawing.ensure_canvas(args.height, args.width)
+    points = path(args.width, args.height, args.frames, args.speed)
+
+    print(f"[bench_drawing] {args.width}x{args.height}, {args.frames} frames, {args.speed} px/frame")
+    for name, old, new in (
+        ("brush", legacy_brush, drawing.draw_brush),
+        ("spray", legacy_spray, drawing.spray_at),
+    ):
+        old_ms, old_px = run(old, points, False)
+        new_ms, new_px = run(new, points, True)
+        print(f"  {name}: antigo {old_ms * 1000:7.1f} us ({old_px} px)  "
+              f"novo {new_ms * 1000:7.1f} us ({new_px} px)")
+
+
+if __name__ == "__main__":
+    main()
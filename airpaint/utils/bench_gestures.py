@@ -0,0 +1,151 @@
+"""
+Benchmark: predicados de gestos antigos (landmark a landmark) vs. HandFeatures.
+
+Uso:
+    python bench_gestures.py [--hands 2000] [--repeat 20]
+
+Gera mãos sintéticas (21 landmarks com .x/.y/.z) e, para cada uma, avalia os gestos
+que o painter.py usa num frame com as duas mãos visíveis:
+- antigo: one_finger, pinch, three_fingers, two_fingers, is_fist e four_fingers/pinch,
+  cada um a percorrer outra vez os landmarks (fingers_up recalculado 4x por mão)
+- novo: hand_features() uma vez por mão e os mesmos predicados como leituras
+Confirma que ambos dão os mesmos resultados e mostra o tempo médio por frame, com
+landmarks leves (namedtuple, como no replay de um trace) e com landmarks que imitam
+os do MediaPipe (cada lm[i] cria um objeto novo, como os campos repetidos do protobuf).
+"""
+import argparse
+import math
+import random
+import time
+
+from results import Landmark
+import gestures
+
+
+# ============================
+# Réplica dos predicados antigos
+# ============================
+
+def legacy_fingers_up(lm):
+    count = 0
+    for tip in [8, 12, 16, 20]:
+        if lm[tip].y < lm[tip - 2].y:
+            count += 1
+    return count
+
+
+def legacy_pinch(lm):
+    return math.dist([lm[4].x, lm[4].y], [lm[8].x, lm[8].y]) < 0.045
+
+
+def legacy_is_fist(lm):
+    closed = 0
+    for tip in [8, 12, 16, 20]:
+        if lm[tip].y > lm[tip - 2].y:
+            closed += 1
+    return closed >= 3
+
+
+def legacy_frame(left, right):
+    return (
+        legacy_fingers_up(left) == 1,
+        legacy_pinch(left),
+        legacy_fingers_up(left) == 3,
+        legacy_fingers_up(left) == 2,
+        legacy_is_fist(left),
+        legacy_fingers_up(right) == 4,
+        legacy_pinch(right),
+    )
+
+
+def new_frame(left, right):
+    left = gestures.hand_features(left)
+    right = gestures.hand_features(right)
+    return (
+        gestures.one_finger(left),
+        gestures.pinch(left),
+        gestures.three_fingers(left),
+        gestures.two_fingers(left),
+        gestures.is_fist(left),
+        gestures.four_fingers(right),
+        gestures.pinch(right),
+    )
+
+
+class _ProtoLandmark:
+    """
+    Imita um landmark do protobuf: x/y/z lidos através de propriedades.
+    """
+
+    __slots__ = ("_p",)
+
+    def __init__(self, p):
+        self._p = p
+
+    @property
+    def x(self):
+        return self._p[0]
+
+    @property
+    def y(self):
+        return self._p[1]
+
+    @property
+    def z(self):
+        return self._p[2]
+
+
+class ProtoLikeHand:
+    """
+    Imita o landmark (campo repetido) do MediaPipe: cada acesso lm[i] cria um objeto novo.
+    """
+
+    def __init__(self, points):
+        self._points = [tuple(p) for p in points]
+
+    def __getitem__(self, i):
+        return _ProtoLandmark(self._points[i])
+
+    def __len__(self):
+        return len(self._points)
+
+
+def random_hand(rng):
+    """
+    Mão sintética: pontos perto uns dos outros, para haver pinças e dedos levantados/fechados.
+    """
+    cx, cy = rng.random(), rng.random()
+    return [Landmark(cx + rng.gauss(0, 0.05), cy + rng.gauss(0, 0.05), rng.gauss(0, 0.02)) for _ in range(21)]
+
+
+def run(step, hands, repeat):
+    """
+    Devolve (tempo médio por frame em us, resultados do último passe).
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = [step(left, right) for left, right in hands]
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(hands)) * 1e6, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hands", type=int, default=2000, help="nº de pares de mãos (frames)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    hands = [(random_hand(rng), random_hand(rng)) for _ in range(args.hands)]
+    proto_hands = [(ProtoLikeHand(left), ProtoLikeHand(right)) for left, right in hands]
+
+    print(f"[bench_gestures] {args.hands} frames x {args.repeat}")
+    for name, data in (("namedtuple", hands), ("protobuf", proto_hands)):
+        old_us, old = run(legacy_frame, data, args.repeat)
+        new_us, new = run(new_frame, data, args.repeat)
+        print(f"  {name}: antigo {old_us:6.2f} us/frame  novo {new_us:6.2f} us/frame  "
+              f"(x{old_us / new_us:.2f}, resultados iguais: {old == new})")
+
+
+if __name__ == "__main__":
+    main()
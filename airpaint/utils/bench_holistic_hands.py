@@ -0,0 +1,76 @@
+"""
+Verificação: lados das mãos do backend Holistic vs. MediaPipe Hands, num vídeo gravado.
+
+Uso:
+    python bench_holistic_hands.py clip.mp4 [--frames 300] [--tolerance 0.05]
+
+Os frames são espelhados como no main.py e cada frame passa por detect_hands (hands.py)
+e por detect_holistic (holistic.py). Para cada frame em que os dois veem uma mão, compara
+a ponta do indicador (landmark 8) dessa mão com a mão do mesmo lado e com a do lado oposto
+do outro backend:
+- "iguais": o mesmo lado está à distância <= --tolerance (fração da largura)
+- "trocadas": só o lado oposto está perto (a mão de desenho e a das ferramentas trocariam)
+"""
+import argparse
+import math
+
+import cv2
+
+from frame_context import FrameContext
+from hands import HandState, detect_hands
+from holistic import HolisticState, detect_holistic
+
+
+def tip(lm):
+    return (lm[8].x, lm[8].y) if lm else None
+
+
+def near(a, b, tolerance):
+    return a is not None and b is not None and math.dist(a, b) <= tolerance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("clip", help="vídeo gravado (não espelhado, como vem da câmara)")
+    parser.add_argument("--frames", type=int, default=300, help="máximo de frames")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="distância máxima entre pontas")
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.clip)
+    hand_state = HandState()
+    holistic_state = HolisticState()
+    counts = {"iguais": 0, "trocadas": 0, "outras": 0}
+    frames = 0
+    while frames < args.frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames += 1
+        ctx = FrameContext(cv2.flip(frame, 1))
+
+        _, hands_left, hands_right, _, _, _, _ = detect_hands(ctx, hand_state)
+        _, (_, holistic_left, holistic_right, _, _, _, _), _ = detect_holistic(ctx, holistic_state)
+
+        for mine, same, other in (
+            (tip(hands_left), tip(holistic_left), tip(holistic_right)),
+            (tip(hands_right), tip(holistic_right), tip(holistic_left)),
+        ):
+            if mine is None or (same is None and other is None):
+                continue
+            if near(mine, same, args.tolerance):
+                counts["iguais"] += 1
+            elif near(mine, other, args.tolerance):
+                counts["trocadas"] += 1
+            else:
+                counts["outras"] += 1
+    cap.release()
+    hand_state.close()
+    holistic_state.close()
+
+    print(f"[bench_holistic_hands] {args.clip} ({frames} frames)")
+    for name, count in counts.items():
+        print(f"  {name:9s} {count}")
+
+
+if __name__ == "__main__":
+    main()
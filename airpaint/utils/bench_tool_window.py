@@ -0,0 +1,80 @@
+"""
+Benchmark: tempo de arranque do ToolWindow.
+
+Uso:
+    python bench_tool_window.py [--runs 3]
+
+Compara:
+- sequencial: todos os PNGs lidos um a um com cv2.imread (como antes), sem cache
+- frio: ToolWindow sem cache em disco (PNGs descodificados em paralelo e cache criado)
+- quente: ToolWindow com o cache já criado (ficheiros .npy mapeados em memória)
+Para os dois últimos mostra o tempo até ao construtor terminar (ferramenta ativa pronta)
+e até todas as ferramentas estarem carregadas (load_all, as outras só são carregadas
+quando forem pedidas).
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import cv2
+
+from tool_window import ToolWindow
+
+
+def sequential(tw):
+    """
+    Carregamento antigo: todas as pastas, um PNG de cada vez, na thread principal.
+    """
+    for folder in ToolWindow.FOLDERS.values():
+        path = os.path.join(tw.base_path, folder)
+        frames = [cv2.imread(p, cv2.IMREAD_UNCHANGED) for p in tw._frame_paths(path)]
+        tw._prepare_frames([f for f in frames if f is not None])
+
+
+def timed_window(cache_dir):
+    """
+    Cria um ToolWindow e devolve (ms até estar pronto, ms até tudo carregado).
+    """
+    start = time.perf_counter()
+    tw = ToolWindow(cache_dir=cache_dir)
+    ready = time.perf_counter() - start
+    tw.load_all()
+    total = time.perf_counter() - start
+    return ready * 1000, total * 1000, tw
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {"sequencial": [], "frio": [], "quente": []}
+    for _ in range(args.runs):
+        cache_dir = tempfile.mkdtemp(prefix="toolwindow-cache-")
+        try:
+            ready, total, tw = timed_window(cache_dir)
+            results["frio"].append((ready, total))
+            tw.close()
+
+            ready, total, warm = timed_window(cache_dir)
+            results["quente"].append((ready, total))
+            warm.close()
+
+            start = time.perf_counter()
+            sequential(tw)
+            seq = (time.perf_counter() - start) * 1000
+            results["sequencial"].append((seq, seq))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"[bench_tool_window] melhor de {args.runs} execuções")
+    for name, values in results.items():
+        ready = min(v[0] for v in values)
+        total = min(v[1] for v in values)
+        print(f"  {name:10s} pronto {ready:8.1f} ms   tudo carregado {total:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: YOLO com duas inferências por frame vs. uma inferência partilhada.
+
+Uso:
+    python bench_yolo.py clip1.mp4 [clip2.mp4 ...] [--frames 300] [--interval 10]
+
+Para cada vídeo gravado:
+- "legacy": corre o modelo duas vezes por frame (uma para o livro e outra para a lata),
+  tal como o detect_book/detect_can antigos faziam.
+- "shared": corre detector.detect(frame) uma vez e usa detect_book/detect_can como vistas.
+- "adaptive": igual a "shared", mas com o YOLO a cada --interval frames (ou quando a cena
+  muda) e tracking por optical flow entre execuções.
+Mostra os frames por segundo de cada modo, o ganho e quantas vezes o YOLO correu.
+"""
+import argparse
+import time
+
+import cv2
+
+from yolo_detector import model, detector, detect_book, detect_can, BOOK_CLASS, CAN_CLASSES
+
+
+def legacy_detect(frame, classes, min_ratio, min_w, min_h):
+    """
+    Réplica do caminho antigo: uma inferência completa por objeto procurado.
+    """
+    xyxy, cls, _ = model.predict(frame, 0.25, None)
+    for (x1, y1, x2, y2), c in zip(xyxy, cls):
+        if int(c) not in classes:
+            continue
+        w = x2 - x1
+        h = y2 - y1
+        if h / w < min_ratio:
+            continue
+        if w < min_w or h < min_h:
+            continue
+        return True
+    return False
+
+
+def read_frames(path, limit):
+    """
+    Lê até 'limit' frames do vídeo para memória (para não medir o decode).
+    """
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    return frames
+
+
+def run(frames, step):
+    """
+    Corre 'step' em todos os frames e devolve (fps, nº de livros, nº de latas).
+    """
+    books = cans = 0
+    start = time.perf_counter()
+    for frame in frames:
+        book, can = step(frame)
+        books += book
+        cans += can
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, books, cans
+
+
+def legacy_step(frame):
+    return (
+        legacy_detect(frame, BOOK_CLASS, 1.1, 60, 90),
+        legacy_detect(frame, CAN_CLASSES, 1.3, 30, 60),
+    )
+
+
+def shared_step(frame):
+    detector.detect(frame)
+    return detect_book(frame), detect_can(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("clips", nargs="+", help="vídeos gravados a usar no benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="máximo de frames por vídeo")
+    parser.add_argument("--interval", type=int, default=10, help="intervalo do modo adaptive")
+    args = parser.parse_args()
+
+    for path in args.clips:
+        frames = read_frames(path, args.frames)
+        if not frames:
+            print(f"[bench_yolo] {path}: sem frames")
+            continue
+
+        # Aquecimento (primeira inferência inclui inicialização do modelo)
+        model.predict(frames[0], 0.25)
+
+        legacy_fps, lb, lc = run(frames, legacy_step)
+
+        detector.interval = 1
+        shared_fps, sb, sc = run(frames, shared_step)
+
+        detector.interval = args.interval
+        runs_before = detector.runs
+        adaptive_fps, ab, ac = run(frames, shared_step)
+        adaptive_runs = detector.runs - runs_before
+
+        print(f"[bench_yolo] {path} ({len(frames)} frames)")
+        print(f"  legacy:   {legacy_fps:6.2f} fps  (livro={lb}, lata={lc})")
+        print(f"  shared:   {shared_fps:6.2f} fps  (livro={sb}, lata={sc})")
+        print(f"  adaptive: {adaptive_fps:6.2f} fps  (livro={ab}, lata={ac}, yolo={adaptive_runs})")
+        print(f"  ganho:    x{shared_fps / legacy_fps:.2f} (shared), x{adaptive_fps / legacy_fps:.2f} (adaptive)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: backends do YOLO (Ultralytics/PyTorch, ONNX Runtime, OpenCV DNN) nos mesmos frames.
+
+Uso:
+    python bench_yolo_backends.py clip.mp4 [--frames 200] [--imgsz 320] [--int8]
+                                  [--backends ultralytics onnxruntime opencv]
+
+Para cada backend (ver yolo_backends.py):
+- mede o tempo de import + carregamento do modelo (exporta o ONNX se ainda não existir)
+- corre predict() com as classes da aplicação (livro e lata) em todos os frames
+Mostra a latência p50/p95 por inferência, o FPS e quantos frames têm livro/lata
+depois dos filtros das regras, para comparar a qualidade com o backend Ultralytics.
+Todos os backends usam a mesma entrada --imgsz (comparação com o mesmo tamanho de imagem).
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from yolo_backends import make_backend
+
+# Classes e filtros de yolo_detector.py (sem o importar, para não carregar o modelo)
+RULES = {
+    "book": ([73], 1.1, 60, 90),
+    "can": ([39, 41], 1.3, 30, 60),
+}
+CLASSES = sorted({c for classes, _, _, _ in RULES.values() for c in classes})
+
+
+def read_frames(path, limit):
+    """
+    Lê até 'limit' frames do vídeo para memória (para não medir o decode).
+    """
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    return frames
+
+
+def found(xyxy, cls, rule):
+    """
+    True se alguma box passar os filtros da regra (como ObjectDetector._infer).
+    """
+    classes, min_ratio, min_w, min_h = rule
+    for (x1, y1, x2, y2), c in zip(xyxy.tolist(), cls.tolist()):
+        w, h = x2 - x1, y2 - y1
+        if c in classes and w > 0 and h / w >= min_ratio and w >= min_w and h >= min_h:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("clip", help="vídeo gravado a usar no benchmark")
+    parser.add_argument("--frames", type=int, default=200, help="máximo de frames")
+    parser.add_argument("--imgsz", type=int, default=320, help="tamanho de entrada de todos os backends")
+    parser.add_argument("--int8", action="store_true", help="modelo ONNX quantizado (onnxruntime)")
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--backends", nargs="+", default=["ultralytics", "onnxruntime", "opencv"])
+    args = parser.parse_args()
+
+    frames = read_frames(args.clip, args.frames)
+    if not frames:
+        print(f"[bench_yolo_backends] {args.clip}: sem frames")
+        return
+
+    print(f"[bench_yolo_backends] {args.clip} ({len(frames)} frames, imgsz={args.imgsz}, int8={args.int8})")
+    for name in args.backends:
+        start = time.perf_counter()
+        try:
+            # int8 só se aplica ao onnxruntime (make_backend recusa opencv + int8)
+            backend = make_backend(name, args.weights, args.imgsz, args.int8 and name == "onnxruntime")
+        except ImportError as e:
+            print(f"  {name:12s} indisponível ({e})")
+            continue
+        load_ms = (time.perf_counter() - start) * 1000
+
+        # Aquecimento (a primeira inferência inclui inicializações)
+        backend.predict(frames[0], 0.25, CLASSES)
+
+        times = []
+        counts = {rule: 0 for rule in RULES}
+        for frame in frames:
+            start = time.perf_counter()
+            xyxy, cls, _ = backend.predict(frame, 0.25, CLASSES)
+            times.append((time.perf_counter() - start) * 1000)
+            for rule_name, rule in RULES.items():
+                counts[rule_name] += found(xyxy, cls, rule)
+
+        p50, p95 = np.percentile(times, [50, 95])
+        print(f"  {name:12s} carregar {load_ms:7.0f} ms  p50 {p50:6.1f} ms  p95 {p95:6.1f} ms  "
+              f"{1000 / np.mean(times):6.1f} fps  (livro={counts['book']}, lata={counts['can']})")
+
+
+if __name__ == "__main__":
+    main()
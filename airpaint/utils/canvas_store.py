@@ -0,0 +1,118 @@
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+# ============================
+# Canvas num ficheiro mapeado em memória (autosave / recuperação)
+# ============================
+# O canvas é um array NumPy sobre um mmap do ficheiro: desenhar escreve diretamente
+# nas páginas do ficheiro (sem cópias), e o sistema operativo mantém-nas mesmo que o
+# processo morra. flush() (msync) só é preciso para sobreviver a uma falha da máquina,
+# por isso é feito no máximo a cada 'interval' segundos e só das linhas alteradas.
+#
+# Formato do ficheiro:
+# - cabeçalho (HEADER_SIZE bytes): magic, versão, altura, largura, canais
+# - canvas BGR uint8 (h * w * 3 bytes), linha a linha
+
+MAGIC = b"AIRPAINT"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIII")
+
+# Cabeçalho ocupa uma página inteira, para o canvas começar alinhado (flush por páginas)
+HEADER_SIZE = mmap.ALLOCATIONGRANULARITY
+
+
+class CanvasStore:
+    """
+    Canvas BGR guardado num ficheiro mapeado em memória.
+
+    - canvas: np.ndarray (h, w, 3) uint8 sobre o ficheiro (usado como cfg.canvas)
+    - restored: True se o conteúdo veio de um ficheiro já existente (sessão anterior)
+    - mark_dirty(y1, y2): indica as linhas alteradas (chamado por drawing.py)
+    - tick(now=None): flush das linhas alteradas, no máximo a cada 'interval' segundos
+    - close(): flush final e fecha o ficheiro
+    """
+
+    def __init__(self, path, h, w, interval=2.0):
+        """
+        Parâmetros:
+        - path: ficheiro do canvas (criado se não existir ou se tiver outras dimensões)
+        - h, w: dimensões do canvas
+        - interval: segundos mínimos entre flushes
+        """
+        self.path = path
+        self.interval = interval
+        self.row_bytes = w * 3
+        size = HEADER_SIZE + h * self.row_bytes
+
+        self.restored = self._valid(path, h, w, size)
+        if not self.restored:
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, h, w, 3))
+                f.truncate(size)
+
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.canvas = np.ndarray((h, w, 3), np.uint8, buffer=self.map, offset=HEADER_SIZE)
+
+        # Linhas alteradas desde o último flush: [dirty_y1, dirty_y2)
+        self.dirty_y1 = h
+        self.dirty_y2 = 0
+        self.h = h
+
+        self.last_flush = time.monotonic()
+        self.flushes = 0
+
+    @staticmethod
+    def _valid(path, h, w, size):
+        """
+        True se o ficheiro existir com o cabeçalho certo e as mesmas dimensões.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            return False
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        return header == _HEADER.pack(MAGIC, VERSION, h, w, 3)
+
+    def mark_dirty(self, y1, y2):
+        if y1 < self.dirty_y1:
+            self.dirty_y1 = max(0, y1)
+        if y2 > self.dirty_y2:
+            self.dirty_y2 = min(self.h, y2)
+
+    def tick(self, now=None):
+        """
+        Faz flush das linhas alteradas se já passou 'interval' desde o último.
+        Quase sempre só compara dois números (custo desprezável por frame).
+        """
+        if self.dirty_y1 >= self.dirty_y2:
+            return
+        now = time.monotonic() if now is None else now
+        if now - self.last_flush >= self.interval:
+            self.flush()
+            self.last_flush = now
+
+    def flush(self):
+        """
+        msync das páginas que contêm as linhas alteradas.
+        """
+        if self.dirty_y1 >= self.dirty_y2:
+            return
+        page = mmap.ALLOCATIONGRANULARITY
+        start = HEADER_SIZE + self.dirty_y1 * self.row_bytes
+        end = HEADER_SIZE + self.dirty_y2 * self.row_bytes
+        start -= start % page
+        self.map.flush(start, min(end, len(self.map)) - start)
+        self.dirty_y1, self.dirty_y2 = self.h, 0
+        self.flushes += 1
+
+    def close(self):
+        """
+        Flush final. O mapeamento continua válido (cfg.canvas pode ainda estar em uso)
+        e é libertado pelo sistema operativo quando o processo termina.
+        """
+        self.flush()
+        self.file.close()
@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# ============================
+# Fontes de imagem
+# ============================
+# Todas as fontes têm a mesma interface:
+# - read(out=None) -> (ok, frame): lê o próximo frame; se 'out' for dado e tiver o
+#   tamanho certo, o frame é escrito diretamente nesse buffer (sem alocar)
+# - stamp() -> float: instante (segundos) do último frame lido
+# - release(): liberta a fonte
+# - realtime: True para câmaras (frames antigos podem ser descartados),
+#   False para ficheiros (todos os frames devem ser entregues)
+
+
+class CameraSource:
+    """
+    Fonte de imagem a partir de uma câmara (índice do OpenCV, ex.: 0).
+    """
+
+    realtime = True
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+
+    def read(self, out=None):
+        if out is None:
+            return self.cap.read()
+        return self.cap.read(out)
+
+    def stamp(self):
+        # Relógio monotónico no momento da leitura
+        return time.monotonic()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(CameraSource):
+    """
+    Fonte de imagem a partir de um ficheiro de vídeo (útil para benchmarks headless).
+
+    O timestamp vem da posição no vídeo, por isso é reprodutível entre execuções.
+    """
+
+    realtime = False
+
+    def __init__(self, path):
+        self.cap = cv2.VideoCapture(path)
+
+    def stamp(self):
+        return self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+
+class ImageDirSource:
+    """
+    Fonte de imagem a partir de uma pasta com imagens (lidas por ordem alfabética).
+
+    O timestamp é calculado a partir do índice da imagem e de um fps fixo.
+    """
+
+    realtime = False
+
+    def __init__(self, folder, fps=30.0):
+        exts = (".png", ".jpg", ".jpeg", ".bmp")
+        self.paths = [
+            os.path.join(folder, f)
+            for f in sorted(os.listdir(folder))
+            if f.lower().endswith(exts)
+        ]
+        self.fps = fps
+        self.pos = 0
+
+    def read(self, out=None):
+        while self.pos < len(self.paths):
+            img = cv2.imread(self.paths[self.pos])
+            self.pos += 1
+            if img is None:
+                continue
+            if out is not None and out.shape == img.shape:
+                np.copyto(out, img)
+                return True, out
+            return True, img
+        return False, None
+
+    def stamp(self):
+        return (self.pos - 1) / self.fps
+
+    def release(self):
+        pass
+
+
+def open_source(spec):
+    """
+    Cria a fonte adequada a partir de uma especificação:
+    - int (ou string só com dígitos): índice de câmara
+    - pasta: sequência de imagens
+    - outro caminho: ficheiro de vídeo
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirSource(spec)
+    return VideoFileSource(spec)
+
+
+# ============================
+# Captura em background
+# ============================
+
+
+class FrameCapture:
+    """
+    Lê frames de uma fonte numa thread de fundo para um anel de buffers pré-alocados.
+
+    Ideia geral:
+    - O cv2.VideoCapture.read() deixa de bloquear o loop principal.
+    - O anel tem ring_size buffers (mínimo 3): um com o frame mais recente, um que
+      pode estar a ser usado pelo consumidor e pelo menos um livre para escrita.
+      A thread nunca escreve nos dois primeiros, por isso o consumidor recebe o
+      frame sem cópia e o buffer não muda enquanto não pedir o próximo.
+    - Fontes em tempo real (câmara): os frames que o consumidor não chegou a
+      pedir são descartados, ficando sempre disponível o mais recente.
+    - Fontes de ficheiro: nenhum frame é descartado (a thread espera pelo
+      consumidor), mas a descodificação do próximo frame corre em paralelo.
+    """
+
+    def __init__(self, source, ring_size=3, drop_frames=None):
+        """
+        Parâmetros:
+        - source: fonte (CameraSource, VideoFileSource, ImageDirSource, ...)
+        - ring_size: nº de buffers no anel (mínimo 3)
+        - drop_frames: descartar frames antigos; por defeito igual a source.realtime
+        """
+        self.source = source
+        self.ring_size = max(3, ring_size)
+        self.drop_frames = source.realtime if drop_frames is None else drop_frames
+
+        # Buffers do anel (alocados todos de uma vez quando chega o primeiro frame)
+        self.buffers = [None] * self.ring_size
+        self.stamps = [0.0] * self.ring_size
+
+        # latest_*: frame mais recente publicado; held_slot: buffer em uso pelo consumidor
+        self.latest_id = 0
+        self.latest_slot = None
+        self.held_slot = None
+        self.consumed_id = 0
+
+        self.cond = threading.Condition()
+        self.running = False
+        self.finished = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Pára a thread de captura e liberta a fonte.
+        """
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.source.release()
+
+    def read(self, timeout=None):
+        """
+        Devolve o frame mais recente que ainda não foi entregue.
+
+        Bloqueia até existir um frame novo (ou até 'timeout' segundos).
+
+        Retorno:
+        - ok (bool): False se a fonte terminou (ou se o timeout expirou)
+        - frame_id (int): id monotónico do frame (pode saltar valores se houve descarte)
+        - timestamp (float): instante do frame, em segundos
+        - frame (np.ndarray ou None): buffer do anel (sem cópia); é válido até à próxima
+          chamada a read() e não deve ser alterado
+        """
+        with self.cond:
+            while self.latest_id == self.consumed_id and not self.finished:
+                if not self.cond.wait(timeout) and timeout is not None:
+                    return False, self.consumed_id, 0.0, None
+            if self.latest_id == self.consumed_id:
+                return False, self.consumed_id, 0.0, None
+
+            slot = self.latest_slot
+            self.held_slot = slot
+            self.consumed_id = self.latest_id
+            self.cond.notify_all()
+            return True, self.consumed_id, self.stamps[slot], self.buffers[slot]
+
+    def _free_slot(self):
+        """
+        Escolhe um buffer que não seja o mais recente nem o que o consumidor tem.
+        """
+        for i in range(self.ring_size):
+            if i != self.latest_slot and i != self.held_slot:
+                return i
+
+    def _run(self):
+        """
+        Ciclo da thread: lê para um buffer livre e publica-o como frame mais recente.
+        """
+        while self.running:
+            with self.cond:
+                slot = self._free_slot()
+
+            ok, img = self.source.read(self.buffers[slot])
+            if not ok:
+                break
+            stamp = self.source.stamp()
+
+            # Primeiro frame (ou mudança de resolução): aloca o anel com o novo formato
+            if img is not self.buffers[slot]:
+                for i in range(self.ring_size):
+                    if i != slot and i != self.latest_slot and i != self.held_slot:
+                        self.buffers[i] = np.empty_like(img)
+                self.buffers[slot] = img
+
+            with self.cond:
+                # Fontes de ficheiro: espera até o consumidor levar o frame anterior
+                if not self.drop_frames:
+                    while self.running and self.consumed_id < self.latest_id:
+                        self.cond.wait()
+                    if not self.running:
+                        break
+
+                self.stamps[slot] = stamp
+                self.latest_slot = slot
+                self.latest_id += 1
+                self.cond.notify_all()
+
+        with self.cond:
+            self.finished = True
+            self.cond.notify_all()
@@ -0,0 +1,111 @@
+import cv2
+import numpy as np
+
+
+class Compositor:
+    """
+    Compõe o canvas por cima do frame apenas nas zonas onde existe tinta.
+
+    Ideia geral:
+    - O canvas é dividido em tiles (ex.: 64x64 px) e é mantida uma máscara de
+      ocupação (True = o tile tem pelo menos um pixel não-preto).
+    - As operações de desenho marcam como "sujos" os tiles que alteram; só esses
+      voltam a ser verificados antes da composição seguinte.
+    - A composição faz cv2.add apenas sobre os tiles ocupados (agrupados em
+      sequências horizontais). Onde o canvas é preto, cv2.add(frame, 0) == frame,
+      por isso o resultado é idêntico a cv2.add(frame, canvas) no frame inteiro.
+    """
+
+    def __init__(self, h, w, tile=64, dense_ratio=0.6):
+        """
+        Parâmetros:
+        - h, w: dimensões do canvas
+        - tile: lado (px) de cada tile
+        - dense_ratio: fração de tiles ocupados a partir da qual compensa um único
+          cv2.add sobre o frame inteiro
+        """
+        self.h = h
+        self.w = w
+        self.tile = tile
+        self.dense_ratio = dense_ratio
+
+        rows = (h + tile - 1) // tile
+        cols = (w + tile - 1) // tile
+
+        # occupied: máscara de ocupação por tile; dirty: tiles a reavaliar
+        self.occupied = np.zeros((rows, cols), bool)
+        self.dirty = np.zeros((rows, cols), bool)
+
+        # Quando True, a ocupação é recalculada para o canvas inteiro
+        self.all_dirty = True
+
+    def mark_dirty(self, x1, y1, x2, y2):
+        """
+        Marca como alterada a zona [x1, x2) x [y1, y2) do canvas.
+        """
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(self.w, x2), min(self.h, y2)
+        if x1 >= x2 or y1 >= y2:
+            return
+        t = self.tile
+        self.dirty[y1 // t:(y2 - 1) // t + 1, x1 // t:(x2 - 1) // t + 1] = True
+
+    def mark_all_dirty(self):
+        """
+        Marca o canvas inteiro como alterado (ex.: depois de o limpar).
+        """
+        self.all_dirty = True
+
+    def _refresh(self, canvas):
+        """
+        Atualiza a máscara de ocupação dos tiles sujos.
+        """
+        t = self.tile
+        if self.all_dirty:
+            # Recalcula tudo de uma vez: pixel com tinta -> OR por blocos de linhas e colunas
+            ink = canvas.any(axis=2)
+            rows = np.logical_or.reduceat(ink, np.arange(0, self.h, t), axis=0)
+            self.occupied[:] = np.logical_or.reduceat(rows, np.arange(0, self.w, t), axis=1)
+            self.dirty[:] = False
+            self.all_dirty = False
+            return
+
+        for ty, tx in zip(*np.nonzero(self.dirty)):
+            self.occupied[ty, tx] = canvas[ty * t:(ty + 1) * t, tx * t:(tx + 1) * t].any()
+        self.dirty[:] = False
+
+    def compose(self, frame, canvas, dst=None):
+        """
+        Devolve frame + canvas (soma saturada, como cv2.add).
+
+        Parâmetros:
+        - frame: imagem de fundo (BGR)
+        - canvas: canvas de desenho, com as mesmas dimensões
+        - dst: imagem de saída; se None, o resultado é escrito no próprio frame
+        """
+        self._refresh(canvas)
+
+        if dst is None:
+            dst = frame
+        elif dst is not frame:
+            dst[:] = frame
+
+        # Desenho denso: uma única soma no frame inteiro é mais barata
+        if self.occupied.mean() >= self.dense_ratio:
+            return cv2.add(frame, canvas, dst=dst)
+
+        t = self.tile
+        for ty in np.nonzero(self.occupied.any(axis=1))[0]:
+            row = self.occupied[ty]
+
+            # Agrupa tiles ocupados consecutivos numa só operação
+            edges = np.diff(np.concatenate(([0], row.view(np.int8), [0])))
+            starts = np.nonzero(edges == 1)[0]
+            ends = np.nonzero(edges == -1)[0]
+
+            ys = slice(ty * t, (ty + 1) * t)
+            for tx1, tx2 in zip(starts, ends):
+                xs = slice(tx1 * t, tx2 * t)
+                cv2.add(frame[ys, xs], canvas[ys, xs], dst=dst[ys, xs])
+
+        return dst
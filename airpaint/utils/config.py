@@ -1,5 +1,7 @@
 import numpy as np
 
+from history import UndoHistory
+
 # Canvas principal onde vais desenhar (normalmente um array NumPy com a imagem)
 canvas = None
 
@@ -9,11 +11,24 @@ thickness = 10
 # Espessura da borracha (em pixels) — normalmente maior para apagar mais rápido
 erase_thickness = 40
 
-# Histórico de estados do canvas para permitir "undo"
-history = []
+# Limite de memória (bytes) ocupada pelo histórico de undo/redo
+MAX_HISTORY_BYTES = 64 * 1024 * 1024
+
+# Comprimir (zlib) as zonas do canvas guardadas no histórico
+HISTORY_COMPRESS = False
+
+# Histórico de undo/redo: guarda apenas as zonas alteradas por cada traço (ver history.py)
+history = UndoHistory(MAX_HISTORY_BYTES, compress=HISTORY_COMPRESS)
+
+# Compositor do canvas sobre o frame (criado em drawing.ensure_canvas, ver compositor.py)
+compositor = None
 
-# Limite de estados guardados no histórico (para não gastar demasiada RAM)
-MAX_HISTORY = 20
+# Registo vetorial dos traços (StrokeLog, ver strokes.py); None = desligado
+stroke_log = None
+
+# Ficheiro mapeado em memória onde vive o canvas (CanvasStore, criado em
+# drawing.ensure_canvas quando CANVAS_MMAP_PATH está definido); None = canvas só em RAM
+canvas_store = None
 
 # Paleta de cores (BGR, como o OpenCV usa por defeito: Blue, Green, Red)
 colors = [
@@ -57,18 +72,172 @@ rainbow_delay = 0.25
 # Guarda o último instante em que a cor foi trocada no modo arco-íris
 last_rainbow_switch = 0
 
-def save_state(canvas):
-    """
-    Guarda um 'snapshot' do canvas no histórico (para suportar undo).
-
-    Regras:
-    - Mantém o histórico com no máximo MAX_HISTORY estados.
-    - Guarda sempre uma CÓPIA do canvas (canvas.copy()) para evitar que alterações futuras
-      modifiquem o estado guardado.
-    """
-    # Se o histórico já estiver cheio, remove o estado mais antigo (posição 0)
-    if len(history) >= MAX_HISTORY:
-        history.pop(0)
-
-    # Adiciona o estado atual do canvas como cópia independente
-    history.append(canvas.copy())
\ No newline at end of file
+# Ferramenta atual ("brush", "eraser" ou "spray"), atualizada pelo Painter
+current_tool = "brush"
+
+# Último ponto desenhado por mão: { mão: (ferramenta, (x, y)) }
+# Permite ligar a posição anterior à atual com um segmento contínuo (ver drawing.py)
+last_point = {}
+
+# Os valores acima (canvas, histórico, cor, ferramenta, ...) são o estado de desenho de
+# uma instalação: no modo servidor cada sessão tem a sua cópia (ver session.DRAWING_STATE)
+
+# Fonte de imagem: índice da câmara (ex.: 0), ficheiro de vídeo ou pasta de imagens
+CAPTURE_SOURCE = 0
+
+# Nº de buffers pré-alocados no anel da captura em background (mínimo 3)
+CAPTURE_RING_SIZE = 3
+
+# Inferência assíncrona: quando True, Pose/Hands/FaceMesh/YOLO correm cada um na sua
+# thread (ver pipeline.py) e o loop principal usa sempre o resultado mais recente.
+ASYNC_INFERENCE = True
+
+# Nº máximo de frames em fila por estágio do pipeline (os mais antigos são descartados)
+PIPELINE_QUEUE_DEPTH = 1
+
+# Profiling por etapa (ver profiler.py): desligado não tem custo no loop
+PROFILE = False
+
+# Mostrar p50/p95/p99 de cada etapa por cima do output
+PROFILE_OVERLAY = True
+
+# Ficheiro (.json ou .csv) onde as estatísticas são gravadas periodicamente (None = não grava)
+PROFILE_DUMP_PATH = "profile.json"
+
+# Segundos entre gravações do ficheiro de profiling
+PROFILE_DUMP_INTERVAL = 5.0
+
+# Nº de medições guardadas por etapa (janela deslizante dos percentis)
+PROFILE_WINDOW = 120
+
+# Cadência do YOLO: corre no máximo a cada N frames; entre execuções as boxes
+# são seguidas por optical flow (1 = corre em todos os frames)
+YOLO_INTERVAL = 10
+
+# Movimento médio da cena (0..255, em miniaturas cinzentas) que força uma nova
+# execução do YOLO antes do intervalo (None = só pelo intervalo)
+YOLO_MOTION_THRESHOLD = 12.0
+
+# Correlação mínima (-1..1) entre o recorte atual de uma box seguida e o recorte do
+# momento da deteção; abaixo disso (ex.: o livro/lata saiu do frame) o YOLO volta a
+# correr nesse frame
+YOLO_TRACK_MIN_CORRELATION = 0.5
+
+# Mãos em modo ROI: o MediaPipe Hands só corre em recortes à volta das mãos
+# (estimados pela Pose e pelas mãos do frame anterior, ver hands.detect_hands_roi)
+HAND_ROI = False
+
+# Lado (px) de cada recorte de mão enviado ao modelo
+HAND_ROI_SIZE = 224
+
+# Largura (px) da imagem enviada a cada modelo; o frame é reduzido mantendo a proporção
+# e os resultados são convertidos de volta para o espaço do canvas (None = resolução da câmara)
+INFERENCE_WIDTH = {
+    "pose": 640,
+    "hands": 640,
+    "face": 640,
+    "objects": 640,
+}
+
+# Debug view (landmarks numa janela à parte, ver debug_view.py): desligado por defeito,
+# liga/desliga em runtime com a tecla 'd'
+DEBUG_VIEW = False
+
+# Desenhar o debug só a cada N frames
+DEBUG_VIEW_EVERY = 2
+
+# Escala da imagem de debug em relação ao frame
+DEBUG_VIEW_SCALE = 0.5
+
+# Overlays a desenhar no debug: qualquer subconjunto de ("pose", "hands", "face")
+DEBUG_OVERLAYS = ("pose", "hands", "face")
+
+# Backend MediaPipe: "separate" (Pose, Hands e FaceMesh em grafos separados) ou
+# "holistic" (um único grafo Holistic para pose, mãos e face, ver holistic.py)
+MEDIAPIPE_BACKEND = "separate"
+
+# Sorriso em modo rápido (ver face.detect_smile_fast): FaceMesh sem íris, só num recorte
+# à volta da face e a um ritmo mais baixo
+SMILE_FAST = False
+
+# Nº máximo de execuções por segundo do FaceMesh no modo rápido
+SMILE_RATE = 10
+
+# Lado (px) do recorte da face enviado ao FaceMesh no modo rápido
+SMILE_CROP_SIZE = 192
+
+# Streaming MJPEG do output na rede local (ver streaming.py): http://<máquina>:STREAM_PORT/
+STREAM = False
+
+# Endereço onde o servidor escuta ("0.0.0.0" = toda a rede local, "127.0.0.1" = só esta máquina)
+STREAM_HOST = "0.0.0.0"
+STREAM_PORT = 8080
+
+# Qualidade JPEG (0..100) e largura máxima das imagens enviadas (None = tamanho original)
+STREAM_QUALITY = 80
+STREAM_MAX_WIDTH = None
+
+# Publicar também a animação da ferramenta (canal /tool.mjpg)
+STREAM_TOOL = True
+
+# Ficheiro do registo vetorial dos traços (JSON-lines, ver strokes.py); None = não grava
+STROKE_LOG_PATH = None
+
+# Screenshots (gesto do livro), gravados em background (ver screenshots.py)
+SCREENSHOT_DIR = "screenshots"
+
+# Formato: "png", "jpeg" ou "webp"
+SCREENSHOT_FORMAT = "png"
+
+# Compressão PNG (0..9) ou qualidade JPEG/WebP (0..100); None = valor por defeito do OpenCV
+SCREENSHOT_LEVEL = 3
+
+# Gravar também a camada do desenho sozinha (<nome>_canvas.<ext>)
+SCREENSHOT_SAVE_CANVAS = False
+
+# Canvas guardado num ficheiro mapeado em memória (ver canvas_store.py): sobrevive a um
+# crash do processo e é recuperado no arranque (None = canvas só em memória)
+CANVAS_MMAP_PATH = None
+
+# Segundos mínimos entre flushes (msync) das linhas alteradas do canvas
+CANVAS_FLUSH_INTERVAL = 2.0
+
+# Backend do YOLO (ver yolo_backends.py):
+# - "ultralytics": modelo .pt através do Ultralytics/PyTorch
+# - "onnxruntime": modelo exportado para ONNX (uma vez), corrido pelo ONNX Runtime
+# - "opencv": o mesmo ONNX corrido pelo OpenCV DNN (sem dependências extra)
+YOLO_BACKEND = "ultralytics"
+
+# Pesos do modelo (também usados para exportar o ONNX)
+YOLO_WEIGHTS = "yolov8n.pt"
+
+# Tamanho (px) da entrada do YOLO, em todos os backends (nos ONNX é fixo: imagem quadrada com margens)
+YOLO_IMGSZ = 320
+
+# Pesos quantizados para int8 no ONNX (só para o backend "onnxruntime"; com "opencv"
+# o arranque falha com ValueError, porque o OpenCV DNN não carrega o modelo quantizado)
+YOLO_INT8 = False
+
+# Ficheiro ONNX (None = <pesos>_<imgsz>[_int8].onnx, exportado na primeira utilização)
+YOLO_ONNX_PATH = None
+
+# Suavização (filtro One Euro) e previsão dos landmarks das mãos entre inferências
+# (ver smoothing.py)
+HAND_SMOOTHING = False
+
+# Frequência de corte mínima (Hz): menor = menos tremor com a mão parada, mais atraso
+HAND_SMOOTHING_MIN_CUTOFF = 1.0
+
+# Aumento do corte com a velocidade (coordenadas normalizadas/s): maior = menos atraso
+# nos movimentos rápidos
+HAND_SMOOTHING_BETA = 30.0
+
+# Frequência de corte (Hz) da estimativa de velocidade
+HAND_SMOOTHING_D_CUTOFF = 1.0
+
+# Extrapolar a ponta do indicador da mão que desenha nos frames sem inferência nova
+# (pela velocidade estimada); os gestos usam sempre a última deteção filtrada
+HAND_PREDICT = True
+
+# Máximo (s) de extrapolação a partir da última deteção
+HAND_PREDICT_MAX = 0.1
@@ -0,0 +1,108 @@
+import cv2
+import mediapipe as mp
+
+# ============================
+# Atalhos para módulos MediaPipe (desenho dos landmarks)
+# ============================
+mp_draw = mp.solutions.drawing_utils
+mp_pose = mp.solutions.pose
+mp_hands = mp.solutions.hands
+mp_face_mesh = mp.solutions.face_mesh
+
+# Nome da janela do debug
+WINDOW = "Debug View"
+
+# Overlays disponíveis (podem ser escolhidos em config.DEBUG_OVERLAYS)
+OVERLAYS = ("pose", "hands", "face")
+
+# Estilos (pontos, ligações) de cada overlay, criados uma única vez
+_POSE_STYLE = (
+    mp_draw.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2),
+    mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2),
+)
+_LEFT_HAND_STYLE = (
+    mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
+    mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2),
+)
+_RIGHT_HAND_STYLE = (
+    mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+    mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2),
+)
+_FACE_STYLE = (
+    mp_draw.DrawingSpec(color=(255, 0, 255), thickness=1, circle_radius=1),
+    mp_draw.DrawingSpec(color=(0, 255, 255), thickness=1),
+)
+
+
+class DebugView:
+    """
+    Janela de diagnóstico com os landmarks da pose, mãos e face.
+
+    - Desligada por defeito: render() sai logo, sem copiar nem desenhar nada.
+    - Pode ser ligada/desligada em runtime (toggle(), tecla 'd' no main.py).
+    - Desenha só a cada 'every' frames e numa imagem reduzida por 'scale'
+      (os landmarks são normalizados, por isso desenham-se à escala da imagem).
+    - 'overlays' escolhe o que desenhar: qualquer subconjunto de OVERLAYS.
+    """
+
+    def __init__(self, enabled=False, every=1, scale=1.0, overlays=OVERLAYS):
+        self.enabled = enabled
+        self.every = max(1, every)
+        self.scale = scale
+        self.overlays = set(overlays)
+
+        # Nº de frames vistos desde que foi ligada (para a cadência 'every')
+        self._count = 0
+
+    def toggle(self):
+        """
+        Liga/desliga a janela (ao desligar, a janela é fechada).
+        """
+        self.enabled = not self.enabled
+        self._count = 0
+        if not self.enabled:
+            try:
+                cv2.destroyWindow(WINDOW)
+            except cv2.error:
+                pass
+
+    def render(self, frame, results):
+        """
+        Desenha os overlays escolhidos sobre uma cópia (reduzida) do frame e mostra-a.
+
+        Parâmetros:
+        - frame: frame sem paleta nem canvas (não é alterado)
+        - results: FrameResults do frame
+        """
+        if not self.enabled:
+            return
+
+        self._count += 1
+        if (self._count - 1) % self.every:
+            return
+
+        # Cópia do frame (ou versão reduzida, que já é uma imagem nova)
+        if self.scale != 1.0:
+            image = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        else:
+            image = frame.copy()
+
+        # Pose landmarks (se existirem)
+        pose_lms = results.pose[2]
+        if "pose" in self.overlays and pose_lms:
+            mp_draw.draw_landmarks(image, pose_lms, mp_pose.POSE_CONNECTIONS, *_POSE_STYLE)
+
+        # Mão esquerda / direita (se existirem)
+        if "hands" in self.overlays:
+            left_hand_obj, right_hand_obj = results.hands[5:7]
+            if left_hand_obj is not None:
+                mp_draw.draw_landmarks(image, left_hand_obj, mp_hands.HAND_CONNECTIONS, *_LEFT_HAND_STYLE)
+            if right_hand_obj is not None:
+                mp_draw.draw_landmarks(image, right_hand_obj, mp_hands.HAND_CONNECTIONS, *_RIGHT_HAND_STYLE)
+
+        # Face landmarks (malha completa, a parte mais cara do debug)
+        face_lms = results.face[1]
+        if "face" in self.overlays and face_lms is not None:
+            mp_draw.draw_landmarks(image, face_lms, mp_face_mesh.FACEMESH_TESSELATION, *_FACE_STYLE)
+
+        cv2.imshow(WINDOW, image)
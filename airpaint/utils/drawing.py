@@ -1,6 +1,10 @@
+from functools import lru_cache
+
 import cv2
 import numpy as np
 import config as cfg
+from compositor import Compositor
+from canvas_store import CanvasStore
 
 def ensure_canvas(h, w):
     """
@@ -8,43 +12,160 @@ def ensure_canvas(h, w):
 
     - Se cfg.canvas ainda não tiver sido inicializado (None), cria um canvas preto
       com tamanho (h, w) e 3 canais (BGR), tipo uint8 (formato típico do OpenCV).
+    - Cria também o compositor (cfg.compositor) com as mesmas dimensões.
+    - Se cfg.CANVAS_MMAP_PATH estiver definido, o canvas vive nesse ficheiro mapeado em
+      memória (cfg.canvas_store, ver canvas_store.py): o desenho de uma sessão anterior
+      (ou de um processo que morreu) é recuperado se as dimensões forem as mesmas.
+    - Se o stroke log estiver ligado, grava o cabeçalho com as dimensões.
     - Devolve sempre cfg.canvas (o canvas atual).
     """
     if cfg.canvas is None:
-        cfg.canvas = np.zeros((h, w, 3), np.uint8)
+        if cfg.CANVAS_MMAP_PATH:
+            cfg.canvas_store = CanvasStore(cfg.CANVAS_MMAP_PATH, h, w, cfg.CANVAS_FLUSH_INTERVAL)
+            cfg.canvas = cfg.canvas_store.canvas
+        else:
+            cfg.canvas = np.zeros((h, w, 3), np.uint8)
+        cfg.compositor = Compositor(h, w)
+        if cfg.stroke_log is not None:
+            cfg.stroke_log.begin(h, w)
     return cfg.canvas
 
-def draw_brush(x, y):
+def _touch(x1, y1, x2, y2, tool):
+    """
+    Regista no histórico de undo a zona [x1, x2) x [y1, y2) que vai ser alterada.
+
+    - Tem de ser chamada ANTES de desenhar (guarda o conteúdo "antes").
+    - Chamadas seguidas com a mesma ferramenta fazem parte do mesmo traço.
+    - Marca também a zona como suja no compositor.
+    - Devolve False se a zona estiver totalmente fora do canvas (nada a desenhar).
+    """
+    cfg.history.touch(cfg.canvas, x1, y1, x2, y2, tool)
+    _mark_dirty(x1, y1, x2, y2)
+    h, w = cfg.canvas.shape[:2]
+    return max(0, x1) < min(w, x2) and max(0, y1) < min(h, y2)
+
+def _mark_dirty(x1, y1, x2, y2):
+    """
+    Marca a zona como alterada no compositor e, se existir, no ficheiro do canvas.
+    """
+    cfg.compositor.mark_dirty(x1, y1, x2, y2)
+    if cfg.canvas_store is not None:
+        cfg.canvas_store.mark_dirty(y1, y2)
+
+# ============================
+# Motor de traços
+# ============================
+# O último ponto desenhado por mão (cfg.last_point) permite ligar a posição anterior
+# à atual com um segmento contínuo, sem falhas quando a mão se mexe depressa entre frames.
+
+# Spray: nº de pontos por frame, alcance dos offsets ([-SPRAY_RANGE, SPRAY_RANGE)) e raio de cada ponto
+SPRAY_DOTS = 20
+SPRAY_RANGE = 20
+SPRAY_DOT_RADIUS = 2
+
+@lru_cache(maxsize=None)
+def _dot_offsets(radius):
+    """
+    Devolve os offsets (dx, dy) dos pixels de um círculo preenchido de raio 'radius',
+    tal como o cv2.circle o desenha (para o spray em bloco ter o mesmo aspeto).
+    """
+    size = 2 * radius + 1
+    mask = np.zeros((size, size), np.uint8)
+    cv2.circle(mask, (radius, radius), radius, 1, -1)
+    dy, dx = np.nonzero(mask)
+    return np.stack([dx - radius, dy - radius], axis=1)
+
+_SPRAY_DOT = _dot_offsets(SPRAY_DOT_RADIUS)
+
+def paint_dots(canvas, centers, radius, color):
+    """
+    Pinta de uma só vez (NumPy) um círculo preenchido de raio 'radius' em cada centro
+    (array (n, 2) de x, y), com o mesmo aspeto de um cv2.circle por ponto.
+    Os pixels fora do canvas são ignorados. Usado pelo spray e pelo replay (strokes.py).
+    """
+    offsets = _SPRAY_DOT if radius == SPRAY_DOT_RADIUS else _dot_offsets(radius)
+    pts = (centers[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+    h, w = canvas.shape[:2]
+    keep = (pts[:, 0] >= 0) & (pts[:, 0] < w) & (pts[:, 1] >= 0) & (pts[:, 1] < h)
+    pts = pts[keep]
+    canvas[pts[:, 1], pts[:, 0]] = color
+
+def _segment_start(hand, tool, x, y):
+    """
+    Devolve o ponto anterior da mesma mão/ferramenta (ou o próprio ponto, se não houver)
+    e guarda (x, y) como novo ponto anterior.
+    """
+    prev = cfg.last_point.get(hand)
+    cfg.last_point[hand] = (tool, (x, y))
+    if prev is None or prev[0] != tool:
+        return x, y
+    return prev[1]
+
+def _stroke_segment(x0, y0, x1, y1, r, color, tool):
+    """
+    Desenha um segmento grosso (cápsula) de raio r entre (x0, y0) e (x1, y1).
+    (Fica registado no stroke log, se estiver ligado.)
+    """
+    if not _touch(min(x0, x1) - r - 1, min(y0, y1) - r - 1, max(x0, x1) + r + 2, max(y0, y1) + r + 2, tool):
+        return
+    if cfg.stroke_log is not None:
+        cfg.stroke_log.segment(tool, x0, y0, x1, y1, r, color if tool != "eraser" else None)
+    if (x0, y0) == (x1, y1):
+        cv2.circle(cfg.canvas, (x1, y1), r, color, -1)
+    else:
+        cv2.line(cfg.canvas, (x0, y0), (x1, y1), color, 2 * r + 1)
+
+def draw_brush(x, y, hand="right"):
     """
     Desenha no canvas usando um pincel circular.
 
-    - Desenha um círculo preenchido (-1) no cfg.canvas na posição (x, y).
+    - No primeiro frame do traço desenha um círculo preenchido na posição (x, y).
+    - Nos frames seguintes desenha um segmento contínuo desde o ponto anterior da
+      mesma mão, para não haver falhas quando a mão se mexe depressa.
     - O raio é cfg.thickness.
     - A cor usada é cfg.current_color (em BGR).
     """
-    cv2.circle(cfg.canvas, (x, y), cfg.thickness, cfg.current_color, -1)
+    x0, y0 = _segment_start(hand, "brush", x, y)
+    _stroke_segment(x0, y0, x, y, cfg.thickness, cfg.current_color, "brush")
 
-def erase_at(x, y):
+def erase_at(x, y, hand="right"):
     """
     Apaga no canvas simulando uma borracha.
 
-    - Desenha um círculo preenchido (-1) na cor preta (0,0,0) na posição (x, y).
+    - Tal como o pincel, liga o ponto anterior ao atual com um segmento preto (0,0,0).
     - O raio é cfg.erase_thickness (normalmente maior do que o pincel).
     """
-    cv2.circle(cfg.canvas, (x, y), cfg.erase_thickness, (0, 0, 0), -1)
+    x0, y0 = _segment_start(hand, "eraser", x, y)
+    _stroke_segment(x0, y0, x, y, cfg.erase_thickness, (0, 0, 0), "eraser")
 
-def spray_at(x, y):
+def spray_at(x, y, hand="right"):
     """
     Modo spray: desenha vários pontos aleatórios à volta do ponto (x, y).
 
-    - Faz 20 iterações, gerando offsets aleatórios dx/dy no intervalo [-20, 20).
-    - Em cada iteração desenha um pequeno círculo (raio 2) com cfg.current_color.
-    - Cria um efeito de "spray" (pontos dispersos).
+    - Gera de uma só vez (NumPy) SPRAY_DOTS offsets aleatórios no intervalo [-20, 20).
+    - Se a mão se mexeu desde o frame anterior, os pontos são distribuídos ao longo do
+      segmento (e em maior número), para o spray não ficar com falhas.
+    - Cada ponto é um pequeno círculo (raio 2) com cfg.current_color; todos os pixels
+      são escritos no canvas numa única operação.
     """
-    for i in range(20):
-        dx = np.random.randint(-20, 20)
-        dy = np.random.randint(-20, 20)
-        cv2.circle(cfg.canvas, (x + dx, y + dy), 2, cfg.current_color, -1)
+    x0, y0 = _segment_start(hand, "spray", x, y)
+    reach = SPRAY_RANGE + SPRAY_DOT_RADIUS
+    if not _touch(min(x0, x) - reach, min(y0, y) - reach, max(x0, x) + reach + 1, max(y0, y) + reach + 1, "spray"):
+        return
+
+    # Nº de pontos proporcional ao comprimento do segmento (pelo menos SPRAY_DOTS)
+    length = np.hypot(x - x0, y - y0)
+    n = SPRAY_DOTS * (int(length // SPRAY_RANGE) + 1)
+
+    # Centros: ponto aleatório ao longo do segmento + offset aleatório
+    t = np.random.random((n, 1))
+    base = np.array([x0, y0]) + t * np.array([x - x0, y - y0])
+    centers = base.astype(np.int64) + np.random.randint(-SPRAY_RANGE, SPRAY_RANGE, size=(n, 2))
+    if cfg.stroke_log is not None:
+        cfg.stroke_log.spray(centers, SPRAY_DOT_RADIUS, cfg.current_color)
+
+    # Todos os pixels de todos os pontos, recortados aos limites do canvas
+    paint_dots(cfg.canvas, centers, SPRAY_DOT_RADIUS, cfg.current_color)
 
 def clear_canvas():
     """
@@ -52,20 +173,54 @@ def clear_canvas():
 
     - Define todos os pixels do cfg.canvas para 0 (preto) usando slicing.
     - Mantém as dimensões e o objeto canvas, apenas zera o conteúdo.
+    - Fica registado como um passo próprio no histórico (pode ser desfeito).
     """
+    h, w = cfg.canvas.shape[:2]
+    _touch(0, 0, w, h, "clear")
     cfg.canvas[:] = 0
+    cfg.history.end_stroke()
+    cfg.compositor.mark_all_dirty()
+    if cfg.stroke_log is not None:
+        cfg.stroke_log.clear()
+
+def end_stroke():
+    """
+    Termina o traço atual (deve ser chamada nos frames em que não se desenha).
+
+    - Agrupa todos os frames desde o início do traço num único passo de undo.
+    - Esquece o ponto anterior de cada mão (o próximo traço começa num ponto novo).
+    """
+    cfg.last_point.clear()
+    cfg.history.end_stroke()
+    if cfg.stroke_log is not None:
+        cfg.stroke_log.end()
 
 def undo():
     """
-    Desfaz a última ação, restaurando o estado anterior do canvas.
+    Desfaz a última ação (traço completo), restaurando o estado anterior do canvas.
+
+    - Repõe apenas as zonas do canvas alteradas por esse traço (ver history.py).
+    - A ação desfeita fica disponível para redo().
+    """
+    if cfg.stroke_log is not None:
+        cfg.stroke_log.end()
+    rects = cfg.history.undo(cfg.canvas)
+    for rect in rects:
+        _mark_dirty(*rect)
+    if rects and cfg.stroke_log is not None:
+        cfg.stroke_log.undo()
 
-    - Se cfg.history tiver estados guardados:
-      - retira (pop) o último estado do histórico
-      - copia-o para o cfg.canvas atual (cfg.canvas[:] = ...)
-    - Usa .copy() para garantir independência de memória.
+def redo():
+    """
+    Refaz a última ação desfeita com undo().
     """
-    if cfg.history:
-        cfg.canvas[:] = cfg.history.pop().copy()
+    if cfg.stroke_log is not None:
+        cfg.stroke_log.end()
+    rects = cfg.history.redo(cfg.canvas)
+    for rect in rects:
+        _mark_dirty(*rect)
+    if rects and cfg.stroke_log is not None:
+        cfg.stroke_log.redo()
 
 def draw_palette(frame):
     """
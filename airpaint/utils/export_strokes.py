@@ -0,0 +1,47 @@
+"""
+Exporta um stroke log (ver strokes.py) para PNG ou SVG.
+
+Uso:
+    python export_strokes.py strokes.jsonl --out desenho.png [--scale 2] [--until 12.5]
+    python export_strokes.py strokes.jsonl --out desenho.svg
+
+- O canvas é reconstruído a partir das operações gravadas (pincel, spray, borracha,
+  clear, undo/redo), por isso pode ser exportado a qualquer resolução (--scale ou
+  --width) e em qualquer instante da sessão (--until, no relógio do log).
+- Com --scale 1 o PNG é igual ao canvas desenhado ao vivo.
+- O formato de saída é escolhido pela extensão (.svg ou qualquer imagem do OpenCV).
+"""
+import argparse
+import time
+
+import cv2
+
+from strokes import StrokeReplay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", help="stroke log (strokes.jsonl)")
+    parser.add_argument("--out", required=True, help="ficheiro de saída (.png, .jpg, .svg, ...)")
+    parser.add_argument("--scale", type=float, default=1.0, help="escala em relação ao canvas original")
+    parser.add_argument("--width", type=int, default=None, help="largura de saída (px); substitui --scale")
+    parser.add_argument("--until", type=float, default=None, help="reconstrói o canvas neste instante (s)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    replay = StrokeReplay(args.log)
+    scale = args.width / replay.width if args.width else args.scale
+
+    if args.out.lower().endswith(".svg"):
+        with open(args.out, "w") as f:
+            f.write(replay.to_svg(scale, args.until))
+    else:
+        cv2.imwrite(args.out, replay.render(scale, args.until))
+
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[export_strokes] {len(replay.ops)} operações -> {args.out} "
+          f"({round(replay.width * scale)}x{round(replay.height * scale)}, {elapsed:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
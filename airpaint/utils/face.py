@@ -1,99 +1,187 @@
 import mediapipe as mp
 import cv2
+import numpy as np
+
+import config as cfg
+from gestures import SMILE_HOLD_TIME, SmileFilter, smiling_now
 
 # mp_face aponta para o módulo Face Mesh do MediaPipe, usado para detetar landmarks faciais.
 mp_face = mp.solutions.face_mesh
 
-# Instância do FaceMesh configurada para:
-# - detetar no máximo 1 face
-# - refine_landmarks=True para landmarks mais detalhados (ex.: olhos/íris)
-# - thresholds de confiança para deteção e tracking relativamente altos (0.7)
-face = mp_face.FaceMesh(
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
- 
+
+def create_face(refine=True):
+    """
+    Cria uma instância do FaceMesh configurada para:
+    - detetar no máximo 1 face
+    - refine_landmarks=refine: landmarks mais detalhados (ex.: olhos/íris)
+    - thresholds de confiança para deteção e tracking relativamente altos (0.7)
+    """
+    return mp_face.FaceMesh(
+        max_num_faces=1,
+        refine_landmarks=refine,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+
+
+class SmileState:
+    """
+    Grafo e estado entre frames do detetor de sorriso de uma câmara (criado pela Inference).
+
+    - face: FaceMesh completo (detect_smile) ou, no caminho rápido (fast=True), a
+      instância leve sem refinamento de olhos/íris (468 pontos), aplicada só a um
+      recorte à volta da face
+    - smile_filter: histerese, o sorriso só é confirmado depois de SMILE_HOLD_TIME
+      segundos seguidos (o equivalente a SMILE_FRAMES frames a ~30 fps, ver
+      gestures.SmileFilter)
+    - last_run: instante da última execução do FaceMesh leve
+    - last_smiling / last_face: último resultado do caminho rápido (sorriso instantâneo,
+      landmarks da face em coordenadas do frame)
+    """
+
+    def __init__(self, fast=False):
+        self.face = create_face(refine=not fast)
+        self.smile_filter = SmileFilter(SMILE_HOLD_TIME)
+        self.last_run = float("-inf")
+        self.last_smiling = False
+        self.last_face = None
+
+    def close(self):
+        self.face.close()
+
+
 # ============================
-# Variáveis de controlo do estado de sorriso
+# Caminho rápido
 # ============================
-# Contador de frames consecutivos a sorrir
-smile_counter = 0
-
-# Contador de frames consecutivos sem sorriso (ou sem face detetada)
-no_smile_counter = 0
+# Landmarks da Pose usados para localizar a face: nariz, orelhas e cantos da boca
+POSE_NOSE, POSE_LEFT_EAR, POSE_RIGHT_EAR, POSE_MOUTH_LEFT, POSE_MOUTH_RIGHT = 0, 7, 8, 9, 10
 
-# Número de frames consecutivos necessário para considerar "sorriso confirmado"
-# (ajuda a reduzir falsos positivos por ruído)
-SMILE_FRAMES = 5
- 
-def detect_smile(frame):
+def detect_smile(ctx, state):
     """
     Deteta se existe um sorriso sustentado na imagem (frame) usando landmarks do FaceMesh.
 
+    Parâmetros:
+    - ctx: FrameContext do frame (ver frame_context.py)
+    - state: SmileState da câmara
+
     Estratégia:
-    - Converte o frame para RGB (MediaPipe espera RGB).
+    - Usa a versão RGB partilhada do frame (ctx.rgb; MediaPipe espera RGB).
     - Processa a face e obtém landmarks.
     - Mede a diferença vertical (em coordenadas normalizadas) entre o lábio superior e
       os cantos da boca (esquerdo e direito).
     - Se essa diferença ultrapassar um limiar em ambos os lados, assume que está a sorrir.
-    - Usa contadores de frames para só confirmar sorriso após SMILE_FRAMES consecutivos.
+    - Só confirma o sorriso depois de SMILE_HOLD_TIME segundos seguidos (timestamps do frame).
 
     Retorno:
-    - smile_state (bool): True quando o sorriso é considerado estável (>= SMILE_FRAMES)
+    - smile_state (bool): True quando o sorriso é considerado estável
     - landmarks_face (FaceLandmarks ou None): o objeto de landmarks da face, se existir
     """
-    global smile_counter, no_smile_counter
-
-    # Dimensões do frame (altura, largura, canais)
-    h, w, _ = frame.shape
-
-    # Conversão BGR -> RGB (OpenCV captura normalmente em BGR)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    # Processamento do frame para deteção de face/landmarks
-    results = face.process(rgb)
+    # Processamento do frame (RGB partilhado) para deteção de face/landmarks
+    results = state.face.process(ctx.rgb)
  
     # Se não houver face detetada:
-    # - aumenta o contador de "sem sorriso"
-    # - reseta o contador de sorriso
+    # - conta como frame sem sorriso (reseta a histerese)
     # - devolve False e None (sem landmarks)
     if not results.multi_face_landmarks:
-        no_smile_counter += 1
-        smile_counter = 0
+        state.smile_filter.update(False, ctx.stamp)
         return False, None
- 
-    # Extrai a lista de landmarks da primeira (e única) face
-    lm = results.multi_face_landmarks[0].landmark
- 
-    # Landmarks específicos usados para estimar sorriso:
-    # - 61: canto esquerdo da boca
-    # - 291: canto direito da boca
-    # - 13: região do lábio superior (ponto central superior)
-    left_mouth = lm[61]
-    right_mouth = lm[291]
-    upper_lip = lm[13]
- 
-    # Calcula a "altura" relativa entre o lábio superior e cada canto da boca.
-    # (coordenadas normalizadas: y aumenta de cima para baixo no ecrã)
-    left_height = upper_lip.y - left_mouth.y
-    right_height = upper_lip.y - right_mouth.y
- 
-    # Condição de "sorriso instantâneo" neste frame:
-    # Se ambos os lados excederem um limiar, considera que está a sorrir agora.
-    smiling_now = left_height > 0.008 and right_height > 0.008
- 
-    # Atualiza contadores para exigir consistência ao longo de frames consecutivos.
-    if smiling_now:
-        smile_counter += 1
-        no_smile_counter = 0
-    else:
-        no_smile_counter += 1
-        smile_counter = 0
- 
-    # Estado final: só True quando o sorriso foi detetado durante SMILE_FRAMES frames seguidos.
-    smile_state = smile_counter >= SMILE_FRAMES
- 
+
+    face_landmarks = results.multi_face_landmarks[0]
+
+    # Sorriso "instantâneo" neste frame (lábio superior vs. cantos da boca, ver gestures.smiling_now)
+    # e estado final, só True quando o sorriso se mantém há SMILE_HOLD_TIME segundos.
+    smile_state = state.smile_filter.update(smiling_now(face_landmarks.landmark), ctx.stamp)
+
     # Devolve o estado do sorriso e os landmarks da face (para debug/visualização posterior).
-    return smile_state, results.multi_face_landmarks[0]
\ No newline at end of file
+    return smile_state, face_landmarks
+
+
+def _face_roi(last_face, pose_lms, w, h):
+    """
+    Região quadrada (cx, cy, lado) em pixels onde deve estar a face.
+
+    - Primeiro usa a face do último resultado (box dos landmarks, alargada).
+    - Senão usa a Pose: centro entre o nariz e a boca, lado proporcional à distância
+      entre as orelhas.
+    - None se não houver nenhuma das duas.
+    """
+    if last_face is not None:
+        lm = last_face.landmark
+        xs = [p.x * w for p in lm]
+        ys = [p.y * h for p in lm]
+        side = max(max(xs) - min(xs), max(ys) - min(ys)) * 1.4
+        return (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2, max(side, 48)
+
+    if pose_lms is not None:
+        points = pose_lms.landmark
+        nose = points[POSE_NOSE]
+        mouth_x = (points[POSE_MOUTH_LEFT].x + points[POSE_MOUTH_RIGHT].x) / 2
+        mouth_y = (points[POSE_MOUTH_LEFT].y + points[POSE_MOUTH_RIGHT].y) / 2
+        ears = np.hypot(
+            (points[POSE_LEFT_EAR].x - points[POSE_RIGHT_EAR].x) * w,
+            (points[POSE_LEFT_EAR].y - points[POSE_RIGHT_EAR].y) * h,
+        )
+        cx = (nose.x + mouth_x) / 2 * w
+        cy = (nose.y + mouth_y) / 2 * h
+        return cx, cy, max(ears * 1.8, 48)
+
+    return None
+
+
+def detect_smile_fast(ctx, state, pose_lms=None):
+    """
+    Versão leve de detect_smile, com o mesmo retorno (smile_state, face_landmarks).
+
+    O que faz:
+    - Corre o FaceMesh no máximo SMILE_RATE vezes por segundo (pelo timestamp do frame);
+      nos frames intermédios reutiliza o último sorriso instantâneo.
+    - Usa o FaceMesh sem refinamento (sem íris) sobre um recorte SMILE_CROP_SIZE x
+      SMILE_CROP_SIZE à volta da face (boca ao centro), localizada pela última face
+      encontrada ou pela Pose. Sem nenhuma das duas, corre sobre o frame inteiro.
+    - Os landmarks são convertidos para coordenadas do frame (para o debug).
+    - A histerese é por tempo (SMILE_HOLD_TIME), por isso o modo rainbow liga e desliga
+      como no detect_smile, independentemente do ritmo.
+
+    Parâmetros:
+    - ctx: FrameContext do frame
+    - state: SmileState da câmara (criado com fast=True)
+    - pose_lms: pose_landmarks devolvidos por detect_pose (ou None)
+    """
+    now = ctx.stamp
+    if now - state.last_run < 1.0 / cfg.SMILE_RATE:
+        return state.smile_filter.update(state.last_smiling, now), state.last_face
+    state.last_run = now
+
+    h, w = ctx.h, ctx.w
+    roi = _face_roi(state.last_face, pose_lms, w, h)
+
+    if roi is None:
+        results = state.face.process(ctx.rgb)
+    else:
+        # Recorte (com borda preta fora do frame) redimensionado para size x size
+        size = cfg.SMILE_CROP_SIZE
+        cx, cy, side = roi
+        k = size / side
+        M = np.float32([[k, 0, (side / 2 - cx) * k], [0, k, (side / 2 - cy) * k]])
+        crop = cv2.warpAffine(ctx.rgb, M, (size, size), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+        results = state.face.process(crop)
+
+    if not results.multi_face_landmarks:
+        state.last_smiling = False
+        state.last_face = None
+        return state.smile_filter.update(False, now), None
+
+    face_landmarks = results.multi_face_landmarks[0]
+
+    # Recorte -> coordenadas normalizadas do frame completo (no próprio objeto do MediaPipe)
+    if roi is not None:
+        x0 = cx - side / 2
+        y0 = cy - side / 2
+        for p in face_landmarks.landmark:
+            p.x = (x0 + p.x * side) / w
+            p.y = (y0 + p.y * side) / h
+            p.z = p.z * side / w
+
+    state.last_smiling = smiling_now(face_landmarks.landmark)
+    state.last_face = face_landmarks
+    return state.smile_filter.update(state.last_smiling, now), face_landmarks
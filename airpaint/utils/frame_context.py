@@ -0,0 +1,85 @@
+import threading
+import time
+import weakref
+from collections import deque
+
+import cv2
+
+# ============================
+# Buffers RGB reutilizáveis
+# ============================
+# _rgb_pool: { (h, w): deque de arrays RGB livres }
+# Um buffer volta ao pool quando o FrameContext que o usa deixa de existir
+# (nenhum estágio do pipeline o está a usar), por isso pode ser reutilizado
+# em segurança mesmo com os modelos a correr em threads diferentes.
+_rgb_pool = {}
+
+
+def _take_rgb(h, w):
+    free = _rgb_pool.setdefault((h, w), deque())
+    try:
+        return free.pop()
+    except IndexError:
+        return None
+
+
+def _give_rgb(h, w, buffer):
+    _rgb_pool.setdefault((h, w), deque()).append(buffer)
+
+
+class FrameContext:
+    """
+    Dados partilhados de um frame, criados uma única vez por iteração do loop.
+
+    - bgr: frame BGR (como vem da câmara)
+    - rgb: versão RGB contígua, convertida na primeira vez que é pedida para um
+      buffer pré-alocado (uma única conversão para todos os modelos MediaPipe)
+    - h, w: dimensões do frame
+    - stamp: instante do frame (segundos; time.monotonic() se não for indicado)
+    - scale: escala em relação ao frame original (1.0, ou < 1 nas versões reduzidas)
+
+    scaled(width) devolve (e guarda) um FrameContext reduzido para a largura pedida,
+    partilhado por todos os modelos que usam essa resolução.
+    É o sítio para acrescentar futuro pré-processamento partilhado entre modelos.
+    """
+
+    def __init__(self, frame, stamp=None, scale=1.0):
+        self.bgr = frame
+        self.h, self.w = frame.shape[:2]
+        self.stamp = time.monotonic() if stamp is None else stamp
+        self.scale = scale
+
+        self._rgb = None
+        self._scaled = {}
+
+        # Os estágios do pipeline podem pedir rgb/scaled ao mesmo tempo
+        self._lock = threading.Lock()
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            with self._lock:
+                if self._rgb is None:
+                    buffer = _take_rgb(self.h, self.w)
+                    self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB, dst=buffer)
+                    weakref.finalize(self, _give_rgb, self.h, self.w, self._rgb)
+        return self._rgb
+
+    def scaled(self, width):
+        """
+        Devolve o contexto do frame reduzido para 'width' de largura (mantendo a proporção).
+
+        Se width for None ou não for menor do que a largura atual, devolve o próprio contexto.
+        """
+        if width is None or self.w <= width:
+            return self
+
+        ctx = self._scaled.get(width)
+        if ctx is None:
+            with self._lock:
+                ctx = self._scaled.get(width)
+                if ctx is None:
+                    k = width / self.w
+                    small = cv2.resize(self.bgr, (width, round(self.h * k)), interpolation=cv2.INTER_AREA)
+                    ctx = self._scaled[width] = FrameContext(small, self.stamp, self.scale * k)
+        return ctx
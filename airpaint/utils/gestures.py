@@ -1,4 +1,24 @@
 import math
+from collections import namedtuple
+
+# ============================
+# Índices dos landmarks da mão (MediaPipe Hands, 21 pontos)
+# ============================
+# Pontas do indicador, médio, anelar e mindinho: 8, 12, 16, 20
+# (a articulação comparada com cada ponta é a que está 2 nós abaixo: tip - 2)
+# Polegar / indicador (pinça): 4 e 8
+
+# Distância (normalizada) entre polegar (4) e indicador (8) abaixo da qual há pinça
+PINCH_THRESHOLD = 0.045
+
+# HandFeatures: tudo o que os gestos precisam de uma mão, calculado uma vez por frame
+# - up: tuplo (4,) de bools com os dedos levantados (indicador, médio, anelar, mindinho)
+# - count: nº de dedos levantados (0 a 4)
+# - pinch_dist: distância polegar-indicador (x, y)
+# - pinch: True se pinch_dist < PINCH_THRESHOLD
+# - fist: True se pelo menos 3 dedos estiverem fechados
+HandFeatures = namedtuple("HandFeatures", ["up", "count", "pinch_dist", "pinch", "fist"])
+
 
 def dist(a, b):
     """
@@ -11,86 +31,183 @@ def dist(a, b):
     """
     return math.dist([a.x, a.y], [b.x, b.y])
 
-def fingers_up(lm):
+def hand_features(lm):
     """
-    Conta quantos dedos (indicador, médio, anelar, mindinho) estão levantados.
+    Calcula todas as features dos gestos de uma mão numa única passagem,
+    lendo cada landmark necessário uma só vez.
 
     Estratégia:
-    - Usa os índices dos 'tips' (pontas dos dedos): 8, 12, 16, 20.
-    - Compara a coordenada y da ponta (tip) com a da articulação 2 nós abaixo (tip-2).
-      Se tip.y < (tip-2).y, o dedo está "para cima" (mais alto na imagem).
+    - Dedo "levantado" se a ponta (tip) estiver acima (y menor) do nó 2 abaixo (tip-2);
+      "fechado" se estiver abaixo (y maior).
+    - Pinça se a distância entre as pontas do polegar (4) e do indicador (8) for
+      menor do que PINCH_THRESHOLD.
+    - Punho se pelo menos 3 dedos estiverem fechados.
 
     Retorno:
-    - int: número de dedos levantados (0 a 4).
+    - HandFeatures, ou None se não houver mão (lm None)
     """
     if lm is None:
-        return 0
-    tips = [8, 12, 16, 20]
-    count = 0
-    for tip in tips:
-        if lm[tip].y < lm[tip - 2].y:
-            count += 1
-    return count
+        return None
+
+    # Coordenada y de cada ponta e da articulação 2 nós abaixo (lidas uma só vez)
+    b1, t1 = lm[6].y, lm[8].y
+    b2, t2 = lm[10].y, lm[12].y
+    b3, t3 = lm[14].y, lm[16].y
+    b4, t4 = lm[18].y, lm[20].y
 
-def pinch(lm):
+    up = (t1 < b1, t2 < b2, t3 < b3, t4 < b4)
+    closed = (t1 > b1) + (t2 > b2) + (t3 > b3) + (t4 > b4)
+
+    thumb = lm[4]
+    index = lm[8]
+    pinch_dist = math.hypot(thumb.x - index.x, thumb.y - index.y)
+
+    return HandFeatures(
+        up,
+        up.count(True),
+        pinch_dist,
+        pinch_dist < PINCH_THRESHOLD,
+        closed >= 3,
+    )
+
+def _features(hand):
     """
-    Deteta o gesto de 'pinça' (polegar + indicador próximos).
+    Aceita HandFeatures (já calculadas) ou landmarks (calcula-as agora).
+    """
+    if hand is None or isinstance(hand, HandFeatures):
+        return hand
+    return hand_features(hand)
 
-    Estratégia:
-    - Calcula a distância entre:
-      - landmark 4 (ponta do polegar)
-      - landmark 8 (ponta do indicador)
-    - Se a distância for menor que um limiar (0.045), considera pinça.
+# ============================
+# Predicados (leitura direta das HandFeatures)
+# ============================
+# Todos aceitam as HandFeatures de hand_features() (o caminho normal, calculadas uma
+# vez por mão e por frame) ou os landmarks da mão, como antes.
+
+def fingers_up(hand):
+    """
+    Conta quantos dedos (indicador, médio, anelar, mindinho) estão levantados.
+
+    Retorno:
+    - int: número de dedos levantados (0 a 4).
+    """
+    hand = _features(hand)
+    return 0 if hand is None else hand.count
+
+def pinch(hand):
+    """
+    Deteta o gesto de 'pinça' (polegar + indicador próximos).
 
     Retorno:
     - bool: True se estiver em pinça, False caso contrário.
     """
-    if lm is None:
-        return False
-    return dist(lm[4], lm[8]) < 0.045
+    hand = _features(hand)
+    return hand is not None and hand.pinch
 
-def one_finger(lm):
+def one_finger(hand):
     """
     Verifica se há exatamente 1 dedo levantado.
     """
-    return lm is not None and fingers_up(lm) == 1
+    return fingers_up(hand) == 1
 
-def two_fingers(lm):
+def two_fingers(hand):
     """
     Verifica se há exatamente 2 dedos levantados.
     """
-    return lm is not None and fingers_up(lm) == 2
+    return fingers_up(hand) == 2
 
-def three_fingers(lm):
+def three_fingers(hand):
     """
     Verifica se há exatamente 3 dedos levantados.
     """
-    return lm is not None and fingers_up(lm) == 3
+    return fingers_up(hand) == 3
 
-def four_fingers(lm):
+def four_fingers(hand):
     """
     Verifica se há exatamente 4 dedos levantados.
     """
-    return lm is not None and fingers_up(lm) == 4
+    return fingers_up(hand) == 4
 
-def is_fist(lm):
+def is_fist(hand):
     """
-    Deteta se a mão está em punho (fist).
-
-    Estratégia:
-    - Usa os mesmos 'tips' dos dedos (8, 12, 16, 20).
-    - Considera um dedo "fechado" se a ponta estiver abaixo (y maior) do nó 2 abaixo (tip-2):
-      lm[tip].y > lm[tip-2].y
-    - Se pelo menos 3 dedos estiverem fechados, assume punho.
+    Deteta se a mão está em punho (fist): pelo menos 3 dedos fechados.
 
     Retorno:
     - bool: True se for punho, False caso contrário.
     """
-    if lm is None:
-        return False
-    tips = [8, 12, 16, 20]
-    closed = 0
-    for tip in tips:
-        if lm[tip].y > lm[tip - 2].y:
-            closed += 1
-    return closed >= 3
\ No newline at end of file
+    hand = _features(hand)
+    return hand is not None and hand.fist
+
+# ============================
+# Gestos do corpo e da face (Pose / FaceMesh)
+# ============================
+# Partilhados pelos backends de MediaPipe (modelos separados ou Holistic)
+
+# Índices dos landmarks da Pose usados para os braços
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+
+# Índices dos landmarks da FaceMesh usados para o sorriso:
+# - 13: região do lábio superior (ponto central superior)
+# - 61 / 291: cantos esquerdo / direito da boca
+UPPER_LIP, LEFT_MOUTH, RIGHT_MOUTH = 13, 61, 291
+
+# Número de frames consecutivos necessário para considerar "sorriso confirmado"
+# (ajuda a reduzir falsos positivos por ruído)
+SMILE_FRAMES = 5
+
+# O mesmo critério em tempo (o 5º frame seguido a ~30 fps chega 4/30 s depois do 1º),
+# para a histerese continuar correta quando o sorriso é avaliado a ritmos mais baixos
+SMILE_HOLD_TIME = (SMILE_FRAMES - 1) / 30
+
+def arms_up(landmarks):
+    """
+    Determina se os braços estão levantados a partir dos landmarks da Pose.
+
+    Braço "levantado" se o pulso estiver pelo menos 0.05 acima do ombro
+    (lembrar: em imagem, y menor = mais acima).
+
+    Retorno:
+    - (right_up, left_up)
+    """
+    right_up = landmarks[RIGHT_WRIST].y < landmarks[RIGHT_SHOULDER].y - 0.05
+    left_up = landmarks[LEFT_WRIST].y < landmarks[LEFT_SHOULDER].y - 0.05
+    return right_up, left_up
+
+def smiling_now(landmarks):
+    """
+    Sorriso "instantâneo" (neste frame) a partir dos landmarks da FaceMesh.
+
+    Mede a diferença vertical (coordenadas normalizadas) entre o lábio superior e
+    cada canto da boca; se ambos os lados excederem o limiar, está a sorrir.
+    """
+    upper_lip = landmarks[UPPER_LIP]
+    left_height = upper_lip.y - landmarks[LEFT_MOUTH].y
+    right_height = upper_lip.y - landmarks[RIGHT_MOUTH].y
+    return left_height > 0.008 and right_height > 0.008
+
+class SmileFilter:
+    """
+    Histerese do sorriso: só confirma o sorriso depois de 'hold' segundos seguidos a sorrir.
+
+    Baseada nos timestamps dos frames (e não no nº de frames), por isso dá o mesmo
+    resultado qualquer que seja o ritmo a que o sorriso é avaliado.
+    """
+
+    def __init__(self, hold=SMILE_HOLD_TIME):
+        self.hold = hold
+
+        # Instante do primeiro frame da sequência atual a sorrir (None = não está a sorrir)
+        self.smile_start = None
+
+    def update(self, smiling, now):
+        """
+        Atualiza a histerese com o resultado do frame (no instante 'now', em segundos)
+        e devolve o estado estável.
+        """
+        if not smiling:
+            self.smile_start = None
+            return False
+        if self.smile_start is None:
+            self.smile_start = now
+        return now - self.smile_start >= self.hold
@@ -1,24 +1,68 @@
 import mediapipe as mp
 import cv2
+import numpy as np
+
+import config as cfg
 
 # Referência ao módulo de deteção de mãos do MediaPipe.
 mp_hands = mp.solutions.hands
 
-# Instância do detector de mãos:
-# - max_num_hands=2: deteta até duas mãos em simultâneo
-# - min_detection_confidence=0.7: confiança mínima para a deteção inicial
-# - min_tracking_confidence=0.6: confiança mínima para o tracking entre frames
-hands = mp_hands.Hands(
-    max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.6
-)
 
+def create_hands():
+    """
+    Cria uma instância do detector de mãos:
+    - max_num_hands=2: deteta até duas mãos em simultâneo
+    - min_detection_confidence=0.7: confiança mínima para a deteção inicial
+    - min_tracking_confidence=0.6: confiança mínima para o tracking entre frames
+    """
+    return mp_hands.Hands(
+        max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.6
+    )
+
+
+class HandState:
+    """
+    Grafos e estado entre frames do detector de mãos de uma câmara (criado pela Inference).
+
+    - hands: grafo para o frame completo
+    - hands_roi: segundo grafo, só no modo ROI (recebe um mosaico com os recortes das
+      mãos, por isso tem o seu próprio estado de tracking)
+    - mosaic: mosaico RGB (altura S, largura 2*S) dos recortes, reutilizado entre frames
+    - last_hands: últimas mãos encontradas (landmarks em coordenadas do frame completo)
+    """
+
+    def __init__(self, roi=False):
+        self.hands = create_hands()
+        self.hands_roi = create_hands() if roi else None
+        self.mosaic = None
+        self.last_hands = []
+
+    def close(self):
+        self.hands.close()
+        if self.hands_roi is not None:
+            self.hands_roi.close()
+
+# ============================
+# Modo ROI (recortes à volta das mãos)
+# ============================
+# Índices dos landmarks da Pose usados para estimar onde está cada mão
+# (pulso, cotovelo) para o lado esquerdo e direito
+POSE_ARMS = ((15, 13), (16, 14))
+
+# Visibilidade mínima dos landmarks da Pose para confiar no pulso/cotovelo
+MIN_VISIBILITY = 0.3
 
-def detect_hands(frame):
+
+def detect_hands(ctx, state):
     """
     Deteta mãos num frame e devolve informação útil para interação (landmarks e posição).
 
+    Parâmetros:
+    - ctx: FrameContext do frame (ver frame_context.py)
+    - state: HandState da câmara
+
     O que faz:
-    - Converte o frame BGR -> RGB (MediaPipe espera RGB).
+    - Usa a versão RGB partilhada do frame (ctx.rgb; MediaPipe espera RGB).
     - Corre o modelo Hands do MediaPipe.
     - Se existirem mãos detetadas:
       - para cada mão, extrai os landmarks (lista de pontos)
@@ -36,13 +80,10 @@ def detect_hands(frame):
     - right_hand_obj: objeto do MediaPipe com a mão direita (para desenhar landmarks), ou None
     """
     # Dimensões do frame (altura e largura)
-    h, w, _ = frame.shape
-
-    # Conversão para RGB para processamento pelo MediaPipe
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w = ctx.h, ctx.w
 
-    # Processa o frame para deteção de mãos
-    results = hands.process(rgb)
+    # Processa o frame (RGB partilhado) para deteção de mãos
+    results = state.hands.process(ctx.rgb)
 
     # Inicializa as variáveis de saída como None (caso não haja deteções)
     left_lm = None
@@ -79,4 +120,138 @@ def detect_hands(frame):
                 right_pos = (x, y)
 
     # Devolve o frame e toda a informação recolhida
-    return frame, left_lm, right_lm, left_pos, right_pos, left_hand_obj, right_hand_obj
\ No newline at end of file
+    return ctx.bgr, left_lm, right_lm, left_pos, right_pos, left_hand_obj, right_hand_obj
+
+
+def _hand_rois(last_hands, pose_lms, w, h):
+    """
+    Calcula até duas regiões quadradas (cx, cy, lado) em pixels onde devem estar as mãos.
+
+    - Primeiro usa as mãos do frame anterior (box dos 21 pontos, alargada).
+    - Depois completa com a Pose: a mão fica no prolongamento do antebraço (cotovelo -> pulso).
+    """
+    rois = []
+
+    for lm in last_hands:
+        xs = [p.x * w for p in lm]
+        ys = [p.y * h for p in lm]
+        side = max(max(xs) - min(xs), max(ys) - min(ys)) * 1.8
+        rois.append(((max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2, max(side, 64)))
+
+    if pose_lms is not None and len(rois) < 2:
+        points = pose_lms.landmark
+        for wrist_i, elbow_i in POSE_ARMS:
+            wrist, elbow = points[wrist_i], points[elbow_i]
+            if getattr(wrist, "visibility", 1.0) < MIN_VISIBILITY:
+                continue
+
+            wx, wy = wrist.x * w, wrist.y * h
+            ex, ey = elbow.x * w, elbow.y * h
+            forearm = np.hypot(wx - ex, wy - ey)
+
+            # Centro da mão: um pouco para lá do pulso, na direção do antebraço
+            cx = wx + (wx - ex) * 0.4
+            cy = wy + (wy - ey) * 0.4
+
+            # Ignora se esta mão já está coberta por uma ROI das mãos anteriores
+            if any(abs(cx - rx) < rs / 2 and abs(cy - ry) < rs / 2 for rx, ry, rs in rois):
+                continue
+            rois.append((cx, cy, max(forearm * 1.4, 64)))
+
+    return rois[:2]
+
+
+def _remap(hand_obj, roi, tile, size, w, h):
+    """
+    Converte (no próprio objeto do MediaPipe) os landmarks do mosaico para coordenadas
+    normalizadas do frame completo.
+    """
+    cx, cy, side = roi
+    x0 = cx - side / 2
+    y0 = cy - side / 2
+    k = side / size
+    for p in hand_obj.landmark:
+        px = p.x * 2 * size - tile * size
+        py = p.y * size
+        p.x = (x0 + px * k) / w
+        p.y = (y0 + py * k) / h
+        p.z = p.z * 2 * side / w
+
+
+def detect_hands_roi(ctx, state, pose_lms=None):
+    """
+    Igual a detect_hands, mas corre o modelo só em recortes à volta das mãos.
+
+    O que faz:
+    - Estima onde estão as mãos (mãos do frame anterior e/ou pulsos/cotovelos da Pose).
+    - Coloca cada região (redimensionada para HAND_ROI_SIZE) num mosaico lado a lado
+      e corre o MediaPipe Hands só nesse mosaico (imagem pequena, independente da
+      resolução da câmara).
+    - Converte os landmarks de volta para o frame completo, por isso left_pos/right_pos,
+      gestos (pinch, ...) e o debug continuam a funcionar sem alterações.
+    - Se não houver regiões, ou se nenhuma mão for encontrada nelas, usa detect_hands
+      sobre o frame completo.
+
+    Parâmetros:
+    - ctx: FrameContext do frame (os recortes são feitos diretamente sobre ctx.rgb)
+    - state: HandState da câmara (criado com roi=True)
+    - pose_lms: pose_landmarks devolvidos por detect_pose (ou None)
+
+    Retorno: o mesmo tuplo de detect_hands.
+    """
+    h, w = ctx.h, ctx.w
+    size = cfg.HAND_ROI_SIZE
+    rois = _hand_rois(state.last_hands, pose_lms, w, h)
+
+    if not rois:
+        result = detect_hands(ctx, state)
+        state.last_hands = [lm for lm in result[1:3] if lm is not None]
+        return result
+
+    mosaic = state.mosaic
+    if mosaic is None or mosaic.shape[0] != size:
+        mosaic = state.mosaic = np.zeros((size, 2 * size, 3), np.uint8)
+    else:
+        mosaic[:] = 0
+
+    # Recorte de cada ROI (com borda preta fora do frame) já redimensionado para size x size
+    # (feito a partir do RGB partilhado, por isso o mosaico já está em RGB)
+    for tile, (cx, cy, side) in enumerate(rois):
+        k = size / side
+        M = np.float32([[k, 0, (side / 2 - cx) * k], [0, k, (side / 2 - cy) * k]])
+        mosaic[:, tile * size:(tile + 1) * size] = cv2.warpAffine(
+            ctx.rgb, M, (size, size), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT
+        )
+
+    results = state.hands_roi.process(mosaic)
+
+    if not results.multi_hand_landmarks:
+        result = detect_hands(ctx, state)
+        state.last_hands = [lm for lm in result[1:3] if lm is not None]
+        return result
+
+    left_lm = right_lm = None
+    left_hand_obj = right_hand_obj = None
+    left_pos = right_pos = None
+
+    for idx, handLms in enumerate(results.multi_hand_landmarks):
+        # Mosaico -> frame completo, usando a ROI onde está o pulso (landmark 0)
+        tile = min(int(handLms.landmark[0].x * 2), len(rois) - 1)
+        _remap(handLms, rois[tile], tile, size, w, h)
+
+        lm = handLms.landmark
+        x = int(lm[8].x * w)
+        y = int(lm[8].y * h)
+
+        hand_label = results.multi_handedness[idx].classification[0].label
+        if hand_label == "Left":
+            left_lm = lm
+            left_hand_obj = handLms
+            left_pos = (x, y)
+        else:
+            right_lm = lm
+            right_hand_obj = handLms
+            right_pos = (x, y)
+
+    state.last_hands = [lm for lm in (left_lm, right_lm) if lm is not None]
+    return ctx.bgr, left_lm, right_lm, left_pos, right_pos, left_hand_obj, right_hand_obj
@@ -0,0 +1,195 @@
+import zlib
+from collections import deque, namedtuple
+
+import numpy as np
+
+# Step: um passo de undo (normalmente um traço completo)
+# - tool: ferramenta que gerou o passo ("brush", "spray", "eraser", "clear", ...)
+# - tiles: lista de (chave_do_tile, patch_antes, patch_depois)
+# - nbytes: memória ocupada pelos patches guardados
+Step = namedtuple("Step", ["tool", "tiles", "nbytes"])
+
+
+class UndoHistory:
+    """
+    Histórico de undo/redo baseado em deltas (só guarda as zonas alteradas do canvas).
+
+    Ideia geral:
+    - O canvas é dividido em tiles (ex.: 64x64 px).
+    - Antes de cada operação de desenho, touch() recebe o retângulo que vai ser
+      alterado e guarda o conteúdo "antes" dos tiles tocados pela primeira vez no traço.
+    - Frames seguidos da mesma ferramenta (ex.: pinça mantida) pertencem ao mesmo traço;
+      end_stroke() fecha o traço, guarda o conteúdo "depois" dos mesmos tiles
+      e empilha um único passo de undo.
+    - Tiles totalmente pretos não ocupam memória (guardados como None) e os restantes
+      podem opcionalmente ser comprimidos com zlib.
+    - Em vez de um número máximo de estados, o histórico tem um orçamento em bytes:
+      quando é ultrapassado, os passos mais antigos são descartados.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, tile=64, compress=False):
+        """
+        Parâmetros:
+        - max_bytes: memória máxima (undo + redo) ocupada pelos patches
+        - tile: lado (px) de cada tile
+        - compress: comprimir os patches com zlib (menos memória, mais CPU)
+        """
+        self.max_bytes = max_bytes
+        self.tile = tile
+        self.compress = compress
+
+        # Pilhas de passos: deque permite descartar o mais antigo em O(1)
+        self.undo_steps = deque()
+        self.redo_steps = []
+
+        # Memória total ocupada por todos os passos guardados
+        self.nbytes = 0
+
+        # Traço aberto: canvas, ferramenta e { chave_do_tile: patch_antes }
+        self._canvas = None
+        self._tool = None
+        self._before = {}
+
+    # ============================
+    # Tiles e patches
+    # ============================
+
+    def _tile_slices(self, key):
+        ty, tx = key
+        t = self.tile
+        return slice(ty * t, (ty + 1) * t), slice(tx * t, (tx + 1) * t)
+
+    def _pack(self, patch):
+        """
+        Converte um patch do canvas no formato guardado (None se estiver todo a preto).
+        """
+        if not patch.any():
+            return None
+        if self.compress:
+            return zlib.compress(patch.tobytes(), 1)
+        return patch.copy()
+
+    def _unpack(self, data, target):
+        """
+        Escreve um patch guardado de volta no canvas (target é a view do tile).
+        """
+        if data is None:
+            target[:] = 0
+        elif self.compress:
+            target[:] = np.frombuffer(zlib.decompress(data), np.uint8).reshape(target.shape)
+        else:
+            target[:] = data
+
+    @staticmethod
+    def _size(data):
+        if data is None:
+            return 0
+        if isinstance(data, bytes):
+            return len(data)
+        return data.nbytes
+
+    # ============================
+    # Registo de traços
+    # ============================
+
+    def touch(self, canvas, x1, y1, x2, y2, tool=None):
+        """
+        Indica que o retângulo [x1, x2) x [y1, y2) do canvas vai ser alterado.
+
+        Deve ser chamado ANTES de desenhar. Se a ferramenta mudar (ou o canvas for
+        outro), o traço anterior é fechado e começa um novo.
+        """
+        if self._canvas is not None and (tool != self._tool or canvas is not self._canvas):
+            self.end_stroke()
+
+        self._canvas = canvas
+        self._tool = tool
+
+        h, w = canvas.shape[:2]
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(w, x2), min(h, y2)
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        t = self.tile
+        for ty in range(y1 // t, (y2 - 1) // t + 1):
+            for tx in range(x1 // t, (x2 - 1) // t + 1):
+                key = (ty, tx)
+                if key not in self._before:
+                    self._before[key] = self._pack(canvas[self._tile_slices(key)])
+
+    def end_stroke(self):
+        """
+        Fecha o traço aberto (se existir) e empilha-o como um passo de undo.
+        """
+        if self._canvas is None:
+            return
+
+        canvas = self._canvas
+        tool = self._tool
+        tiles = []
+        nbytes = 0
+        for key, before in self._before.items():
+            after = self._pack(canvas[self._tile_slices(key)])
+            tiles.append((key, before, after))
+            nbytes += self._size(before) + self._size(after)
+
+        self._canvas = None
+        self._tool = None
+        self._before = {}
+
+        if not tiles:
+            return
+
+        # Um traço novo invalida o que estava para refazer
+        for step in self.redo_steps:
+            self.nbytes -= step.nbytes
+        self.redo_steps.clear()
+
+        self.undo_steps.append(Step(tool, tiles, nbytes))
+        self.nbytes += nbytes
+
+        # Respeita o orçamento de memória (mantém pelo menos o passo mais recente)
+        while self.nbytes > self.max_bytes and len(self.undo_steps) > 1:
+            self.nbytes -= self.undo_steps.popleft().nbytes
+
+    # ============================
+    # Undo / redo
+    # ============================
+
+    def _apply(self, canvas, step, index):
+        """
+        Escreve no canvas os patches 'antes' (index=1) ou 'depois' (index=2) de um passo.
+
+        Devolve a lista de retângulos (x1, y1, x2, y2) alterados.
+        """
+        rects = []
+        t = self.tile
+        for tile in step.tiles:
+            key = tile[0]
+            ys, xs = self._tile_slices(key)
+            self._unpack(tile[index], canvas[ys, xs])
+            rects.append((key[1] * t, key[0] * t, (key[1] + 1) * t, (key[0] + 1) * t))
+        return rects
+
+    def undo(self, canvas):
+        """
+        Desfaz o último passo. Devolve os retângulos restaurados (lista vazia se não houver nada).
+        """
+        self.end_stroke()
+        if not self.undo_steps:
+            return []
+        step = self.undo_steps.pop()
+        self.redo_steps.append(step)
+        return self._apply(canvas, step, 1)
+
+    def redo(self, canvas):
+        """
+        Refaz o último passo desfeito. Devolve os retângulos alterados.
+        """
+        self.end_stroke()
+        if not self.redo_steps:
+            return []
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        return self._apply(canvas, step, 2)
@@ -0,0 +1,98 @@
+import mediapipe as mp
+
+from gestures import SMILE_HOLD_TIME, SmileFilter, arms_up, smiling_now
+
+# ============================
+# Backend MediaPipe Holistic
+# ============================
+# Um único grafo (Holistic) devolve pose, as duas mãos e a face de cada frame,
+# em vez dos três grafos separados de pose.py, hands.py e face.py.
+# Os resultados são adaptados aos mesmos formatos de detect_pose, detect_hands e
+# detect_smile, por isso o resto da aplicação não muda (ver config.MEDIAPIPE_BACKEND).
+mp_holistic = mp.solutions.holistic
+
+
+def create_holistic():
+    """
+    Cria uma instância do Holistic:
+    - refine_face_landmarks=True: mesmos landmarks da face que o FaceMesh com refine
+    - thresholds de confiança iguais aos da Pose
+    """
+    return mp_holistic.Holistic(
+        refine_face_landmarks=True,
+        min_detection_confidence=0.6,
+        min_tracking_confidence=0.6,
+    )
+
+
+class HolisticState:
+    """
+    Grafo Holistic e histerese do sorriso de uma câmara (criado pela Inference).
+    """
+
+    def __init__(self):
+        self.holistic = create_holistic()
+        self.smile_filter = SmileFilter(SMILE_HOLD_TIME)
+
+    def close(self):
+        self.holistic.close()
+
+
+def detect_holistic(ctx, state):
+    """
+    Corre o Holistic uma vez sobre o frame e devolve os resultados nos formatos antigos.
+
+    Parâmetros:
+    - ctx: FrameContext do frame (ver frame_context.py)
+    - state: HolisticState da câmara
+
+    Retorno:
+    - (pose, hands, face), com:
+      - pose = (right_up, left_up, pose_landmarks), como detect_pose
+      - hands = (frame, left_lm, right_lm, left_pos, right_pos, left_hand_obj, right_hand_obj),
+        como detect_hands
+      - face = (smile_state, face_landmarks), como detect_smile
+    """
+    h, w = ctx.h, ctx.w
+    results = state.holistic.process(ctx.rgb)
+
+    # Pose: braços levantados (pulso acima do ombro)
+    pose_lms = results.pose_landmarks
+    if pose_lms:
+        right_up, left_up = arms_up(pose_lms.landmark)
+        pose = (right_up, left_up, pose_lms)
+    else:
+        pose = (False, False, None)
+
+    # Mãos: o Holistic decide o lado pela Pose, que assume uma imagem NÃO espelhada,
+    # enquanto os labels "Left"/"Right" do Hands assumem uma imagem espelhada. Como o
+    # frame chega espelhado (cv2.flip em main.py, replay.py e session.py), a mão
+    # "esquerda" do Holistic é a "Right" do Hands: troca-se para manter os mesmos papéis.
+    left_hand_obj = results.right_hand_landmarks
+    right_hand_obj = results.left_hand_landmarks
+    left_lm = left_hand_obj.landmark if left_hand_obj else None
+    right_lm = right_hand_obj.landmark if right_hand_obj else None
+
+    # Posição (px) da ponta do indicador (landmark 8)
+    left_pos = (int(left_lm[8].x * w), int(left_lm[8].y * h)) if left_lm else None
+    right_pos = (int(right_lm[8].x * w), int(right_lm[8].y * h)) if right_lm else None
+
+    hands = (
+        ctx.bgr,
+        left_lm,
+        right_lm,
+        left_pos,
+        right_pos,
+        left_hand_obj if left_hand_obj else None,
+        right_hand_obj if right_hand_obj else None,
+    )
+
+    # Face: sorriso com a mesma histerese de face.detect_smile
+    face_lms = results.face_landmarks
+    if face_lms:
+        face = (state.smile_filter.update(smiling_now(face_lms.landmark), ctx.stamp), face_lms)
+    else:
+        state.smile_filter.update(False, ctx.stamp)
+        face = (False, None)
+
+    return pose, hands, face
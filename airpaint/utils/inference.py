@@ -0,0 +1,209 @@
+import config as cfg
+from yolo_detector import TrackerState, detector
+from pipeline import Pipeline
+from results import FrameResults, EMPTY_RESULTS
+from profiler import Profiler
+from frame_context import FrameContext
+
+
+class Inference:
+    """
+    Corre todos os modelos (Pose, Hands, FaceMesh, YOLO) sobre um frame.
+
+    - Modo sequencial: cada modelo corre à vez no thread que chama infer().
+    - Modo assíncrono: cada modelo corre na sua própria thread (ver pipeline.py)
+      e infer() devolve o resultado mais recente de cada um, sem esperar.
+
+    Se for passado um Profiler, o tempo de cada modelo é medido como uma etapa
+    ("pose", "hands", "face", "objects"), em qualquer dos modos.
+
+    Com config.HAND_ROI, as mãos são procuradas só à volta dos pulsos da Pose
+    (ver hands.detect_hands_roi): em modo sequencial usa a Pose do próprio frame,
+    em modo assíncrono a Pose mais recente disponível. O mesmo para o sorriso em
+    modo rápido (config.SMILE_FAST, ver face.detect_smile_fast), que usa a Pose para
+    localizar a face.
+
+    Backend MediaPipe (config.MEDIAPIPE_BACKEND):
+    - "separate": três grafos (pose.py, hands.py, face.py), um estágio cada.
+    - "holistic": um único grafo Holistic (holistic.py) num só estágio, adaptado aos
+      mesmos formatos; a resolução usada é a de "pose" e HAND_ROI não se aplica.
+    Só os módulos do backend escolhido são importados.
+
+    Estado por câmara: cada Inference cria os seus grafos MediaPipe (que guardam
+    tracking e suavização entre frames), a histerese do sorriso, o estado do tracking
+    do YOLO (TrackerState) e o filtro das mãos, e passa-os explicitamente às funções
+    dos modelos. Várias Inference (uma por sessão, ver session.py) partilham apenas o
+    modelo YOLO, que não guarda estado entre frames.
+
+    Com config.HAND_SMOOTHING, cada deteção nova das mãos passa pelo filtro One Euro
+    (smoothing.HandSmoother, na thread do modelo) e infer() devolve as mãos suavizadas,
+    com a ponta do indicador da mão que desenha extrapolada até ao instante do frame
+    atual, mesmo sem inferência nova (os landmarks dos gestos não são extrapolados).
+
+    Cada frame é embrulhado num FrameContext (ver frame_context.py), partilhado por
+    todos os modelos: a conversão para RGB é feita uma única vez por resolução.
+
+    Resolução de inferência (config.INFERENCE_WIDTH):
+    - Cada modelo recebe uma versão reduzida do frame (largura alvo por modelo,
+      mantendo a proporção); modelos com a mesma largura partilham o mesmo contexto.
+    - Os resultados são devolvidos sempre no espaço do frame/canvas: os landmarks
+      já são normalizados (0..1), left_pos/right_pos são recalculados à escala do
+      frame e as boxes do YOLO são convertidas antes dos filtros de tamanho.
+    """
+
+    def __init__(self, async_mode=False, queue_depth=1, profiler=None):
+        profiler = profiler or Profiler()
+        self.holistic = cfg.MEDIAPIPE_BACKEND == "holistic"
+
+        # states: grafos MediaPipe desta Inference (fechados em stop())
+        if self.holistic:
+            from holistic import HolisticState, detect_holistic
+
+            self.holistic_state = HolisticState()
+            self.states = [self.holistic_state]
+            self.detect_holistic = profiler.timed("holistic")(detect_holistic)
+        else:
+            from hands import HandState, detect_hands, detect_hands_roi
+            from pose import create_pose, detect_pose
+            from face import SmileState, detect_smile, detect_smile_fast
+
+            self.pose = create_pose()
+            self.hand_state = HandState(roi=cfg.HAND_ROI)
+            self.smile_state = SmileState(fast=cfg.SMILE_FAST)
+            self.states = [self.pose, self.hand_state, self.smile_state]
+            self.detect_pose = profiler.timed("pose")(detect_pose)
+            self.detect_hands = profiler.timed("hands")(detect_hands_roi if cfg.HAND_ROI else detect_hands)
+            self.detect_smile = profiler.timed("face")(detect_smile_fast if cfg.SMILE_FAST else detect_smile)
+
+        self.tracker = TrackerState()
+        self.detect_objects = profiler.timed("objects")(detector.detect)
+
+        self.smoother = None
+        if cfg.HAND_SMOOTHING:
+            from smoothing import HandSmoother
+
+            self.smoother = HandSmoother(
+                cfg.HAND_SMOOTHING_MIN_CUTOFF,
+                cfg.HAND_SMOOTHING_BETA,
+                cfg.HAND_SMOOTHING_D_CUTOFF,
+                cfg.HAND_PREDICT,
+                cfg.HAND_PREDICT_MAX,
+            )
+
+        self.pipeline = None
+        if async_mode:
+            self.pipeline = Pipeline(queue_depth)
+            if self.holistic:
+                self.pipeline.add_stage("holistic", self._holistic)
+            else:
+                self.pipeline.add_stage("pose", self._pose)
+                self.pipeline.add_stage("hands", self._hands_async)
+                self.pipeline.add_stage("face", self._face_async)
+            self.pipeline.add_stage("objects", self._objects)
+            self.pipeline.start()
+
+    def infer(self, frame, stamp=None):
+        """
+        Devolve os FrameResults para o frame (que não deve ser alterado depois).
+        """
+        ctx = FrameContext(frame, stamp)
+
+        if self.pipeline is not None:
+            # Envia o contexto a todos os estágios e usa o resultado mais recente de cada um
+            self.pipeline.submit(ctx)
+            latest = self.pipeline.latest
+            if self.holistic:
+                pose, hands, face = latest("holistic", EMPTY_RESULTS[:3])
+            else:
+                pose = latest("pose", EMPTY_RESULTS.pose)
+                hands = latest("hands", EMPTY_RESULTS.hands)
+                face = latest("face", EMPTY_RESULTS.face)
+            objects = latest("objects", EMPTY_RESULTS.objects)
+        elif self.holistic:
+            pose, hands, face = self._holistic(ctx)
+            objects = self._objects(ctx)
+        else:
+            pose = self._pose(ctx)
+            hands = self._hands(ctx, pose[2])
+            face = self._face(ctx, pose[2])
+            objects = self._objects(ctx)
+
+        # Mãos suavizadas e previstas para o instante deste frame
+        if self.smoother is not None:
+            hands = self.smoother.apply(hands, ctx.h, ctx.w, ctx.stamp)
+        return FrameResults(pose, hands, face, objects)
+
+    # ============================
+    # Modelos (cada um recebe o contexto do frame original e devolve
+    # resultados no espaço do frame, mesmo quando corre numa versão reduzida)
+    # ============================
+
+    def _pose(self, ctx):
+        return self.detect_pose(ctx.scaled(cfg.INFERENCE_WIDTH.get("pose")), self.pose)
+
+    def _face(self, ctx, pose_lms=None):
+        small = ctx.scaled(cfg.INFERENCE_WIDTH.get("face"))
+        if cfg.SMILE_FAST:
+            return self.detect_smile(small, self.smile_state, pose_lms)
+        return self.detect_smile(small, self.smile_state)
+
+    def _objects(self, ctx):
+        # O YOLO faz o seu próprio pré-processamento a partir do BGR
+        small = ctx.scaled(cfg.INFERENCE_WIDTH.get("objects"))
+        return self.detect_objects(small.bgr, small.scale, self.tracker)
+
+    def _hands(self, ctx, pose_lms=None):
+        small = ctx.scaled(cfg.INFERENCE_WIDTH.get("hands"))
+        if cfg.HAND_ROI:
+            result = self.detect_hands(small, self.hand_state, pose_lms)
+        else:
+            result = self.detect_hands(small, self.hand_state)
+        return self._observe(ctx, self._remap_hands(ctx, small, result))
+
+    def _holistic(self, ctx):
+        small = ctx.scaled(cfg.INFERENCE_WIDTH.get("pose"))
+        pose, hands, face = self.detect_holistic(small, self.holistic_state)
+        return pose, self._observe(ctx, self._remap_hands(ctx, small, hands)), face
+
+    def _observe(self, ctx, hands):
+        """
+        Entrega uma deteção nova das mãos ao filtro de suavização (se estiver ligado).
+        """
+        if self.smoother is not None:
+            self.smoother.observe(hands, ctx.stamp)
+        return hands
+
+    def _remap_hands(self, ctx, small, result):
+        """
+        Converte o resultado das mãos obtido em 'small' para o espaço do frame de ctx.
+        """
+        if small is ctx:
+            return result
+
+        # Posição do indicador recalculada à escala do frame (os landmarks são normalizados)
+        h, w = ctx.h, ctx.w
+        _, left_lm, right_lm, _, _, left_obj, right_obj = result
+        left_pos = (int(left_lm[8].x * w), int(left_lm[8].y * h)) if left_lm else None
+        right_pos = (int(right_lm[8].x * w), int(right_lm[8].y * h)) if right_lm else None
+        return ctx.bgr, left_lm, right_lm, left_pos, right_pos, left_obj, right_obj
+
+    def _latest_pose(self):
+        return self.pipeline.latest("pose", EMPTY_RESULTS.pose)[2]
+
+    def _hands_async(self, ctx):
+        """
+        Estágio "hands" do pipeline (no modo ROI recebe a Pose mais recente).
+        """
+        return self._hands(ctx, self._latest_pose() if cfg.HAND_ROI else None)
+
+    def _face_async(self, ctx):
+        """
+        Estágio "face" do pipeline (no modo rápido recebe a Pose mais recente).
+        """
+        return self._face(ctx, self._latest_pose() if cfg.SMILE_FAST else None)
+
+    def stop(self):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        for state in self.states:
+            state.close()
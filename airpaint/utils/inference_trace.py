@@ -0,0 +1,123 @@
+import json
+
+from results import FrameResults, Detection, Landmark, LandmarkList
+
+# ============================
+# Gravação / leitura de resultados de inferência
+# ============================
+# Formato JSON-lines:
+# - 1ª linha (cabeçalho): {"width": w, "height": h}
+# - uma linha por frame: {"id", "t", "pose", "hands", "face", "objects"}
+# Os landmarks são guardados como listas [x, y, z] (coordenadas normalizadas).
+# Os landmarks da face não são gravados (só servem para o debug view).
+
+
+def _points(landmarks):
+    """
+    Converte landmarks (MediaPipe ou Landmark) numa lista [[x, y, z], ...].
+    """
+    if landmarks is None:
+        return None
+    return [[round(p.x, 5), round(p.y, 5), round(p.z, 5)] for p in landmarks]
+
+
+def _landmarks(points):
+    """
+    Converte uma lista [[x, y, z], ...] de volta em landmarks leves (Landmark).
+    """
+    if points is None:
+        return None
+    return [Landmark(*p) for p in points]
+
+
+class TraceWriter:
+    """
+    Grava os resultados de inferência (FrameResults) de cada frame num ficheiro.
+    """
+
+    def __init__(self, path, h, w):
+        self.file = open(path, "w")
+        self.file.write(json.dumps({"width": w, "height": h}) + "\n")
+
+    def write(self, frame_id, stamp, results):
+        right_up, left_up, pose_lms = results.pose
+        _, left_lm, right_lm, left_pos, right_pos, _, _ = results.hands
+        smiling, _ = results.face
+
+        record = {
+            "id": frame_id,
+            "t": round(stamp, 4),
+            "pose": [
+                bool(right_up),
+                bool(left_up),
+                _points(pose_lms.landmark) if pose_lms is not None else None,
+            ],
+            "hands": {
+                "left": _points(left_lm),
+                "right": _points(right_lm),
+                "left_pos": left_pos,
+                "right_pos": right_pos,
+            },
+            "face": bool(smiling),
+            "objects": {
+                name: [[d.cls, round(d.conf, 4), [round(v, 1) for v in d.xyxy]] for d in dets]
+                for name, dets in results.objects.items()
+            },
+        }
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class TraceReader:
+    """
+    Lê um ficheiro gravado pelo TraceWriter.
+
+    - height/width: dimensões dos frames originais
+    - iterar devolve (frame_id, stamp, FrameResults) por frame, com landmarks leves
+      (Landmark / LandmarkList) com os atributos usados por gestures.py
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path) as f:
+            header = json.loads(f.readline())
+        self.height = header["height"]
+        self.width = header["width"]
+
+    def __iter__(self):
+        with open(self.path) as f:
+            f.readline()
+            for line in f:
+                if line.strip():
+                    yield self._parse(json.loads(line))
+
+    def _parse(self, record):
+        right_up, left_up, pose_points = record["pose"]
+        pose_lms = _landmarks(pose_points)
+
+        hands = record["hands"]
+        left_lm = _landmarks(hands["left"])
+        right_lm = _landmarks(hands["right"])
+        left_pos = tuple(hands["left_pos"]) if hands["left_pos"] else None
+        right_pos = tuple(hands["right_pos"]) if hands["right_pos"] else None
+
+        results = FrameResults(
+            (right_up, left_up, LandmarkList(pose_lms) if pose_lms else None),
+            (
+                None,
+                left_lm,
+                right_lm,
+                left_pos,
+                right_pos,
+                LandmarkList(left_lm) if left_lm else None,
+                LandmarkList(right_lm) if right_lm else None,
+            ),
+            (record["face"], None),
+            {
+                name: [Detection(c, p, tuple(xyxy)) for c, p, xyxy in dets]
+                for name, dets in record["objects"].items()
+            },
+        )
+        return record["id"], record["t"], results
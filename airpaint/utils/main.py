@@ -1,335 +1,192 @@
 import cv2
 import time
-import os
-
-import mediapipe as mp
 
 import config as cfg
-from gestures import (
-    one_finger,
-    two_fingers,
-    three_fingers,
-    four_fingers,
-    pinch,
-    is_fist,
-)
-from hands import detect_hands
-from drawing import (
-    ensure_canvas,
-    draw_brush,
-    erase_at,
-    spray_at,
-    draw_palette,
-    check_palette_selection,
-)
-from drawing import clear_canvas, undo
-from pose import detect_pose
-from yolo_detector import detect_book, detect_can
-from face import detect_smile
+from drawing import draw_palette, redo
+from inference import Inference
+from painter import Painter
+from capture import FrameCapture, open_source
+from profiler import Profiler
+from debug_view import DebugView
+from streaming import StreamServer
+from strokes import StrokeLog
+from screenshots import ScreenshotWriter
 
 from tool_window import ToolWindow
 
-# ============================
-# Variáveis de controlo (gestos / timers)
-# ============================
-
-# Controlam o "hold" do braço (pose) para limpar / fazer undo
-right_arm_start = None
-left_arm_start = None
-ARM_HOLD_TIME = 4  # segundos que o braço tem de estar levantado para disparar ação
-
-# Controlam a seleção de uma cor na paleta (segurar o dedo em cima de uma cor)
-select_start = None
-selected_index = None
-
-# Controlo de delay para trocar cor ao fazer 1 dedo (evita trocar demasiado rápido)
-last_color_change = 0
-COLOR_DELAY = 0.6  # segundos
-
-# Controla o "hold" do livro detetado por YOLO para tirar screenshot
-book_start = None
-BOOK_HOLD_TIME = 3  # segundos com o livro visível para disparar print
-
-# Pasta onde serão guardados os screenshots do desenho
-if not os.path.exists("screenshots"):
-    os.makedirs("screenshots")
+# Screenshots do desenho: comprimidos e gravados numa thread de fundo (ver screenshots.py)
+screenshots = ScreenshotWriter(
+    cfg.SCREENSHOT_DIR,
+    cfg.SCREENSHOT_FORMAT,
+    cfg.SCREENSHOT_LEVEL,
+    cfg.SCREENSHOT_SAVE_CANVAS,
+)
 
 # ============================
-# Atalhos para módulos MediaPipe (usados no modo debug)
+# Profiling por etapa (desligado por defeito, ver config.PROFILE)
 # ============================
-mp_draw = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
-mp_hands = mp.solutions.hands
-mp_face_mesh = mp.solutions.face_mesh
+profiler = Profiler(
+    cfg.PROFILE,
+    window=cfg.PROFILE_WINDOW,
+    dump_path=cfg.PROFILE_DUMP_PATH,
+    dump_interval=cfg.PROFILE_DUMP_INTERVAL,
+)
 
 # ============================
 # Inicialização da câmara
 # ============================
-cap = cv2.VideoCapture(0)
+# A leitura corre numa thread de fundo; o loop recebe sempre o frame mais recente
+capture = FrameCapture(open_source(cfg.CAPTURE_SOURCE), cfg.CAPTURE_RING_SIZE)
+capture.start()
 
 # Janela/engine para animação visual do "tool" atual (brush/spray/eraser)
 tool_window = ToolWindow()
 
-# Tool atual guardado em config (estado global do sistema)
-cfg.current_tool = "brush"
+# Janela de debug com os landmarks (desligada por defeito; tecla 'd' liga/desliga)
+debug_view = DebugView(
+    cfg.DEBUG_VIEW,
+    every=cfg.DEBUG_VIEW_EVERY,
+    scale=cfg.DEBUG_VIEW_SCALE,
+    overlays=cfg.DEBUG_OVERLAYS,
+)
+
+# Streaming MJPEG do output para outros ecrãs na rede local (ver config.STREAM)
+stream = None
+if cfg.STREAM:
+    stream = StreamServer(cfg.STREAM_HOST, cfg.STREAM_PORT, cfg.STREAM_QUALITY, cfg.STREAM_MAX_WIDTH)
+    stream.start()
+    print(f"[stream] http://{cfg.STREAM_HOST}:{stream.port}/")
+
+# Registo vetorial dos traços (ver strokes.py e export_strokes.py)
+if cfg.STROKE_LOG_PATH:
+    cfg.stroke_log = StrokeLog(cfg.STROKE_LOG_PATH)
+
+# Lógica de gestos/desenho (timers de hold, ferramenta atual, ...)
+painter = Painter()
+
+# ============================
+# Inferência (pose, mãos, face, objetos)
+# ============================
+# Em modo assíncrono cada modelo corre na sua própria thread e o loop só lê
+# o último resultado de cada um (ver pipeline.py).
+inference = Inference(cfg.ASYNC_INFERENCE, cfg.PIPELINE_QUEUE_DEPTH, profiler)
 
 # ============================
 # Loop principal
 # ============================
 while True:
-    ok, frame = cap.read()
+    frame_start = time.perf_counter()
+
+    # frame_id/stamp: id monotónico e instante do frame capturado
+    with profiler.stage("capture"):
+        ok, frame_id, stamp, frame = capture.read()
     if not ok:
         break
 
     # Espelha o vídeo (efeito espelho para ser mais intuitivo ao desenhar)
+    # (cv2.flip cria uma nova imagem, libertando logo o buffer do anel de captura)
     frame = cv2.flip(frame, 1)
 
-    # Cópias do frame:
-    # - raw_frame: para deteções (YOLO/pose/face) sem overlay do canvas
-    # - debug_frame: para desenhar landmarks e visualizar diagnóstico
+    # raw_frame: cópia para deteções (YOLO/pose/face) e debug, sem paleta nem canvas
     raw_frame = frame.copy()
-    debug_frame = raw_frame.copy()
 
     # Dimensões do frame
     h, w, _ = frame.shape
 
     # ============================
-    # POSE (braços levantados)
-    # ============================
-    # detect_pose devolve:
-    # - right_up: True se braço direito estiver levantado
-    # - left_up: True se braço esquerdo estiver levantado
-    # - pose_lms: landmarks da pose (para debug)
-    right_up, left_up, pose_lms = detect_pose(frame)
-
-    # Garante que existe um canvas do tamanho do frame
-    ensure_canvas(h, w)
-
-    # ============================
-    # MÃOS (landmarks + posição do indicador)
-    # ============================
-    # detect_hands devolve:
-    # - left_lm/right_lm: landmarks normalizados das mãos (listas)
-    # - left_pos/right_pos: posição (x,y) em pixels do dedo indicador (landmark 8)
-    # - left_hand_obj/right_hand_obj: objetos MediaPipe para desenhar landmarks (debug)
-    frame, left_lm, right_lm, left_pos, right_pos, left_hand_obj, right_hand_obj = (
-        detect_hands(frame)
-    )
-
-    # Desenha a paleta de cores na lateral esquerda do frame
-    draw_palette(frame)
-
-    # ============================
-    # FACE / SMILE -> Rainbow Mode
-    # ============================
-    # detect_smile devolve:
-    # - smiling: True se sorriso estiver confirmado por vários frames
-    # - face_lms: landmarks da face (para debug)
-    smiling, face_lms = detect_smile(frame)
-
-    # Se estiver a sorrir, ativa o modo arco-íris (troca automática de cor)
-    cfg.rainbow_mode = smiling
-
-    # Troca de cor automática no modo rainbow com base num delay
-    if cfg.rainbow_mode:
-        now = time.time()
-        if now - cfg.last_rainbow_switch >= cfg.rainbow_delay:
-            cfg.color_index = (cfg.color_index + 1) % len(cfg.colors)
-            cfg.current_color = cfg.colors[cfg.color_index]
-            cfg.last_rainbow_switch = now
-
-    # ============================
-    # Seleção de cor com a mão esquerda (hover/hold na paleta)
+    # INFERÊNCIA (pose, mãos, face, objetos)
     # ============================
-    # Se existir posição da mão esquerda (indicador)
-    if left_pos:
-        # check_palette_selection devolve índice da cor se estiver na zona da paleta, senão None
-        idx = check_palette_selection(left_pos[0], left_pos[1], h)
-        if idx is not None:
-            # Se mudou o índice selecionado, reinicia o timer do "hold"
-            if selected_index != idx:
-                selected_index = idx
-                select_start = time.time()
-            else:
-                # Se mantém na mesma cor durante >= 1.8s, confirma seleção
-                if time.time() - select_start >= 1.8:
-                    cfg.current_color = cfg.colors[idx]
-        else:
-            # Fora da paleta: reseta seleção
-            selected_index = None
-            select_start = None
+    # Todos os modelos recebem raw_frame (sem paleta nem canvas por cima).
+    # results.pose = (right_up, left_up, pose_lms)
+    # results.hands = (frame, left_lm, right_lm, left_pos, right_pos, left_hand_obj, right_hand_obj)
+    # results.face = (smiling, face_lms)
+    # results.objects = { "book": [...], "can": [...] } (uma única inferência YOLO)
+    with profiler.stage("infer"):
+        results = inference.infer(raw_frame, stamp)
 
     # ============================
-    # Gestos da mão esquerda (controlos de cor, spray e espessura)
+    # GESTOS E DESENHO (ver painter.py)
     # ============================
-    # Só processa estes gestos se há mão esquerda e o rainbow_mode estiver desligado
-    if left_lm and not cfg.rainbow_mode:
-        # 1 dedo: trocar cor ciclicamente com um delay (para não trocar em loop demasiado rápido)
-        if one_finger(left_lm):
-            now = time.time()
-            if now - last_color_change >= COLOR_DELAY:
-                cfg.color_index = (cfg.color_index + 1) % len(cfg.colors)
-                cfg.current_color = cfg.colors[cfg.color_index]
-                last_color_change = now
+    # Rainbow (sorriso), paleta, gestos das mãos, livro (screenshot), lata (spray)
+    # e ações por pose (limpar/undo). Devolve as ações disparadas neste frame.
+    with profiler.stage("update"):
+        actions = painter.update(results, h, w, stamp)
 
-        # Pinch (polegar+indicador): ativa modo spray e altera ferramenta atual
-        if pinch(left_lm):
-            cfg.spray_mode = True
-            cfg.current_tool = "spray"
-        else:
-            cfg.spray_mode = False
-            cfg.current_tool = "brush"
+        # Desenha a paleta de cores na lateral esquerda do frame
+        draw_palette(frame)
 
-        # 3 dedos: aumenta espessura do pincel (com limite máximo)
-        if three_fingers(left_lm):
-            cfg.thickness = min(60, cfg.thickness + 1)
-
-        # 2 dedos: diminui espessura do pincel (com limite mínimo)
-        if two_fingers(left_lm):
-            cfg.thickness = max(2, cfg.thickness - 1)
+        # Canvas em ficheiro mapeado: flush das linhas alteradas (no máximo a cada N segundos)
+        if cfg.canvas_store is not None:
+            cfg.canvas_store.tick()
 
     # ============================
-    # Ações da mão direita (desenhar/apagar)
+    # DEBUG: landmarks numa janela à parte (só se estiver ligada)
     # ============================
-    if right_lm and right_pos:
-        x, y = right_pos
-
-        # Combinação: punho na esquerda + 4 dedos na direita -> borracha
-        if is_fist(left_lm) and four_fingers(right_lm):
-            cfg.current_tool = "eraser"
-            erase_at(x, y)
-
-        # Pinch na direita -> desenhar (brush ou spray)
-        elif pinch(right_lm):
-            # Guarda estado antes de desenhar para permitir undo
-            cfg.save_state(cfg.canvas)
-            if cfg.spray_mode:
-                spray_at(x, y)
-            else:
-                draw_brush(x, y)
-
-    # ============================
-    # YOLO – LIVRO (tirar screenshot)
-    # ============================
-    # Se o livro for detetado:
-    # - bloqueia controlos (mãos/spray/rainbow) para evitar interferência
-    # - inicia um timer; se durar >= BOOK_HOLD_TIME, grava imagem composta (frame + canvas)
-    book_detected = detect_book(raw_frame)
-    if book_detected:
-        left_lm = right_lm = None
-        left_pos = right_pos = None
-        cfg.spray_mode = False
-        cfg.rainbow_mode = False
-
-        if book_start is None:
-            book_start = time.time()
-        else:
-            if time.time() - book_start >= BOOK_HOLD_TIME:
-                filename = f"screenshots/airpaint_{int(time.time())}.png"
-                cv2.imwrite(filename, cv2.add(frame, cfg.canvas))
-                book_start = None
-    else:
-        # Se o livro desaparecer, reseta o timer
-        book_start = None
-
-    # ============================
-    # YOLO – LATA (forçar spray)
-    # ============================
-    # Se a lata for detetada, ativa spray e muda a ferramenta para spray
-    if detect_can(raw_frame):
-        cfg.spray_mode = True
-        cfg.current_tool = "spray"
-
-    # ============================
-    # DEBUG: desenhar landmarks no debug_frame
-    # ============================
-
-    # Pose landmarks (se existirem)
-    if pose_lms:
-        mp_draw.draw_landmarks(
-            debug_frame,
-            pose_lms,
-            mp_pose.POSE_CONNECTIONS,
-            mp_draw.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2),
-            mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2),
-        )
-
-    # Mão esquerda (se existir)
-    if left_hand_obj is not None:
-        mp_draw.draw_landmarks(
-            debug_frame,
-            left_hand_obj,
-            mp_hands.HAND_CONNECTIONS,
-            mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
-            mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2),
-        )
-
-    # Mão direita (se existir)
-    if right_hand_obj is not None:
-        mp_draw.draw_landmarks(
-            debug_frame,
-            right_hand_obj,
-            mp_hands.HAND_CONNECTIONS,
-            mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-            mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2),
-        )
-
-    # Face landmarks (se existirem)
-    if face_lms is not None:
-        mp_draw.draw_landmarks(
-            debug_frame,
-            face_lms,
-            mp_face_mesh.FACEMESH_TESSELATION,
-            mp_draw.DrawingSpec(color=(255, 0, 255), thickness=1, circle_radius=1),
-            mp_draw.DrawingSpec(color=(0, 255, 255), thickness=1),
-        )
-
-    # ============================
-    # Ações por pose (braço levantado com hold)
-    # ============================
-
-    # Braço direito levantado: limpar canvas após ARM_HOLD_TIME
-    if right_up:
-        if right_arm_start is None:
-            right_arm_start = time.time()
-        else:
-            if time.time() - right_arm_start >= ARM_HOLD_TIME:
-                clear_canvas()
-                right_arm_start = None
-    else:
-        right_arm_start = None
-
-    # Braço esquerdo levantado: undo após ARM_HOLD_TIME
-    if left_up:
-        if left_arm_start is None:
-            left_arm_start = time.time()
-        else:
-            if time.time() - left_arm_start >= ARM_HOLD_TIME:
-                undo()
-                left_arm_start = None
-    else:
-        left_arm_start = None
+    with profiler.stage("debug"):
+        debug_view.render(raw_frame, results)
 
     # ============================
     # Composição final e janelas de visualização
     # ============================
     # output = frame com paleta + canvas desenhado por cima
-    output = cv2.add(frame, cfg.canvas)
+    # (o compositor só soma os tiles do canvas que têm tinta; escreve no próprio frame)
+    with profiler.stage("compose"):
+        output = cfg.compositor.compose(frame, cfg.canvas)
+
+    # Screenshot pedido pelo livro: o output já composto é copiado e gravado em background
+    if ("screenshot", None) in actions:
+        screenshots.save(f"airpaint_{int(time.time())}_{frame_id}", output, cfg.canvas)
+    for saved in screenshots.completed():
+        print(f"[screenshot] {saved.paths[0]} ({'ok' if saved.ok else 'erro'}, {saved.ms:.0f} ms)")
+
+    # Estatísticas de latência por cima do output (depois do screenshot, para não o sujar)
+    if cfg.PROFILE_OVERLAY:
+        profiler.overlay(output)
 
     # Janelas:
     # - AirPaint: resultado final
-    # - Debug View: landmarks e diagnóstico
+    # - Debug View: landmarks e diagnóstico (mostrada pelo debug_view.render)
     # - Tool Animation: animação/ícone da ferramenta atual
-    cv2.imshow("AirPaint 3D — Versao Modular", output)
-    cv2.imshow("Debug View", debug_frame)
-    cv2.imshow("Tool Animation", tool_window.get_frame(cfg.current_tool))
-
-    # Tecla 'q' para sair
-    if cv2.waitKey(1) & 0xFF == ord("q"):
+    with profiler.stage("display"):
+        tool_frame = tool_window.get_frame(cfg.current_tool)
+        cv2.imshow("AirPaint 3D — Versao Modular", output)
+        cv2.imshow("Tool Animation", tool_frame)
+
+        # Streaming: só entrega as referências (o encoding JPEG corre noutra thread)
+        if stream is not None:
+            stream.publish("output", output)
+            if cfg.STREAM_TOOL:
+                stream.publish("tool", tool_frame)
+
+        # Teclas: 'q' para sair, 'r' para refazer (redo) a última ação desfeita,
+        # 'd' para ligar/desligar o debug view
+        key = cv2.waitKey(1) & 0xFF
+
+    # Tempo total do frame (dá o FPS no overlay) e gravação periódica das estatísticas
+    if profiler.enabled:
+        profiler.record("frame", (time.perf_counter() - frame_start) * 1000)
+        profiler.tick()
+
+    if key == ord("q"):
         break
+    elif key == ord("r"):
+        redo()
+    elif key == ord("d"):
+        debug_view.toggle()
 
 # ============================
 # Cleanup
 # ============================
-cap.release()
+inference.stop()
+capture.stop()
+screenshots.stop()
+tool_window.close()
+if stream is not None:
+    stream.stop()
+if cfg.stroke_log is not None:
+    cfg.stroke_log.close()
+if cfg.canvas_store is not None:
+    cfg.canvas_store.close()
+if profiler.enabled:
+    profiler.dump()
 cv2.destroyAllWindows()
\ No newline at end of file
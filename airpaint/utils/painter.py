@@ -0,0 +1,241 @@
+import config as cfg
+from gestures import (
+    hand_features,
+    one_finger,
+    two_fingers,
+    three_fingers,
+    four_fingers,
+    pinch,
+    is_fist,
+)
+from drawing import (
+    ensure_canvas,
+    draw_brush,
+    erase_at,
+    spray_at,
+    check_palette_selection,
+)
+from drawing import clear_canvas, undo, end_stroke
+
+# ============================
+# Constantes de tempo (gestos / timers)
+# ============================
+ARM_HOLD_TIME = 4  # segundos que o braço tem de estar levantado para disparar ação
+COLOR_DELAY = 0.6  # segundos entre trocas de cor com 1 dedo
+SELECT_HOLD_TIME = 1.8  # segundos com o dedo em cima de uma cor da paleta para a escolher
+BOOK_HOLD_TIME = 3  # segundos com o livro visível para disparar print
+
+
+class Painter:
+    """
+    Lógica de gestos e desenho da aplicação, independente da câmara e das janelas.
+
+    Recebe os resultados de inferência de cada frame (FrameResults) e:
+    - atualiza o estado de desenho em config (cor, espessura, ferramenta, modos)
+    - desenha/apaga no canvas
+    - dispara as ações por hold (limpar, undo, screenshot)
+
+    O tempo é sempre passado por quem chama (now, em segundos), para que a mesma
+    lógica funcione em tempo real (câmara) e em replay headless (tempo do vídeo).
+    """
+
+    def __init__(self):
+        # Controlam o "hold" do braço (pose) para limpar / fazer undo
+        self.right_arm_start = None
+        self.left_arm_start = None
+
+        # Controlam a seleção de uma cor na paleta (segurar o dedo em cima de uma cor)
+        self.select_start = None
+        self.selected_index = None
+
+        # Controlo de delay para trocar cor ao fazer 1 dedo (evita trocar demasiado rápido)
+        self.last_color_change = float("-inf")
+
+        # Controla o "hold" do livro detetado por YOLO para tirar screenshot
+        self.book_start = None
+
+        # Tool atual guardado em config (estado global do sistema)
+        cfg.current_tool = "brush"
+
+    def update(self, results, h, w, now):
+        """
+        Aplica os gestos de um frame.
+
+        Parâmetros:
+        - results: FrameResults do frame (ver inference.py)
+        - h, w: dimensões do frame/canvas
+        - now: instante do frame (segundos)
+
+        Retorno:
+        - lista de ações disparadas neste frame, como tuplos (nome, valor):
+          ("clear", None), ("undo", None), ("screenshot", None), ("tool", "spray"), ...
+        """
+        actions = []
+        previous_tool = cfg.current_tool
+
+        # As operações de desenho deste frame ficam no stroke log com o instante do frame
+        if cfg.stroke_log is not None:
+            cfg.stroke_log.set_time(now)
+
+        right_up, left_up, _ = results.pose
+        _, left_lm, right_lm, left_pos, right_pos, _, _ = results.hands
+        smiling, _ = results.face
+        objects = results.objects
+
+        # Features dos gestos (dedos levantados, pinça, punho) calculadas uma vez por mão
+        left = hand_features(left_lm)
+        right = hand_features(right_lm)
+
+        # Garante que existe um canvas do tamanho do frame
+        ensure_canvas(h, w)
+
+        # ============================
+        # FACE / SMILE -> Rainbow Mode
+        # ============================
+        # Se estiver a sorrir, ativa o modo arco-íris (troca automática de cor)
+        cfg.rainbow_mode = smiling
+
+        # Troca de cor automática no modo rainbow com base num delay
+        if cfg.rainbow_mode:
+            if now - cfg.last_rainbow_switch >= cfg.rainbow_delay:
+                cfg.color_index = (cfg.color_index + 1) % len(cfg.colors)
+                cfg.current_color = cfg.colors[cfg.color_index]
+                cfg.last_rainbow_switch = now
+
+        # ============================
+        # Seleção de cor com a mão esquerda (hover/hold na paleta)
+        # ============================
+        # Se existir posição da mão esquerda (indicador)
+        if left_pos:
+            # check_palette_selection devolve índice da cor se estiver na zona da paleta, senão None
+            idx = check_palette_selection(left_pos[0], left_pos[1], h)
+            if idx is not None:
+                # Se mudou o índice selecionado, reinicia o timer do "hold"
+                if self.selected_index != idx:
+                    self.selected_index = idx
+                    self.select_start = now
+                else:
+                    # Se mantém na mesma cor durante >= SELECT_HOLD_TIME, confirma seleção
+                    if now - self.select_start >= SELECT_HOLD_TIME:
+                        cfg.current_color = cfg.colors[idx]
+            else:
+                # Fora da paleta: reseta seleção
+                self.selected_index = None
+                self.select_start = None
+
+        # ============================
+        # Gestos da mão esquerda (controlos de cor, spray e espessura)
+        # ============================
+        # Só processa estes gestos se há mão esquerda e o rainbow_mode estiver desligado
+        if left_lm and not cfg.rainbow_mode:
+            # 1 dedo: trocar cor ciclicamente com um delay (para não trocar em loop demasiado rápido)
+            if one_finger(left):
+                if now - self.last_color_change >= COLOR_DELAY:
+                    cfg.color_index = (cfg.color_index + 1) % len(cfg.colors)
+                    cfg.current_color = cfg.colors[cfg.color_index]
+                    self.last_color_change = now
+
+            # Pinch (polegar+indicador): ativa modo spray e altera ferramenta atual
+            if pinch(left):
+                cfg.spray_mode = True
+                cfg.current_tool = "spray"
+            else:
+                cfg.spray_mode = False
+                cfg.current_tool = "brush"
+
+            # 3 dedos: aumenta espessura do pincel (com limite máximo)
+            if three_fingers(left):
+                cfg.thickness = min(60, cfg.thickness + 1)
+
+            # 2 dedos: diminui espessura do pincel (com limite mínimo)
+            if two_fingers(left):
+                cfg.thickness = max(2, cfg.thickness - 1)
+
+        # ============================
+        # Ações da mão direita (desenhar/apagar)
+        # ============================
+        # drawing_now: True se neste frame houve desenho/borracha (para agrupar traços no undo)
+        drawing_now = False
+        if right_lm and right_pos:
+            x, y = right_pos
+
+            # Combinação: punho na esquerda + 4 dedos na direita -> borracha
+            if is_fist(left) and four_fingers(right):
+                cfg.current_tool = "eraser"
+                erase_at(x, y)
+                drawing_now = True
+
+            # Pinch na direita -> desenhar (brush ou spray)
+            # (o histórico de undo é atualizado dentro de draw_brush/spray_at)
+            elif pinch(right):
+                if cfg.spray_mode:
+                    spray_at(x, y)
+                else:
+                    draw_brush(x, y)
+                drawing_now = True
+
+        # Sem desenho neste frame: fecha o traço (frames seguidos de pinça = 1 passo de undo)
+        if not drawing_now:
+            end_stroke()
+
+        # ============================
+        # YOLO – LIVRO (tirar screenshot)
+        # ============================
+        # Se o livro for detetado:
+        # - bloqueia spray/rainbow para evitar interferência
+        # - inicia um timer; se durar >= BOOK_HOLD_TIME, pede um screenshot
+        #   (quem chama grava a imagem composta: frame + canvas)
+        if objects["book"]:
+            cfg.spray_mode = False
+            cfg.rainbow_mode = False
+
+            if self.book_start is None:
+                self.book_start = now
+            else:
+                if now - self.book_start >= BOOK_HOLD_TIME:
+                    actions.append(("screenshot", None))
+                    self.book_start = None
+        else:
+            # Se o livro desaparecer, reseta o timer
+            self.book_start = None
+
+        # ============================
+        # YOLO – LATA (forçar spray)
+        # ============================
+        # Se a lata for detetada, ativa spray e muda a ferramenta para spray
+        if objects["can"]:
+            cfg.spray_mode = True
+            cfg.current_tool = "spray"
+
+        # ============================
+        # Ações por pose (braço levantado com hold)
+        # ============================
+
+        # Braço direito levantado: limpar canvas após ARM_HOLD_TIME
+        if right_up:
+            if self.right_arm_start is None:
+                self.right_arm_start = now
+            else:
+                if now - self.right_arm_start >= ARM_HOLD_TIME:
+                    clear_canvas()
+                    actions.append(("clear", None))
+                    self.right_arm_start = None
+        else:
+            self.right_arm_start = None
+
+        # Braço esquerdo levantado: undo após ARM_HOLD_TIME
+        if left_up:
+            if self.left_arm_start is None:
+                self.left_arm_start = now
+            else:
+                if now - self.left_arm_start >= ARM_HOLD_TIME:
+                    undo()
+                    actions.append(("undo", None))
+                    self.left_arm_start = None
+        else:
+            self.left_arm_start = None
+
+        if cfg.current_tool != previous_tool:
+            actions.append(("tool", cfg.current_tool))
+
+        return actions
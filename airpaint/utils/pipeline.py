@@ -0,0 +1,150 @@
+import threading
+from collections import deque
+
+
+class Stage:
+    """
+    Um estágio de inferência (ex.: Pose, Hands, FaceMesh, YOLO) a correr na sua própria thread.
+
+    Ideia geral:
+    - Recebe frames através de submit() para uma fila pequena (queue_depth).
+    - Se a fila estiver cheia, o frame mais antigo é descartado (drop-oldest),
+      por isso o worker trabalha sempre sobre os frames mais recentes.
+    - Guarda apenas o último resultado calculado, que pode ser lido a qualquer
+      momento com latest() sem esperar pelo worker.
+    """
+
+    def __init__(self, name, fn, queue_depth=1):
+        """
+        Parâmetros:
+        - name: nome do estágio (ex.: "pose")
+        - fn: função a aplicar a cada frame (ex.: detect_pose)
+        - queue_depth: nº máximo de frames à espera de serem processados
+        """
+        self.name = name
+        self.fn = fn
+
+        # Fila com tamanho fixo: deque(maxlen) descarta o mais antigo ao encher
+        self.queue = deque(maxlen=max(1, queue_depth))
+        self.cond = threading.Condition()
+
+        # Último resultado: tuplo (frame_id, valor) ou None se ainda não houver
+        self.result = None
+
+        # Nº de frames descartados por o worker não acompanhar
+        self.dropped = 0
+
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """
+        Arranca a thread do worker (daemon, para não impedir a saída do programa).
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Pede ao worker para terminar e espera que a thread acabe.
+        """
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, frame_id, frame):
+        """
+        Coloca um frame na fila do estágio (nunca bloqueia).
+        """
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append((frame_id, frame))
+            self.cond.notify()
+
+    def latest(self):
+        """
+        Devolve o último resultado (frame_id, valor), ou None se ainda não existir.
+        """
+        return self.result
+
+    def _run(self):
+        """
+        Ciclo do worker: espera por um frame, processa-o e publica o resultado.
+        """
+        while True:
+            with self.cond:
+                while self.running and not self.queue:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                frame_id, frame = self.queue.popleft()
+
+            try:
+                value = self.fn(frame)
+            except Exception as e:
+                print(f"[Pipeline] {self.name}: erro no frame {frame_id}: {e}")
+                continue
+
+            # Atribuição de um tuplo é atómica: quem lê vê sempre um par coerente
+            self.result = (frame_id, value)
+
+
+class Pipeline:
+    """
+    Agendador que envia cada frame para vários estágios em paralelo.
+
+    - Cada estágio corre numa thread própria com a sua instância de modelo
+      (as instâncias MediaPipe/YOLO nunca são usadas por duas threads).
+    - O loop de render chama submit(frame) e depois latest(nome, default)
+      para cada estágio, sem nunca esperar pelo modelo mais lento.
+    - O tempo por frame passa a aproximar-se do modelo mais lento em vez da soma de todos.
+    """
+
+    def __init__(self, queue_depth=1):
+        """
+        Parâmetros:
+        - queue_depth: tamanho da fila de cada estágio (1 = só o frame mais recente)
+        """
+        self.queue_depth = queue_depth
+        self.stages = {}
+        self.frame_id = 0
+
+    def add_stage(self, name, fn):
+        """
+        Regista um novo estágio (deve ser chamado antes de start()).
+        """
+        self.stages[name] = Stage(name, fn, self.queue_depth)
+
+    def start(self):
+        for stage in self.stages.values():
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages.values():
+            stage.stop()
+
+    def submit(self, frame):
+        """
+        Envia o frame para todos os estágios e devolve o id atribuído ao frame.
+
+        Nota: o frame é partilhado (não é copiado), por isso não deve ser
+        alterado depois de submetido.
+        """
+        self.frame_id += 1
+        for stage in self.stages.values():
+            stage.submit(self.frame_id, frame)
+        return self.frame_id
+
+    def latest(self, name, default=None):
+        """
+        Devolve o último valor calculado pelo estágio 'name', ou 'default' se ainda não houver.
+        """
+        result = self.stages[name].latest()
+        if result is None:
+            return default
+        return result[1]
@@ -1,23 +1,36 @@
 import mediapipe as mp
 
+from gestures import arms_up
+
 # ============================
 # Configuração do MediaPipe Pose
 # ============================
 # Referência ao módulo Pose do MediaPipe (deteção de corpo inteiro / esqueleto).
 mp_pose = mp.solutions.pose
 
-# Instância do detector de pose:
-# - min_detection_confidence=0.6: confiança mínima para a deteção inicial
-# - min_tracking_confidence=0.6: confiança mínima para tracking entre frames
-pose = mp_pose.Pose(min_detection_confidence=0.6, min_tracking_confidence=0.6)
 
+def create_pose():
+    """
+    Cria uma instância do detector de pose:
+    - min_detection_confidence=0.6: confiança mínima para a deteção inicial
+    - min_tracking_confidence=0.6: confiança mínima para tracking entre frames
+    O grafo guarda estado entre frames (ROI, suavização): cada câmara tem o seu
+    (criado pela Inference).
+    """
+    return mp_pose.Pose(min_detection_confidence=0.6, min_tracking_confidence=0.6)
 
-def detect_pose(frame):
+
+def detect_pose(ctx, pose):
     """
     Deteta pose (landmarks do corpo) e determina se os braços estão levantados.
 
+    Parâmetros:
+    - ctx: FrameContext do frame (ver frame_context.py)
+    - pose: grafo Pose da câmara (ver create_pose)
+
     Estratégia:
-    - Converte o frame para RGB (aqui usando slicing frame[:, :, ::-1] que inverte BGR->RGB).
+    - Usa a versão RGB contígua partilhada do frame (ctx.rgb, convertida uma única vez
+      para todos os modelos MediaPipe).
     - Processa com MediaPipe Pose para obter landmarks.
     - Se não houver landmarks, devolve False, False, None.
     - Caso haja landmarks:
@@ -30,14 +43,8 @@ def detect_pose(frame):
     - left_up (bool): True se o pulso esquerdo estiver acima do ombro esquerdo (com margem)
     - pose_landmarks (objeto MediaPipe ou None): landmarks completos para debug/desenho
     """
-    # Dimensões do frame (altura, largura, canais)
-    h, w, _ = frame.shape
-
-    # Conversão BGR -> RGB (forma rápida: inverte o último eixo dos canais)
-    rgb = frame[:, :, ::-1]
-
-    # Processa o frame para detetar pose
-    results = pose.process(rgb)
+    # Processa o frame (RGB partilhado) para detetar pose
+    results = pose.process(ctx.rgb)
 
     # Se não houver pose detetada, devolve estado negativo e sem landmarks
     if not results.pose_landmarks:
@@ -46,18 +53,8 @@ def detect_pose(frame):
     # Lista de landmarks (pontos do corpo) com coordenadas normalizadas (0..1)
     landmarks = results.pose_landmarks.landmark
 
-    # Coordenadas y do pulso e ombro direitos
-    rw = landmarks[mp_pose.PoseLandmark.RIGHT_WRIST].y
-    rs = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER].y
-
-    # Coordenadas y do pulso e ombro esquerdos
-    lw = landmarks[mp_pose.PoseLandmark.LEFT_WRIST].y
-    ls = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER].y
-
-    # Braço "levantado" se o pulso estiver pelo menos 0.05 acima do ombro
-    # (lembrar: em imagem, y menor = mais acima)
-    right_up = rw < rs - 0.05
-    left_up = lw < ls - 0.05
+    # Braço "levantado" se o pulso estiver pelo menos 0.05 acima do ombro (ver gestures.arms_up)
+    right_up, left_up = arms_up(landmarks)
 
     # Devolve os estados e os landmarks completos da pose
     return right_up, left_up, results.pose_landmarks
\ No newline at end of file
@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+import cv2
+import numpy as np
+
+# Context manager vazio partilhado (usado quando o profiler está desligado)
+_NULL = nullcontext()
+
+
+class Profiler:
+    """
+    Medição leve da latência de cada etapa do loop (pose, hands, composição, imshow, ...).
+
+    Ideia geral:
+    - Cada etapa é medida com stage("nome") (context manager) ou timed("nome") (decorator).
+    - Para cada etapa guarda-se uma janela deslizante das últimas 'window' medições (ms),
+      a partir da qual se calculam p50/p95/p99.
+    - overlay(frame) escreve as estatísticas no frame; tick() grava periodicamente
+      um ficheiro JSON ou CSV (conforme a extensão de dump_path).
+    - Desligado (enabled=False), stage() devolve um context manager vazio partilhado,
+      timed() devolve a função original e as restantes chamadas saem logo.
+    - Pode ser usado a partir de várias threads (ex.: estágios do pipeline).
+    """
+
+    def __init__(self, enabled=False, window=120, dump_path=None, dump_interval=5.0):
+        """
+        Parâmetros:
+        - enabled: ligar/desligar a medição
+        - window: nº de medições guardadas por etapa
+        - dump_path: ficheiro .json ou .csv para os dumps periódicos (None = sem dump)
+        - dump_interval: segundos entre dumps
+        """
+        self.enabled = enabled
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+
+        # samples: { etapa: deque de durações em ms }
+        self.samples = {}
+
+        self._last_dump = time.monotonic()
+
+        # Estatísticas do overlay (recalculadas no máximo 2x por segundo)
+        self._overlay_lines = []
+        self._overlay_time = 0.0
+
+    # ============================
+    # Medição
+    # ============================
+
+    def record(self, name, ms):
+        """
+        Acrescenta uma medição (ms) à etapa 'name'.
+        """
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(ms)
+
+    @contextmanager
+    def _measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def stage(self, name):
+        """
+        Context manager que mede o bloco: `with profiler.stage("pose"): ...`
+        """
+        if not self.enabled:
+            return _NULL
+        return self._measure(name)
+
+    def timed(self, name):
+        """
+        Decorator que mede cada chamada da função.
+
+        Se o profiler estiver desligado, devolve a própria função (custo zero).
+        """
+        def decorator(fn):
+            if not self.enabled:
+                return fn
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    # ============================
+    # Estatísticas
+    # ============================
+
+    def stats(self):
+        """
+        Devolve { etapa: {"count", "mean", "p50", "p95", "p99"} } (valores em ms).
+        """
+        out = {}
+        for name, samples in list(self.samples.items()):
+            values = np.array(samples)
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            out[name] = {
+                "count": len(values),
+                "mean": round(float(values.mean()), 3),
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+            }
+        return out
+
+    def overlay(self, frame, origin=(70, 20)):
+        """
+        Escreve no frame o FPS (a partir da etapa "frame") e p50/p95/p99 de cada etapa.
+        """
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        if now - self._overlay_time >= 0.5:
+            self._overlay_time = now
+            stats = self.stats()
+            lines = []
+            if "frame" in stats and stats["frame"]["mean"] > 0:
+                lines.append(f"FPS {1000 / stats['frame']['mean']:.1f}")
+            for name, s in stats.items():
+                lines.append(f"{name:9s} {s['p50']:6.1f} {s['p95']:6.1f} {s['p99']:6.1f} ms")
+            self._overlay_lines = lines
+
+        x, y = origin
+        for i, line in enumerate(self._overlay_lines):
+            cv2.putText(frame, line, (x, y + 18 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1)
+
+    # ============================
+    # Dump periódico
+    # ============================
+
+    def dump(self, path=None):
+        """
+        Grava as estatísticas atuais em JSON (substitui o ficheiro) ou CSV (acrescenta linhas).
+        """
+        path = path or self.dump_path
+        if path is None:
+            return
+        stats = self.stats()
+        stamp = round(time.time(), 3)
+
+        if path.endswith(".csv"):
+            new_file = not os.path.exists(path)
+            with open(path, "a", newline="") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(["time", "stage", "count", "mean", "p50", "p95", "p99"])
+                for name, s in stats.items():
+                    writer.writerow([stamp, name, s["count"], s["mean"], s["p50"], s["p95"], s["p99"]])
+        else:
+            with open(path, "w") as f:
+                json.dump({"time": stamp, "stages": stats}, f, indent=2)
+
+    def tick(self):
+        """
+        Chamado uma vez por frame: faz o dump se já passou dump_interval desde o último.
+        """
+        if not self.enabled or self.dump_path is None:
+            return
+        now = time.monotonic()
+        if now - self._last_dump >= self.dump_interval:
+            self._last_dump = now
+            self.dump()
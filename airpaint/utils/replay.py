@@ -0,0 +1,190 @@
+"""
+Modo headless (sem janelas) do AirPaint, para profiling e testes de regressão.
+
+Uso:
+    python replay.py VIDEO_OU_PASTA --out DIR [--record trace.jsonl] [--backend holistic]
+    python replay.py --trace trace.jsonl --out DIR [VIDEO_OU_PASTA]
+
+- Com um vídeo (ou pasta de imagens), corre os modelos e a lógica de gestos/desenho
+  completa sobre cada frame; --record grava os resultados dos modelos num trace.
+  --backend escolhe o backend MediaPipe ("separate" ou "holistic"), para comparar
+  o tempo de CPU da inferência por frame.
+- Com --trace, usa os resultados gravados em vez dos modelos, o que permite medir
+  a lógica de desenho isoladamente (o vídeo é opcional e só serve para a composição).
+
+Ficheiros escritos em DIR:
+- canvas.png: canvas final
+- timing.csv: tempos por frame (inferência, CPU da inferência, lógica, composição) em ms
+- actions.jsonl: ações disparadas (clear, undo, screenshot, mudanças de ferramenta)
+- strokes.jsonl: registo vetorial dos traços (ver strokes.py e export_strokes.py)
+- screenshots/: imagens pedidas pelo gesto do livro
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+import cv2
+
+import config as cfg
+from capture import FrameCapture, open_source
+from drawing import draw_palette
+from inference_trace import TraceReader, TraceWriter
+from painter import Painter
+from strokes import StrokeLog
+
+
+def read_frames(spec):
+    """
+    Lê todos os frames da fonte (sem descartar nenhum), já espelhados como no main.py.
+
+    Devolve (frame_id, stamp, frame) para cada frame.
+    """
+    capture = FrameCapture(open_source(spec), drop_frames=False)
+    capture.start()
+    try:
+        while True:
+            ok, frame_id, stamp, frame = capture.read()
+            if not ok:
+                break
+            yield frame_id, stamp, cv2.flip(frame, 1)
+    finally:
+        capture.stop()
+
+
+def live_results(spec, record):
+    """
+    Corre os modelos sobre cada frame da fonte (em modo sequencial, para que cada
+    frame tenha os seus próprios resultados).
+
+    Devolve (frame_id, stamp, frame, results, infer_ms, infer_cpu_ms) para cada frame
+    (infer_cpu_ms: tempo de CPU do processo, incluindo as threads internas do MediaPipe).
+    """
+    # Importado aqui para que o replay de um trace não precise dos modelos
+    from inference import Inference
+
+    inference = Inference()
+    writer = None
+    try:
+        for frame_id, stamp, frame in read_frames(spec):
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            results = inference.infer(frame.copy(), stamp)
+            infer_cpu_ms = (time.process_time() - cpu_start) * 1000
+            infer_ms = (time.perf_counter() - start) * 1000
+
+            if record:
+                if writer is None:
+                    writer = TraceWriter(record, frame.shape[0], frame.shape[1])
+                writer.write(frame_id, stamp, results)
+
+            yield frame_id, stamp, frame, results, infer_ms, infer_cpu_ms
+    finally:
+        inference.stop()
+        if writer is not None:
+            writer.close()
+
+
+def traced_results(reader, spec):
+    """
+    Devolve (frame_id, stamp, frame, results, 0.0, 0.0) a partir de um trace gravado.
+    Se houver fonte de vídeo, os frames são emparelhados por ordem; caso contrário frame=None.
+    """
+    frames = read_frames(spec) if spec is not None else None
+    for frame_id, stamp, results in reader:
+        frame = None
+        if frames is not None:
+            frame = next(frames, (None, None, None))[2]
+        yield frame_id, stamp, frame, results, 0.0, 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AirPaint headless (replay de vídeo ou de trace)")
+    parser.add_argument("source", nargs="?", help="vídeo ou pasta de imagens")
+    parser.add_argument("--out", required=True, help="pasta de saída")
+    parser.add_argument("--trace", help="usar resultados gravados em vez dos modelos")
+    parser.add_argument("--record", help="gravar os resultados dos modelos neste ficheiro")
+    parser.add_argument("--backend", choices=("separate", "holistic"), help="backend MediaPipe")
+    args = parser.parse_args()
+
+    if args.backend:
+        cfg.MEDIAPIPE_BACKEND = args.backend
+
+    if args.source is None and args.trace is None:
+        parser.error("é preciso indicar uma fonte de vídeo ou --trace")
+
+    screenshots = os.path.join(args.out, "screenshots")
+    os.makedirs(screenshots, exist_ok=True)
+
+    if args.trace:
+        reader = TraceReader(args.trace)
+        size = (reader.height, reader.width)
+        frames = traced_results(reader, args.source)
+    else:
+        size = None
+        frames = live_results(args.source, args.record)
+
+    # Stroke log novo em cada replay (o ficheiro é append-only)
+    strokes_path = os.path.join(args.out, "strokes.jsonl")
+    if os.path.exists(strokes_path):
+        os.remove(strokes_path)
+    cfg.stroke_log = StrokeLog(strokes_path)
+
+    painter = Painter()
+    timing = []
+    start_all = time.perf_counter()
+
+    with open(os.path.join(args.out, "actions.jsonl"), "w") as actions_file:
+        for frame_id, stamp, frame, results, infer_ms, infer_cpu_ms in frames:
+            h, w = frame.shape[:2] if frame is not None else size
+
+            # Lógica de gestos e desenho
+            start = time.perf_counter()
+            actions = painter.update(results, h, w, stamp)
+            update_ms = (time.perf_counter() - start) * 1000
+
+            # Composição (só se houver frame de vídeo)
+            start = time.perf_counter()
+            output = cfg.canvas
+            if frame is not None:
+                draw_palette(frame)
+                output = cfg.compositor.compose(frame, cfg.canvas)
+            compose_ms = (time.perf_counter() - start) * 1000
+
+            for name, value in actions:
+                record = {"id": frame_id, "t": stamp, "action": name, "value": value}
+                actions_file.write(json.dumps(record) + "\n")
+                if name == "screenshot":
+                    path = os.path.join(screenshots, f"airpaint_{frame_id:06d}.png")
+                    cv2.imwrite(path, output)
+
+            timing.append((
+                frame_id,
+                round(stamp, 4),
+                round(infer_ms, 3),
+                round(infer_cpu_ms, 3),
+                round(update_ms, 3),
+                round(compose_ms, 3),
+            ))
+
+    elapsed = time.perf_counter() - start_all
+    cfg.stroke_log.close()
+
+    with open(os.path.join(args.out, "timing.csv"), "w", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(["frame_id", "stamp", "infer_ms", "infer_cpu_ms", "update_ms", "compose_ms"])
+        out.writerows(timing)
+
+    if cfg.canvas is not None:
+        cv2.imwrite(os.path.join(args.out, "canvas.png"), cfg.canvas)
+
+    n = len(timing)
+    print(f"[replay] {n} frames em {elapsed:.2f} s ({n / elapsed if elapsed else 0:.1f} fps)")
+    if n:
+        for i, name in enumerate(("inferência", "CPU infer.", "lógica", "composição"), start=2):
+            print(f"  {name:10s} {sum(row[i] for row in timing) / n:7.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from collections import namedtuple
+
+# ============================
+# Tipos de resultados partilhados
+# ============================
+# (módulo sem dependências dos modelos, para poder ser usado em replay/headless)
+
+# Detection é uma deteção de objeto (YOLO) que passou os filtros de uma regra:
+# - cls: classe COCO prevista
+# - conf: confiança do YOLO
+# - xyxy: bounding box (x1, y1, x2, y2) em pixels
+Detection = namedtuple("Detection", ["cls", "conf", "xyxy"])
+
+# FrameResults junta o que cada modelo devolveu para um frame:
+# - pose: (right_up, left_up, pose_lms) de detect_pose
+# - hands: (frame, left_lm, right_lm, left_pos, right_pos, left_hand_obj, right_hand_obj) de detect_hands
+# - face: (smiling, face_lms) de detect_smile
+# - objects: { "book": [Detection...], "can": [Detection...] } de detector.detect
+FrameResults = namedtuple("FrameResults", ["pose", "hands", "face", "objects"])
+
+# Resultados "vazios" (ex.: enquanto um estágio assíncrono ainda não respondeu)
+EMPTY_RESULTS = FrameResults(
+    (False, False, None),
+    (None,) * 7,
+    (False, None),
+    {"book": [], "can": []},
+)
+
+# Landmark / LandmarkList: equivalentes leves dos objetos do MediaPipe
+# (têm os mesmos atributos .x/.y/.z e .landmark usados pelos gestos e pelo debug)
+Landmark = namedtuple("Landmark", ["x", "y", "z"])
+LandmarkList = namedtuple("LandmarkList", ["landmark"])
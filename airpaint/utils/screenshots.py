@@ -0,0 +1,102 @@
+import os
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+
+# ============================
+# Escrita de screenshots em background
+# ============================
+# O loop principal só copia as imagens (memcpy, < 1 ms) e põe o pedido numa fila;
+# a compressão (PNG/JPEG/WebP) e a escrita no disco correm numa thread à parte,
+# por isso tirar um screenshot não provoca um "salto" no vídeo.
+
+# Parâmetros do OpenCV para cada formato: (extensão, flag de compressão/qualidade)
+FORMATS = {
+    "png": (".png", cv2.IMWRITE_PNG_COMPRESSION),
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+# Resultado de um screenshot escrito:
+# - paths: ficheiros escritos (output e, se pedido, o canvas)
+# - ok: True se todos foram escritos
+# - ms: tempo de encoding + escrita
+Saved = namedtuple("Saved", ["paths", "ok", "ms"])
+
+
+class ScreenshotWriter:
+    """
+    Fila de screenshots gravados por uma thread de fundo.
+
+    - save(name, output, canvas=None): copia as imagens e agenda a escrita (não bloqueia)
+    - completed(): devolve (e esquece) os screenshots já escritos, como Saved
+    - stop(): espera que a fila esvazie e termina a thread
+    """
+
+    def __init__(self, folder="screenshots", fmt="png", level=None, save_canvas=False):
+        """
+        Parâmetros:
+        - folder: pasta de destino (criada se não existir)
+        - fmt: "png", "jpeg" ou "webp"
+        - level: compressão PNG (0..9) ou qualidade JPEG/WebP (0..100); None = por defeito do OpenCV
+        - save_canvas: gravar também só a camada de desenho (<nome>_canvas.<ext>)
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"formato de screenshot desconhecido: {fmt}")
+
+        self.folder = folder
+        self.ext, flag = FORMATS[fmt]
+        self.params = [flag, level] if level is not None else []
+        self.save_canvas = save_canvas
+        os.makedirs(folder, exist_ok=True)
+
+        self.queue = queue.Queue()
+        self.done = deque()
+        self.pending = 0
+
+        self.thread = threading.Thread(target=self._run, name="screenshots", daemon=True)
+        self.thread.start()
+
+    def save(self, name, output, canvas=None):
+        """
+        Agenda um screenshot. As imagens são copiadas já (o loop pode continuar a
+        alterá-las); devolve o caminho do ficheiro do output.
+        """
+        path = os.path.join(self.folder, name + self.ext)
+        jobs = [(path, output.copy())]
+        if self.save_canvas and canvas is not None:
+            jobs.append((os.path.join(self.folder, name + "_canvas" + self.ext), canvas.copy()))
+        self.pending += 1
+        self.queue.put(jobs)
+        return path
+
+    def completed(self):
+        """
+        Devolve a lista de screenshots terminados desde a última chamada (nunca bloqueia).
+        """
+        saved = []
+        while self.done:
+            saved.append(self.done.popleft())
+        self.pending -= len(saved)
+        return saved
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            jobs = self.queue.get()
+            if jobs is None:
+                return
+            start = time.perf_counter()
+            ok = True
+            for path, image in jobs:
+                try:
+                    ok = cv2.imwrite(path, image, self.params) and ok
+                except cv2.error:
+                    ok = False
+            self.done.append(Saved([path for path, _ in jobs], ok, (time.perf_counter() - start) * 1000))
@@ -0,0 +1,131 @@
+"""
+Modo servidor do AirPaint: várias fontes (câmaras ou vídeos) num só processo.
+
+Uso:
+    python server.py FONTE [FONTE ...] [--out DIR] [--seconds N] [--show] [--report 5] [--stream PORT]
+
+- Cada FONTE (índice de câmara, vídeo ou pasta de imagens, ver capture.open_source)
+  tem a sua própria sessão: canvas, histórico, cor/ferramenta e estado dos gestos
+  (ver session.py).
+- O modelo YOLO é carregado uma única vez e partilhado por todas as sessões; cada
+  sessão tem a sua Inference, com os seus grafos MediaPipe e estado entre frames
+  (tracking, histerese do sorriso, filtro das mãos). O runner serve as sessões à vez,
+  cada uma com o seu frame mais recente.
+- De 'report' em 'report' segundos (e no fim) mostra, por sessão, os frames
+  processados, o FPS e os percentis p50/p95 do tempo por frame e da latência
+  (captura -> output, só para câmaras).
+- --show abre uma janela por sessão ('q' numa delas termina o servidor).
+- --stream publica o output de cada sessão em MJPEG na rede local
+  (http://<máquina>:PORT/session0.mjpg, ..., ver streaming.py).
+
+Ficheiros escritos em DIR (um subdiretório por sessão, session0, session1, ...):
+- canvas.png: canvas final
+- stats.json: percentis por etapa (infer, update, compose, frame, latency)
+- strokes.jsonl: registo vetorial dos traços (ver strokes.py)
+- screenshots/: imagens pedidas pelo gesto do livro
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+
+import config as cfg
+from session import Session
+from streaming import StreamServer
+
+
+def print_report(sessions):
+    for session in sessions:
+        report = session.report()
+        frame = report["stages"].get("frame", {})
+        latency = report["stages"].get("latency")
+        line = (
+            f"  {report['name']}: {report['frames']:6d} frames  {report['fps']:6.2f} fps  "
+            f"frame p50 {frame.get('p50', 0.0):6.1f} ms  p95 {frame.get('p95', 0.0):6.1f} ms"
+        )
+        if latency:
+            line += f"  latência p50 {latency['p50']:6.1f} ms  p95 {latency['p95']:6.1f} ms"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="índices de câmara, vídeos ou pastas de imagens")
+    parser.add_argument("--out", default=None, help="pasta para canvas, estatísticas e screenshots")
+    parser.add_argument("--seconds", type=float, default=None, help="termina ao fim de N segundos")
+    parser.add_argument("--show", action="store_true", help="mostra uma janela por sessão")
+    parser.add_argument("--report", type=float, default=5.0, help="intervalo entre relatórios (s)")
+    parser.add_argument("--stream", type=int, default=None, metavar="PORT", help="streaming MJPEG nesta porta")
+    args = parser.parse_args()
+
+    sessions = []
+    for i, source in enumerate(args.sources):
+        out_dir = os.path.join(args.out, f"session{i}") if args.out else None
+        sessions.append(Session(f"session{i}", source, out_dir))
+
+    stream = None
+    if args.stream is not None:
+        stream = StreamServer(cfg.STREAM_HOST, args.stream, cfg.STREAM_QUALITY, cfg.STREAM_MAX_WIDTH)
+        stream.start()
+        print(f"[server] stream em http://{cfg.STREAM_HOST}:{stream.port}/")
+
+    for session in sessions:
+        session.start()
+
+    print(f"[server] {len(sessions)} sessões: {', '.join(args.sources)}")
+    start = time.perf_counter()
+    last_report = start
+
+    try:
+        while not all(session.finished for session in sessions):
+            # Uma volta: cada sessão processa o seu frame mais recente (se houver um novo)
+            busy = False
+            for session in sessions:
+                if session.step():
+                    busy = True
+                    if stream is not None:
+                        stream.publish(session.name, session.output)
+                    if args.show:
+                        cv2.imshow(f"AirPaint - {session.name}", session.output)
+
+            if args.show and cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+
+            # Nenhuma sessão tinha frames novos: espera um pouco em vez de girar em vazio
+            if not busy:
+                time.sleep(0.001)
+
+            now = time.perf_counter()
+            if args.seconds is not None and now - start >= args.seconds:
+                break
+            if now - last_report >= args.report:
+                last_report = now
+                print(f"[server] {now - start:.0f} s")
+                print_report(sessions)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for session in sessions:
+            session.stop()
+        if stream is not None:
+            stream.stop()
+
+    print("[server] fim")
+    print_report(sessions)
+
+    if args.out:
+        for session in sessions:
+            with open(os.path.join(session.out_dir, "stats.json"), "w") as f:
+                json.dump(session.report(), f, indent=2)
+            with session.active():
+                if cfg.canvas is not None:
+                    cv2.imwrite(os.path.join(session.out_dir, "canvas.png"), cfg.canvas)
+
+    if args.show:
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import os
+import time
+from contextlib import contextmanager
+
+import cv2
+
+import config as cfg
+from capture import FrameCapture, open_source
+from drawing import draw_palette
+from history import UndoHistory
+from inference import Inference
+from painter import Painter
+from profiler import Profiler
+from screenshots import ScreenshotWriter
+from strokes import StrokeLog
+
+# ============================
+# Estado por sessão
+# ============================
+# Modelos: cada sessão tem a sua Inference, que guarda (e passa explicitamente aos
+# modelos) os grafos MediaPipe, a histerese do sorriso, o tracking do YOLO e o filtro
+# das mãos. Só o modelo YOLO, sem estado entre frames, é partilhado.
+#
+# Desenho: o estado de desenho da aplicação vive em config.py (canvas, histórico, cor,
+# ferramenta, ...), usado por drawing.py e painter.py. Cada sessão guarda a sua cópia
+# desses valores (DRAWING_STATE) e coloca-a em config enquanto está ativa.
+
+# Estado de desenho de cada sessão: { nome em config.py: função que cria o valor inicial }
+# (as definições simples começam com os valores de config.py, lidos ao importar)
+DRAWING_STATE = {
+    name: (lambda value=getattr(cfg, name): value)
+    for name in (
+        "thickness",
+        "color_index",
+        "current_color",
+        "spray_mode",
+        "rainbow_mode",
+        "last_rainbow_switch",
+    )
+}
+DRAWING_STATE.update(
+    canvas=lambda: None,
+    compositor=lambda: None,
+    history=lambda: UndoHistory(cfg.MAX_HISTORY_BYTES, compress=cfg.HISTORY_COMPRESS),
+    current_tool=lambda: "brush",
+    last_point=dict,
+    stroke_log=lambda: None,
+    canvas_store=lambda: None,
+    CANVAS_MMAP_PATH=lambda: None,
+)
+
+# Canvas em ficheiro mapeado (config.CANVAS_MMAP_PATH): cada sessão com pasta de saída
+# usa o seu próprio ficheiro (<out_dir>/canvas.map)
+_CANVAS_MMAP = bool(cfg.CANVAS_MMAP_PATH)
+
+
+class Session:
+    """
+    Uma instalação do AirPaint: uma fonte de imagem com o seu próprio canvas,
+    histórico, definições de desenho, estado de gestos (Painter), modelos (Inference)
+    e estatísticas.
+
+    - active(): context manager que coloca o estado de desenho da sessão em config e,
+      no fim, guarda-o de volta e repõe os valores que lá estavam (só uma sessão pode
+      estar ativa de cada vez).
+    - step(): processa o frame mais recente da fonte, se houver.
+    - profiler: tempos por etapa (infer e cada modelo, update, compose, frame) e
+      latência desde a captura.
+    """
+
+    def __init__(self, name, source, out_dir=None):
+        """
+        Parâmetros:
+        - name: nome da sessão (janela, relatórios, pasta de screenshots)
+        - source: especificação da fonte (índice de câmara, vídeo ou pasta, ver capture.open_source)
+        - out_dir: pasta para screenshots, stroke log e estatísticas (None = não grava)
+        """
+        self.name = name
+        self.out_dir = out_dir
+        self.capture = FrameCapture(open_source(source), cfg.CAPTURE_RING_SIZE)
+        self.realtime = self.capture.source.realtime
+
+        # state: { nome em config.py: valor } do estado de desenho (ver DRAWING_STATE)
+        self.state = {}
+
+        self.profiler = Profiler(True, window=cfg.PROFILE_WINDOW)
+        self.inference = Inference(profiler=self.profiler)
+        self.frames = 0
+        self.finished = False
+        self.started = None
+        self.output = None
+        self.screenshots = None
+
+        with self.active():
+            self.painter = Painter()
+
+        if out_dir is not None:
+            self.screenshots = ScreenshotWriter(
+                os.path.join(out_dir, "screenshots"),
+                cfg.SCREENSHOT_FORMAT,
+                cfg.SCREENSHOT_LEVEL,
+                cfg.SCREENSHOT_SAVE_CANVAS,
+            )
+            self.state["stroke_log"] = StrokeLog(os.path.join(out_dir, "strokes.jsonl"))
+            if _CANVAS_MMAP:
+                self.state["CANVAS_MMAP_PATH"] = os.path.join(out_dir, "canvas.map")
+
+    @contextmanager
+    def active(self):
+        previous = {name: getattr(cfg, name) for name in DRAWING_STATE}
+        for name, create in DRAWING_STATE.items():
+            if name not in self.state:
+                self.state[name] = create()
+            setattr(cfg, name, self.state[name])
+        try:
+            yield self
+        finally:
+            for name, value in previous.items():
+                self.state[name] = getattr(cfg, name)
+                setattr(cfg, name, value)
+
+    def start(self):
+        self.capture.start()
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.capture.stop()
+        self.inference.stop()
+        if self.screenshots is not None:
+            self.screenshots.stop()
+        stroke_log = self.state.get("stroke_log")
+        if stroke_log is not None:
+            stroke_log.close()
+        canvas_store = self.state.get("canvas_store")
+        if canvas_store is not None:
+            canvas_store.close()
+
+    def step(self):
+        """
+        Processa o frame mais recente da fonte (sem esperar se ainda não houver um novo).
+
+        Retorno:
+        - True se processou um frame, False caso contrário
+        """
+        if self.finished:
+            return False
+
+        ok, frame_id, stamp, frame = self.capture.read(timeout=0)
+        if not ok:
+            self.finished = self.capture.finished
+            return False
+
+        profiler = self.profiler
+        frame_start = time.perf_counter()
+
+        # Espelha o vídeo (cria uma nova imagem, libertando o buffer do anel de captura)
+        frame = cv2.flip(frame, 1)
+        h, w = frame.shape[:2]
+
+        with self.active():
+            # Inferência sequencial: acaba antes de a paleta/canvas serem desenhados no frame
+            with profiler.stage("infer"):
+                results = self.inference.infer(frame, stamp)
+
+            with profiler.stage("update"):
+                actions = self.painter.update(results, h, w, stamp)
+                draw_palette(frame)
+                if cfg.canvas_store is not None:
+                    cfg.canvas_store.tick()
+
+            with profiler.stage("compose"):
+                output = cfg.compositor.compose(frame, cfg.canvas)
+
+            # Screenshot: cópia agora, compressão e escrita em background
+            if ("screenshot", None) in actions and self.screenshots is not None:
+                self.screenshots.save(f"airpaint_{frame_id:06d}", output, cfg.canvas)
+
+        profiler.record("frame", (time.perf_counter() - frame_start) * 1000)
+
+        # Latência captura -> output (só faz sentido com o relógio da câmara)
+        if self.realtime:
+            profiler.record("latency", (time.monotonic() - stamp) * 1000)
+
+        if self.screenshots is not None:
+            for saved in self.screenshots.completed():
+                print(f"[{self.name}] screenshot {saved.paths[0]} ({'ok' if saved.ok else 'erro'}, {saved.ms:.0f} ms)")
+
+        self.frames += 1
+        self.output = output
+        return True
+
+    def report(self):
+        """
+        Devolve um resumo: frames, fps e p50/p95 de cada etapa (ms).
+        """
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return {
+            "name": self.name,
+            "frames": self.frames,
+            "fps": round(self.frames / elapsed, 2) if elapsed else 0.0,
+            "stages": self.profiler.stats(),
+        }
@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+
+from results import Landmark
+
+# ============================
+# Suavização e previsão dos landmarks das mãos
+# ============================
+# Cada deteção nova das mãos passa por um filtro One Euro (vetorizado sobre os 21
+# pontos x/y/z), que tira o tremor quando a mão está parada e quase não atrasa quando
+# se mexe depressa. O filtro também estima a velocidade de cada ponto, usada para
+# extrapolar a posição da ponta do indicador da mão que desenha nos frames sem
+# inferência nova (modo assíncrono, modelos mais lentos do que a câmara), por isso o
+# pincel avança em todos os frames em vez de saltar.
+#
+# Só essa posição (right_pos) é extrapolada: os landmarks e left_pos, usados nos gestos
+# (pinça, dedos, punho) e na paleta, ficam na última deteção filtrada, para que uma
+# posição inventada nunca dispare uma troca de ferramenta, de cor ou um clear.
+#
+# Compromisso latência / tremor (config.py):
+# - HAND_SMOOTHING_MIN_CUTOFF (Hz): menor = menos tremor com a mão parada, mais atraso
+# - HAND_SMOOTHING_BETA: maior = menos atraso nos movimentos rápidos
+# - HAND_PREDICT_MAX (s): até onde se extrapola a partir da última deteção
+
+
+def _alpha(cutoff, dt):
+    """
+    Coeficiente do filtro passa-baixo exponencial para a frequência de corte 'cutoff' (Hz).
+    (cutoff pode ser um array: um coeficiente por ponto)
+    """
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    Filtro One Euro sobre arrays NumPy (todas as coordenadas filtradas de uma vez).
+
+    - filter(x, t): filtra a medição x (array) no instante t (s) e devolve o valor filtrado
+    - state: (x_filtrado, velocidade por segundo, t) da última medição, publicado de uma
+      só vez (pode ser lido por outra thread enquanto o filtro é atualizado)
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.state = None
+
+    def filter(self, x, t):
+        if self.state is None:
+            self.state = (x, np.zeros_like(x), t)
+            return x
+
+        x_prev, dx_prev, t_prev = self.state
+        dt = t - t_prev
+        if dt <= 0:
+            return x_prev
+
+        # Velocidade suavizada (com corte fixo d_cutoff)
+        dx = (x - x_prev) / dt
+        a_d = _alpha(self.d_cutoff, dt)
+        dx_hat = a_d * dx + (1 - a_d) * dx_prev
+
+        # Corte adaptativo por ponto: mais alto quanto mais depressa o ponto se mexe
+        cutoff = self.min_cutoff + self.beta * np.abs(dx_hat)
+        a = _alpha(cutoff, dt)
+        x_hat = a * x + (1 - a) * x_prev
+
+        self.state = (x_hat, dx_hat, t)
+        return x_hat
+
+
+class HandSmoother:
+    """
+    Suaviza as deteções das mãos e prevê a posição entre deteções.
+
+    - observe(hands, stamp): recebe o resultado de uma inferência nova (tuplo de
+      detect_hands) no instante do frame em que foi calculado
+    - apply(hands, h, w, now): devolve o tuplo das mãos para o frame atual, com os
+      landmarks suavizados (última deteção), left_pos da ponta do indicador suavizada e
+      right_pos (mão que desenha, DRAW_SIDE) extrapolado até 'now'
+    Os landmarks devolvidos são Landmark (results.py); os objetos originais do MediaPipe
+    (left_hand_obj/right_hand_obj) são mantidos para o debug view.
+    """
+
+    # Mão que desenha (ver painter.py): a única cuja ponta do indicador é extrapolada
+    DRAW_SIDE = "right"
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0, predict=True, predict_max=0.1):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.predict = predict
+        self.predict_max = predict_max
+
+        # filters: { "left"/"right": OneEuroFilter } das mãos visíveis na última deteção
+        self.filters = {}
+
+    def observe(self, hands, stamp):
+        _, left_lm, right_lm, _, _, _, _ = hands
+        for side, lm in (("left", left_lm), ("right", right_lm)):
+            if lm is None:
+                # A mão desapareceu: a próxima deteção começa sem histórico
+                self.filters.pop(side, None)
+                continue
+            f = self.filters.get(side)
+            if f is None:
+                f = self.filters[side] = OneEuroFilter(self.min_cutoff, self.beta, self.d_cutoff)
+            f.filter(np.array([(p.x, p.y, p.z) for p in lm]), stamp)
+
+    def _hand(self, side, h, w, now):
+        """
+        (landmarks, posição em px da ponta do indicador) de uma mão, ou (None, None).
+        """
+        f = self.filters.get(side)
+        state = f.state if f is not None else None
+        if state is None:
+            return None, None
+        x, dx, t = state
+
+        # Ponta do indicador (landmark 8), extrapolada só na mão que desenha
+        tip = x[8]
+        if self.predict and side == self.DRAW_SIDE:
+            tip = tip + dx[8] * min(max(now - t, 0.0), self.predict_max)
+        return [Landmark(*p) for p in x.tolist()], (int(tip[0] * w), int(tip[1] * h))
+
+    def apply(self, hands, h, w, now):
+        frame, _, _, _, _, left_obj, right_obj = hands
+        left_lm, left_pos = self._hand("left", h, w, now)
+        right_lm, right_pos = self._hand("right", h, w, now)
+        return frame, left_lm, right_lm, left_pos, right_pos, left_obj, right_obj
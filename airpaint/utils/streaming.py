@@ -0,0 +1,291 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+# ============================
+# Streaming MJPEG (HTTP) do output
+# ============================
+# O loop principal só entrega a referência do frame com publish() (nunca bloqueia).
+# Uma thread de encoding comprime em JPEG o frame mais recente de cada canal e cada
+# cliente HTTP (uma thread por ligação) envia sempre o último JPEG disponível:
+# - frames publicados enquanto o encoder está ocupado são descartados
+# - um cliente lento salta diretamente para o JPEG mais recente
+# por isso o nº de clientes (e a velocidade da rede) não afeta o loop de captura/inferência.
+#
+# Endereços:
+# - /               página com os canais
+# - /<canal>.mjpg   stream multipart/x-mixed-replace (ex.: /output.mjpg, /tool.mjpg)
+# - /<canal>.jpg    último frame do canal (útil para testes com um cliente HTTP)
+
+BOUNDARY = b"airpaintframe"
+
+_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>AirPaint</title></head>
+<body style="margin:0;background:#111">{images}</body></html>
+"""
+
+
+class _Channel:
+    """
+    Estado de um canal: último frame publicado e último JPEG codificado.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.frame_seq = 0
+        self.jpeg = None
+        self.jpeg_seq = 0
+
+        # Nº de frames publicados que nunca chegaram a ser codificados
+        self.dropped = 0
+
+
+class StreamServer:
+    """
+    Servidor MJPEG sobre HTTP para ver o output (e a animação da ferramenta) noutros ecrãs.
+
+    - publish(name, frame): entrega um frame ao canal 'name' (não copia nem bloqueia;
+      o frame não deve ser alterado depois de publicado)
+    - start() / stop(): arrancam / terminam o servidor HTTP e a thread de encoding
+    - clients: nº de clientes ligados (sem clientes, nada é codificado)
+    """
+
+    def __init__(self, host="0.0.0.0", port=8080, quality=80, max_width=None):
+        """
+        Parâmetros:
+        - host, port: endereço onde o servidor escuta ("0.0.0.0" = toda a rede local)
+        - quality: qualidade JPEG (0..100)
+        - max_width: largura máxima das imagens enviadas (None = tamanho original)
+        """
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.max_width = max_width
+
+        self.channels = {}
+        self.clients = 0
+        self.cond = threading.Condition()
+
+        self.running = False
+        self.httpd = None
+        self.threads = []
+
+    # ============================
+    # Lado do loop principal
+    # ============================
+
+    def publish(self, name, frame):
+        """
+        Publica o frame mais recente de um canal (substitui o anterior se ainda não
+        tiver sido codificado).
+        """
+        with self.cond:
+            channel = self.channels.get(name)
+            if channel is None:
+                channel = self.channels[name] = _Channel()
+            if channel.frame is not None:
+                channel.dropped += 1
+            channel.frame = frame
+            channel.frame_seq += 1
+            if self.clients:
+                self.cond.notify_all()
+
+    def start(self):
+        server = self
+
+        class Handler(_StreamHandler):
+            stream = server
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self.httpd.serve_forever, name="stream-http", daemon=True),
+            threading.Thread(target=self._encode_loop, name="stream-encode", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    # ============================
+    # Thread de encoding
+    # ============================
+
+    def _encode(self, frame):
+        h, w = frame.shape[:2]
+        if self.max_width is not None and w > self.max_width:
+            k = self.max_width / w
+            frame = cv2.resize(frame, (self.max_width, round(h * k)), interpolation=cv2.INTER_AREA)
+        ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return data.tobytes() if ok else None
+
+    def _encode_loop(self):
+        """
+        Codifica o frame mais recente de cada canal que tenha clientes à espera.
+        """
+        while True:
+            with self.cond:
+                while self.running and not (self.clients and self._pending()):
+                    self.cond.wait()
+                if not self.running:
+                    return
+                work = []
+                for channel in self.channels.values():
+                    if channel.frame is not None:
+                        work.append((channel, channel.frame, channel.frame_seq))
+                        channel.frame = None
+
+            # Encoding fora do lock: publish() nunca espera pelo JPEG
+            for channel, frame, seq in work:
+                jpeg = self._encode(frame)
+                if jpeg is None:
+                    continue
+                with self.cond:
+                    channel.jpeg = jpeg
+                    channel.jpeg_seq = seq
+                    self.cond.notify_all()
+
+    def _pending(self):
+        return any(channel.frame is not None for channel in self.channels.values())
+
+    # ============================
+    # Lado dos clientes
+    # ============================
+
+    def wait_jpeg(self, name, after_seq, timeout=1.0):
+        """
+        Espera por um JPEG do canal mais recente do que 'after_seq'.
+
+        Retorno:
+        - (seq, jpeg), ou (after_seq, None) se o timeout expirar ou o servidor parar
+        """
+        with self.cond:
+            self.cond.wait_for(
+                lambda: not self.running or self._jpeg_seq(name) > after_seq,
+                timeout,
+            )
+            channel = self.channels.get(name)
+            if not self.running or channel is None or channel.jpeg_seq <= after_seq:
+                return after_seq, None
+            return channel.jpeg_seq, channel.jpeg
+
+    def latest_jpeg(self, name, timeout=1.0):
+        """
+        JPEG do frame mais recente publicado no canal (para um cliente que acabou de ligar).
+
+        Sem clientes o encoder não corre, por isso o JPEG em cache pode ser de um frame
+        muito anterior ao último publicado. Espera (até 'timeout') pelo JPEG do último
+        frame publicado; só se o timeout expirar devolve o JPEG em cache.
+        Deve ser chamado com o cliente já contado (_connect), senão nada é codificado.
+
+        Retorno:
+        - (seq, jpeg), ou (0, None) se o canal ainda não tiver nenhum JPEG
+        """
+        with self.cond:
+            channel = self.channels.get(name)
+            target = 0 if channel is None else channel.frame_seq
+        seq, jpeg = self.wait_jpeg(name, max(target, 1) - 1, timeout)
+        if jpeg is None:
+            with self.cond:
+                channel = self.channels.get(name)
+                if channel is not None and channel.jpeg is not None:
+                    return channel.jpeg_seq, channel.jpeg
+        return seq, jpeg
+
+    def _jpeg_seq(self, name):
+        channel = self.channels.get(name)
+        return 0 if channel is None else channel.jpeg_seq
+
+    def _connect(self, delta):
+        with self.cond:
+            self.clients += delta
+            self.cond.notify_all()
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """
+    Pedidos HTTP de um cliente (cada ligação corre na sua própria thread).
+    """
+
+    stream = None
+
+    def log_message(self, format, *args):
+        # Sem log de cada pedido na consola
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0].strip("/")
+        name, _, ext = path.partition(".")
+
+        if path == "":
+            self._page()
+        elif ext in ("mjpg", "jpg") and name in self.stream.channels:
+            if ext == "mjpg":
+                self._mjpeg(name)
+            else:
+                self._snapshot(name)
+        else:
+            self.send_error(404)
+
+    def _page(self):
+        images = "".join(f'<img src="/{name}.mjpg">' for name in self.stream.channels)
+        body = _PAGE.format(images=images).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _snapshot(self, name):
+        stream = self.stream
+        stream._connect(1)
+        try:
+            _, jpeg = stream.latest_jpeg(name, timeout=5.0)
+        finally:
+            stream._connect(-1)
+        if jpeg is None:
+            self.send_error(503)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(jpeg)))
+        self.end_headers()
+        self.wfile.write(jpeg)
+
+    def _mjpeg(self, name):
+        stream = self.stream
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=" + BOUNDARY.decode())
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        stream._connect(1)
+        try:
+            # Primeiro frame: o do último frame publicado (não o JPEG antigo em cache)
+            seq, jpeg = stream.latest_jpeg(name)
+            while stream.running:
+                if jpeg is not None:
+                    self.wfile.write(
+                        b"--" + BOUNDARY + b"\r\n"
+                        b"Content-Type: image/jpeg\r\n"
+                        b"Content-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n"
+                        + jpeg + b"\r\n"
+                    )
+                seq, jpeg = stream.wait_jpeg(name, seq)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            stream._connect(-1)
@@ -0,0 +1,218 @@
+import json
+import time
+
+import cv2
+import numpy as np
+
+from drawing import paint_dots
+
+# ============================
+# Registo vetorial dos traços (stroke log)
+# ============================
+# Formato JSON-lines (append-only), uma operação de desenho por linha:
+# - 1ª linha (cabeçalho): {"width": w, "height": h}
+# - {"t", "op": "brush",  "p": [x0, y0, x1, y1], "r": raio, "c": [b, g, r]}
+# - {"t", "op": "eraser", "p": [x0, y0, x1, y1], "r": raio}
+# - {"t", "op": "spray",  "p": [x, y, x, y, ...] (centros dos pontos), "r": raio, "c": [b, g, r]}
+# - {"t", "op": "clear"}
+# - {"t", "op": "end"}            fim de traço (agrupa as operações num passo de undo)
+# - {"t", "op": "undo" / "redo"}  só registados quando alteraram o canvas
+# Operações totalmente fora do canvas não são registadas (também não entram no histórico).
+# As coordenadas estão em px do canvas original; o canvas pode ser reconstruído a
+# qualquer resolução (scale) e em qualquer instante (until), ou exportado para SVG.
+# O ficheiro é escrito para o disco em cada fronteira de traço (end, clear, undo, redo):
+# se o processo morrer, perde-se no máximo o traço em curso.
+
+
+class StrokeLog:
+    """
+    Grava as operações de desenho de drawing.py (ver config.stroke_log).
+
+    O instante de cada operação é o último passado a set_time() (o 'now' do Painter,
+    que também é o tempo do vídeo em replay); sem set_time() usa time.monotonic().
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+        self.now = None
+
+        # Há um traço aberto (evita registar um "end" em cada frame sem desenho)
+        self.open = False
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _op(self, op, **fields):
+        t = time.monotonic() if self.now is None else self.now
+        self._write({"t": round(t, 3), "op": op, **fields})
+
+    def begin(self, h, w):
+        """
+        Escreve o cabeçalho com as dimensões do canvas (chamada por drawing.ensure_canvas).
+        Num ficheiro que já tem traços, continua a acrescentar a seguir (mesmo desenho).
+        """
+        if self.file.tell() == 0:
+            self._write({"width": w, "height": h})
+
+    def set_time(self, now):
+        self.now = now
+
+    def segment(self, tool, x0, y0, x1, y1, r, color=None):
+        fields = {"p": [int(x0), int(y0), int(x1), int(y1)], "r": int(r)}
+        if color is not None:
+            fields["c"] = [int(v) for v in color]
+        self._op(tool, **fields)
+        self.open = True
+
+    def spray(self, centers, r, color):
+        self._op("spray", p=centers.ravel().tolist(), r=int(r), c=[int(v) for v in color])
+        self.open = True
+
+    def clear(self):
+        self._op("clear")
+        self.flush()
+
+    def end(self):
+        if self.open:
+            self._op("end")
+            self.open = False
+            self.flush()
+
+    def undo(self):
+        self._op("undo")
+        self.flush()
+
+    def redo(self):
+        self._op("redo")
+        self.flush()
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# ============================
+# Leitura e reconstrução
+# ============================
+
+class StrokeReplay:
+    """
+    Lê um stroke log e devolve as operações visíveis (depois de aplicar undo/redo).
+
+    - height/width: dimensões do canvas original
+    - ops: lista de todas as operações gravadas
+    - visible(until=None): operações que compõem o canvas no instante 'until'
+    - render(scale=1.0, until=None): canvas BGR reconstruído
+    - to_svg(scale=1.0, until=None): o mesmo desenho em SVG
+    """
+
+    def __init__(self, path):
+        with open(path) as f:
+            header = json.loads(f.readline())
+            self.height = header["height"]
+            self.width = header["width"]
+            self.ops = [json.loads(line) for line in f if line.strip()]
+
+    def visible(self, until=None):
+        """
+        Agrupa as operações em passos tal como o UndoHistory (um passo termina com "end",
+        com uma mudança de ferramenta, com undo/redo ou com clear) e aplica undo/redo.
+        """
+        steps = []
+        redo_steps = []
+        current = []
+
+        def close():
+            nonlocal current
+            if current:
+                redo_steps.clear()
+                steps.append(current)
+            current = []
+
+        for op in self.ops:
+            if until is not None and op["t"] > until:
+                break
+            kind = op["op"]
+            if kind == "end":
+                close()
+            elif kind == "undo":
+                close()
+                if steps:
+                    redo_steps.append(steps.pop())
+            elif kind == "redo":
+                close()
+                if redo_steps:
+                    steps.append(redo_steps.pop())
+            else:
+                if current and current[-1]["op"] != kind:
+                    close()
+                current.append(op)
+                if kind == "clear":
+                    close()
+        close()
+
+        # Tudo o que está antes do último clear visível não aparece no canvas
+        ops = [op for step in steps for op in step]
+        for i in range(len(ops) - 1, -1, -1):
+            if ops[i]["op"] == "clear":
+                return ops[i + 1:]
+        return ops
+
+    def render(self, scale=1.0, until=None):
+        """
+        Desenha as operações visíveis num canvas preto com 'scale' vezes o tamanho original.
+        Com scale=1 o resultado é igual ao canvas desenhado ao vivo.
+        """
+        h, w = round(self.height * scale), round(self.width * scale)
+        canvas = np.zeros((h, w, 3), np.uint8)
+        for op in self.visible(until):
+            color = tuple(op.get("c", (0, 0, 0)))
+            r = max(1, round(op["r"] * scale)) if scale != 1 else op["r"]
+            if op["op"] == "spray":
+                # Todos os pontos de uma vez, como drawing.spray_at (raio escalado fora de scale=1)
+                centers = np.array(op["p"], np.int64).reshape(-1, 2)
+                if scale != 1:
+                    centers = np.round(centers * scale).astype(np.int64)
+                paint_dots(canvas, centers, r, color)
+                continue
+            x0, y0, x1, y1 = (round(v * scale) for v in op["p"])
+            if (x0, y0) == (x1, y1):
+                cv2.circle(canvas, (x1, y1), r, color, -1)
+            else:
+                cv2.line(canvas, (x0, y0), (x1, y1), color, 2 * r + 1)
+        return canvas
+
+    def to_svg(self, scale=1.0, until=None):
+        """
+        Devolve o desenho em SVG (fundo preto; a borracha é tinta preta, como no canvas).
+        """
+        def hex_color(c):
+            b, g, r = c
+            return f"#{r:02x}{g:02x}{b:02x}"
+
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{round(self.width * scale)}" '
+            f'height="{round(self.height * scale)}" viewBox="0 0 {self.width} {self.height}">',
+            f'<rect width="{self.width}" height="{self.height}" fill="#000000"/>',
+        ]
+        for op in self.visible(until):
+            color = hex_color(op.get("c", (0, 0, 0)))
+            r = op["r"]
+            if op["op"] == "spray":
+                parts.append(f'<g fill="{color}">')
+                p = op["p"]
+                parts.extend(f'<circle cx="{x}" cy="{y}" r="{r}"/>' for x, y in zip(p[0::2], p[1::2]))
+                parts.append("</g>")
+                continue
+            x0, y0, x1, y1 = op["p"]
+            if (x0, y0) == (x1, y1):
+                parts.append(f'<circle cx="{x1}" cy="{y1}" r="{r}" fill="{color}"/>')
+            else:
+                parts.append(
+                    f'<line x1="{x0}" y1="{y0}" x2="{x1}" y2="{y1}" stroke="{color}" '
+                    f'stroke-width="{2 * r + 1}" stroke-linecap="round"/>'
+                )
+        parts.append("</svg>")
+        return "\n".join(parts)
@@ -1,7 +1,10 @@
 import cv2
+import glob
+import hashlib
 import os
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 
 class ToolWindow:
@@ -13,16 +16,33 @@ class ToolWindow:
     - Carrega frames PNG (com ou sem alpha) de pastas dentro de um diretório base.
     - Mantém um índice por ferramenta e avança esse índice com um delay fixo.
     - Devolve sempre uma imagem (canvas) 300x300 pronta para ser mostrada no cv2.imshow().
+    - Os frames são redimensionados e compostos (alpha) uma única vez no carregamento,
+      por isso get_frame() é só uma consulta a um buffer em cache.
+    - Carregamento rápido no arranque:
+      - só a ferramenta ativa é carregada no construtor; as outras são carregadas
+        (de forma preguiçosa) quando forem pedidas pela primeira vez
+      - os PNGs são descodificados em paralelo numa thread pool (fechada em close())
+      - o resultado já preparado fica guardado num ficheiro .npy por ferramenta
+        (invalidado quando os assets mudam), que nos arranques seguintes é mapeado
+        em memória em vez de voltar a descodificar os PNGs
     """
 
-    def __init__(self, base_path=None):
+    # Mapeamento ferramenta -> pasta de assets
+    FOLDERS = {"brush": "pencil", "eraser": "rubber", "spray": "can"}
+
+    def __init__(self, base_path=None, active_tool="brush", cache_dir=None):
         """
         Inicializa o ToolWindow.
 
         Parâmetros:
         - base_path: caminho opcional para a pasta base dos assets.
           Se None, usa por defeito ../assets relativo ao ficheiro atual.
+        - active_tool: ferramenta carregada primeiro (antes de o construtor terminar).
+        - cache_dir: pasta dos ficheiros .npy pré-processados.
+          Se None, usa <base_path>/.cache; se False, não usa cache em disco.
         """
+        start = time.perf_counter()
+
         # Diretório onde este ficheiro .py está localizado
         base_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -34,7 +54,13 @@ class ToolWindow:
         else:
             self.base_path = os.path.abspath(base_path)
 
-        # animations: dicionário { "tool": [frames...] }
+        if cache_dir is None:
+            self.cache_dir = os.path.join(self.base_path, ".cache")
+        else:
+            self.cache_dir = cache_dir
+
+        # animations: dicionário { "tool": array (n, window_h, window_w, 3) uint8 }
+        # com os frames já redimensionados, centrados e compostos sobre fundo preto
         self.animations = {}
 
         # index: índice atual do frame para cada ferramenta
@@ -50,8 +76,37 @@ class ToolWindow:
         self.window_w = 300
         self.window_h = 300
 
-        # Carrega todas as animações disponíveis
-        self._load()
+        # Imagem mostrada quando a ferramenta não existe ou não tem frames
+        self.no_tool = np.zeros((self.window_h, self.window_w, 3), dtype=np.uint8)
+        cv2.putText(
+            self.no_tool,
+            "NO TOOL",
+            (60, 160),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.8,
+            (255, 255, 255),
+            2,
+        )
+
+        # Pool de threads que descodifica PNGs em paralelo (cv2.imread liberta o GIL)
+        self._decoder = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+
+        # Carrega a ferramenta ativa (as restantes só quando forem pedidas)
+        self._load(active_tool)
+
+        self.startup_time = time.perf_counter() - start
+        print(f"[ToolWindow] pronto em {self.startup_time * 1000:.0f} ms")
+
+    def _read(self, path):
+        # Lê mantendo alpha se houver (4 canais)
+        return cv2.imread(path, cv2.IMREAD_UNCHANGED)
+
+    def _frame_paths(self, folder):
+        """
+        Devolve os caminhos dos frames de uma pasta, ordenados pelo nome
+        (importante para animações frame_001, frame_002, etc.).
+        """
+        return [os.path.join(folder, f) for f in sorted(os.listdir(folder))]
 
     def _load_frames(self, folder):
         """
@@ -59,79 +114,172 @@ class ToolWindow:
 
         - Ordena os nomes dos ficheiros para manter a sequência correta.
         - Lê com IMREAD_UNCHANGED para preservar canal alpha se existir (PNG com transparência).
+        - As imagens são descodificadas em paralelo na thread pool.
         - Devolve uma lista de imagens (arrays NumPy).
         """
-        frames = []
-
         # Se a pasta não existir, informa e devolve lista vazia
         if not os.path.exists(folder):
             print(f"[ToolWindow] Pasta não encontrada: {folder}")
-            return frames
+            return []
 
-        # Percorre ficheiros ordenados (importante para animações frame_001, frame_002, etc.)
-        for f in sorted(os.listdir(folder)):
-            path = os.path.join(folder, f)
-
-            # Lê mantendo alpha se houver (4 canais)
-            img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
-            if img is not None:
-                frames.append(img)
+        images = self._decoder.map(self._read, self._frame_paths(folder))
+        frames = [img for img in images if img is not None]
 
         # Debug: mostra quantos frames foram carregados
         print(f"[ToolWindow] {folder}: {len(frames)} frames")
         return frames
 
-    def _load(self):
+    def _prepare_frames(self, frames):
+        """
+        Converte os frames carregados nas imagens finais mostradas na janela.
+
+        Para cada frame (feito uma única vez, no carregamento):
+        - redimensiona para caber na janela com margem (0.85)
+        - centra o frame num canvas preto do tamanho da janela
+        - se tiver alpha (4º canal), multiplica as cores pelo alpha (sobre fundo preto,
+          o blending fica reduzido a cor * alpha)
+
+        Devolve um único array (n, window_h, window_w, 3) uint8.
+        """
+        out = np.zeros((len(frames), self.window_h, self.window_w, 3), dtype=np.uint8)
+
+        for i, frame in enumerate(frames):
+            # Calcula escala para caber na janela (com margem 0.85 para não encostar às bordas)
+            h, w = frame.shape[:2]
+            scale = min(self.window_w / w, self.window_h / h) * 0.85
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
+
+            # Coordenadas para centrar o frame no canvas
+            y = (self.window_h - frame.shape[0]) // 2
+            x = (self.window_w - frame.shape[1]) // 2
+            region = out[i, y:y + frame.shape[0], x:x + frame.shape[1]]
+
+            if frame.ndim == 3 and frame.shape[2] == 4:
+                # Cor pré-multiplicada pelo alpha (mesmo arredondamento do blending antigo)
+                alpha = frame[:, :, 3:4] / 255.0
+                region[:] = frame[:, :, :3] * alpha
+            elif frame.ndim == 2:
+                region[:] = frame[:, :, None]
+            else:
+                region[:] = frame
+
+        return out
+
+    # ============================
+    # Cache em disco
+    # ============================
+
+    def _cache_key(self, folder):
+        """
+        Chave que identifica o conteúdo de uma pasta de assets:
+        nomes, tamanhos e datas de modificação dos ficheiros + tamanho da janela.
+        Se algum asset mudar, a chave muda e o cache antigo deixa de ser usado.
+        """
+        digest = hashlib.sha1(f"{self.window_w}x{self.window_h}".encode())
+        for path in self._frame_paths(folder):
+            st = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return digest.hexdigest()[:16]
+
+    def _load_tool(self, tool):
+        """
+        Carrega a animação já preparada de uma ferramenta.
+
+        - Se existir um .npy válido no cache, mapeia-o em memória (sem descodificar PNGs).
+        - Caso contrário, descodifica os PNGs, prepara os frames e grava o .npy.
+        """
+        folder = os.path.join(self.base_path, self.FOLDERS[tool])
+        if not self.cache_dir or not os.path.exists(folder):
+            return self._prepare_frames(self._load_frames(folder))
+
+        path = os.path.join(self.cache_dir, f"{tool}-{self._cache_key(folder)}.npy")
+        if os.path.exists(path):
+            try:
+                frames = np.asarray(np.load(path, mmap_mode="r"))
+                print(f"[ToolWindow] {folder}: {len(frames)} frames (cache)")
+                return frames
+            except (OSError, ValueError) as e:
+                print(f"[ToolWindow] Cache inválido ({path}): {e}")
+
+        frames = self._prepare_frames(self._load_frames(folder))
+
+        # Grava o novo cache (ficheiro temporário + replace) e apaga versões antigas
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for old in glob.glob(os.path.join(self.cache_dir, f"{tool}-*.npy")):
+                os.remove(old)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, frames)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[ToolWindow] Não foi possível gravar o cache ({path}): {e}")
+
+        return frames
+
+    def _load(self, active_tool):
         """
         Carrega as animações para cada ferramenta.
 
-        Mapeamento:
+        Mapeamento (FOLDERS):
         - "brush"  -> pasta "pencil"
         - "eraser" -> pasta "rubber"
         - "spray"  -> pasta "can"
 
+        Só a ferramenta ativa é carregada já; as outras são carregadas por _ensure()
+        na primeira vez que forem pedidas.
+
         Também inicializa:
         - index[tool] = 0
         - last_time[tool] = time.time()
         """
-        self.animations["brush"] = self._load_frames(os.path.join(self.base_path, "pencil"))
-        self.animations["eraser"] = self._load_frames(os.path.join(self.base_path, "rubber"))
-        self.animations["spray"] = self._load_frames(os.path.join(self.base_path, "can"))
+        if active_tool in self.FOLDERS:
+            self.animations[active_tool] = self._load_tool(active_tool)
 
         # Inicializa controlo de animação por ferramenta
-        for k in self.animations:
+        for k in self.FOLDERS:
             self.index[k] = 0
             self.last_time[k] = time.time()
 
+    def _ensure(self, tool):
+        """
+        Garante que a animação da ferramenta está disponível (carrega-a agora se for
+        a primeira vez que é pedida; com o cache em disco é só mapear o .npy).
+        """
+        if tool in self.FOLDERS and tool not in self.animations:
+            self.animations[tool] = self._load_tool(tool)
+
+    def load_all(self):
+        """
+        Carrega já todas as ferramentas que ainda não foram carregadas.
+        """
+        for tool in self.FOLDERS:
+            self._ensure(tool)
+
+    def close(self):
+        """
+        Termina a thread pool de descodificação.
+        """
+        self._decoder.shutdown(wait=True)
+
     def get_frame(self, tool):
         """
         Devolve a imagem (canvas) 300x300 com a animação da ferramenta pedida.
 
         Passos:
-        - Cria um canvas preto (BGR) do tamanho da janela.
-        - Se a ferramenta não existir ou não tiver frames, escreve "NO TOOL" e devolve.
+        - Se a ferramenta ainda não tiver sido carregada, carrega-a agora.
+        - Se a ferramenta não existir ou não tiver frames, devolve a imagem "NO TOOL".
         - Caso exista:
           - atualiza o índice do frame baseado no delay
-          - redimensiona o frame para caber na janela com margem (0.85)
-          - centra o frame no canvas
-          - se tiver alpha (4º canal), faz blending manual (overlay com transparência)
-          - devolve o canvas final
+          - devolve o frame correspondente, já preparado em _prepare_frames()
+
+        Nota: a imagem devolvida é um buffer em cache (não deve ser alterada).
         """
-        # Canvas base (preto) onde a animação será desenhada
-        canvas = np.zeros((self.window_h, self.window_w, 3), dtype=np.uint8)
+        self._ensure(tool)
 
         # Se a ferramenta não existir no dicionário ou não tiver frames carregados
-        if tool not in self.animations or not self.animations[tool]:
-            cv2.putText(
-                canvas,
-                "NO TOOL",
-                (60, 160),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (255, 255, 255),
-                2,
-            )
-            return canvas
+        if tool not in self.animations or len(self.animations[tool]) == 0:
+            return self.no_tool
 
         # Atualiza frame atual conforme o tempo (controlo de FPS da animação)
         now = time.time()
@@ -139,28 +287,4 @@ class ToolWindow:
             self.index[tool] = (self.index[tool] + 1) % len(self.animations[tool])
             self.last_time[tool] = now
 
-        # Frame atual da animação
-        frame = self.animations[tool][self.index[tool]]
-
-        # Calcula escala para caber na janela (com margem 0.85 para não encostar às bordas)
-        h, w = frame.shape[:2]
-        scale = min(self.window_w / w, self.window_h / h) * 0.85
-        frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
-
-        # Coordenadas para centrar o frame no canvas
-        y = (self.window_h - frame.shape[0]) // 2
-        x = (self.window_w - frame.shape[1]) // 2
-
-        # Se a imagem tiver 4 canais (BGRA), faz blending usando o canal alpha
-        if frame.shape[2] == 4:
-            alpha = frame[:, :, 3] / 255.0
-            for c in range(3):
-                canvas[y:y+frame.shape[0], x:x+frame.shape[1], c] = (
-                    canvas[y:y+frame.shape[0], x:x+frame.shape[1], c] * (1 - alpha)
-                    + frame[:, :, c] * alpha
-                )
-        else:
-            # Se não houver alpha, copia diretamente para o canvas
-            canvas[y:y+frame.shape[0], x:x+frame.shape[1]] = frame
-
-        return canvas
\ No newline at end of file
+        return self.animations[tool][self.index[tool]]
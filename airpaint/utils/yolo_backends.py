@@ -0,0 +1,221 @@
+import os
+
+import cv2
+import numpy as np
+
+# ============================
+# Backends de inferência do YOLO
+# ============================
+# Todos os backends têm o mesmo método:
+#     predict(frame, conf, classes) -> (xyxy, cls, conf)
+# - frame: imagem BGR
+# - conf: confiança mínima
+# - classes: lista de IDs COCO a considerar (None = todas)
+# - devolve arrays NumPy: xyxy (N, 4) em px do frame recebido, cls (N,) e conf (N,)
+#
+# Backends:
+# - "ultralytics": o modelo .pt através do Ultralytics/PyTorch (comportamento original)
+# - "onnxruntime": o modelo exportado uma vez para ONNX (opcionalmente int8), com
+#   entrada fixa e mais pequena (YOLO_IMGSZ), corrido pelo ONNX Runtime no CPU
+# - "opencv": o mesmo ONNX corrido pelo módulo DNN do OpenCV (sem dependências extra)
+# Os backends ONNX não importam ultralytics/torch (só para exportar o modelo, uma vez).
+
+# IoU do NMS (o mesmo valor por defeito do Ultralytics)
+NMS_IOU = 0.7
+
+
+class UltralyticsBackend:
+    """
+    YOLO através do Ultralytics (PyTorch).
+    """
+
+    def __init__(self, weights="yolov8n.pt", imgsz=None):
+        from ultralytics import YOLO
+
+        self.model = YOLO(weights)
+        self.imgsz = imgsz
+
+    def predict(self, frame, conf, classes=None):
+        kwargs = {"imgsz": self.imgsz} if self.imgsz else {}
+        results = self.model(frame, verbose=False, conf=conf, classes=classes, **kwargs)
+
+        # Converte as boxes para arrays de uma só vez (evita acessos tensor a tensor)
+        boxes = results[0].boxes
+        return (
+            np.array(boxes.xyxy.tolist(), np.float32).reshape(-1, 4),
+            np.array(boxes.cls.tolist(), np.int64),
+            np.array(boxes.conf.tolist(), np.float32),
+        )
+
+
+class _OnnxYolo:
+    """
+    Pré e pós-processamento comuns aos backends ONNX (YOLOv8 exportado pelo Ultralytics).
+
+    - Pré: letterbox para imgsz x imgsz (mantém a proporção, margens a cinzento 114),
+      BGR -> RGB, 0..1, NCHW.
+    - Pós: saída (1, 4 + nº classes, N) com caixas (cx, cy, w, h); o filtro de classes
+      é aplicado antes de tudo (só as colunas das classes pedidas são lidas), depois a
+      confiança mínima e o NMS por classe, e por fim as caixas voltam ao espaço do frame.
+    Subclasses implementam _forward(blob) -> saída do modelo.
+    """
+
+    def __init__(self, imgsz):
+        self.imgsz = imgsz
+
+        # Buffer da imagem com margens, reutilizado entre frames
+        self._padded = np.full((imgsz, imgsz, 3), 114, np.uint8)
+
+    def _preprocess(self, frame):
+        h, w = frame.shape[:2]
+        s = self.imgsz
+        r = min(s / h, s / w)
+        nh, nw = round(h * r), round(w * r)
+        top, left = (s - nh) // 2, (s - nw) // 2
+
+        padded = self._padded
+        padded[:] = 114
+        padded[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+
+        blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)
+        return blob, r, left, top
+
+    def _postprocess(self, output, conf, classes, r, left, top):
+        pred = output[0].T
+
+        # Filtro de classes dentro do pós-processamento: só as colunas pedidas
+        scores = pred[:, 4:]
+        if classes:
+            ids = np.asarray(classes)
+            scores = scores[:, ids]
+        else:
+            ids = np.arange(scores.shape[1])
+
+        best = scores.argmax(axis=1)
+        best_conf = scores[np.arange(len(scores)), best]
+        keep = best_conf >= conf
+        if not keep.any():
+            return np.zeros((0, 4), np.float32), np.zeros(0, np.int64), np.zeros(0, np.float32)
+
+        boxes = pred[keep, :4]
+        best_conf = best_conf[keep]
+        cls = ids[best[keep]]
+
+        # (cx, cy, w, h) -> (x, y, w, h) para o NMS
+        xywh = boxes.copy()
+        xywh[:, :2] -= xywh[:, 2:] / 2
+
+        # NMS por classe: cada classe é deslocada para uma zona própria, para que
+        # caixas de classes diferentes nunca se sobreponham
+        shifted = xywh.copy()
+        shifted[:, :2] += cls[:, None] * (self.imgsz + 1)
+        kept = cv2.dnn.NMSBoxes(shifted, best_conf, conf, NMS_IOU)
+        kept = np.asarray(kept, np.int64).reshape(-1)
+
+        # Letterbox -> px do frame
+        x1 = (xywh[kept, 0] - left) / r
+        y1 = (xywh[kept, 1] - top) / r
+        x2 = x1 + xywh[kept, 2] / r
+        y2 = y1 + xywh[kept, 3] / r
+        xyxy = np.stack([x1, y1, x2, y2], axis=1).astype(np.float32)
+        return xyxy, cls[kept], best_conf[kept].astype(np.float32)
+
+    def predict(self, frame, conf, classes=None):
+        blob, r, left, top = self._preprocess(frame)
+        return self._postprocess(self._forward(blob), conf, classes, r, left, top)
+
+
+class OnnxRuntimeBackend(_OnnxYolo):
+    """
+    YOLO em ONNX corrido pelo ONNX Runtime (CPU).
+    """
+
+    def __init__(self, path, imgsz=320, threads=None):
+        import onnxruntime as ort
+
+        super().__init__(imgsz)
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _forward(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenCVDnnBackend(_OnnxYolo):
+    """
+    YOLO em ONNX corrido pelo módulo DNN do OpenCV (CPU).
+    """
+
+    def __init__(self, path, imgsz=320):
+        super().__init__(imgsz)
+        self.net = cv2.dnn.readNetFromONNX(path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def _forward(self, blob):
+        self.net.setInput(blob)
+        return self.net.forward()
+
+
+def export_onnx(weights="yolov8n.pt", imgsz=320, int8=False, path=None):
+    """
+    Exporta o modelo .pt para ONNX com entrada fixa imgsz x imgsz (só é preciso uma vez).
+
+    Com int8=True, os pesos são quantizados para int8 (quantização dinâmica do ONNX Runtime).
+    Devolve o caminho do ficheiro .onnx.
+    """
+    from ultralytics import YOLO
+
+    exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+    if path is None:
+        path = onnx_path(weights, imgsz, int8)
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(exported, path, weight_type=QuantType.QUInt8)
+    elif os.path.abspath(exported) != os.path.abspath(path):
+        os.replace(exported, path)
+    return path
+
+
+def onnx_path(weights, imgsz, int8=False):
+    """
+    Nome do ficheiro ONNX exportado (ex.: yolov8n_320.onnx, yolov8n_320_int8.onnx).
+    """
+    base = os.path.splitext(weights)[0]
+    return f"{base}_{imgsz}{'_int8' if int8 else ''}.onnx"
+
+
+def make_backend(name, weights="yolov8n.pt", imgsz=320, int8=False, path=None):
+    """
+    Cria o backend pedido ("ultralytics", "onnxruntime" ou "opencv").
+
+    Todos os backends usam a mesma entrada imgsz (o Ultralytics recebe-a em cada
+    chamada, em vez do seu tamanho por defeito de 640).
+
+    Para os backends ONNX, o modelo é exportado na primeira utilização se o ficheiro
+    (path, ou o nome dado por onnx_path) ainda não existir.
+
+    int8 só é suportado pelo "onnxruntime": o modelo quantizado (quantize_dynamic) usa
+    operadores (ConvInteger, DynamicQuantizeLinear) que o OpenCV DNN não carrega, por
+    isso "opencv" com int8=True dá ValueError.
+    """
+    if name == "ultralytics":
+        return UltralyticsBackend(weights, imgsz)
+    if name not in ("onnxruntime", "opencv"):
+        raise ValueError(f"backend YOLO desconhecido: {name}")
+    if int8 and name == "opencv":
+        raise ValueError("o backend YOLO \"opencv\" não suporta o modelo int8 (usar \"onnxruntime\")")
+
+    if path is None:
+        path = onnx_path(weights, imgsz, int8)
+    if not os.path.exists(path):
+        export_onnx(weights, imgsz, int8, path)
+
+    if name == "onnxruntime":
+        return OnnxRuntimeBackend(path, imgsz)
+    return OpenCVDnnBackend(path, imgsz)
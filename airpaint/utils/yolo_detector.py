@@ -1,10 +1,25 @@
-from ultralytics import YOLO
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+import config as cfg
+from results import Detection
+from yolo_backends import make_backend
 
 # ============================
-# Modelo YOLOv8 (Ultralytics)
+# Modelo YOLOv8
 # ============================
-# Carrega um modelo pré-treinado (YOLOv8 nano) para deteção de objetos.
-model = YOLO("yolov8n.pt")
+# Carrega um modelo pré-treinado (YOLOv8 nano) para deteção de objetos, através do
+# backend escolhido em config.YOLO_BACKEND (Ultralytics, ONNX Runtime ou OpenCV DNN,
+# ver yolo_backends.py).
+model = make_backend(
+    cfg.YOLO_BACKEND,
+    cfg.YOLO_WEIGHTS,
+    cfg.YOLO_IMGSZ,
+    cfg.YOLO_INT8,
+    cfg.YOLO_ONNX_PATH,
+)
 
 # ============================
 # Classes alvo (IDs COCO)
@@ -15,106 +30,358 @@ BOOK_CLASS = [73]
 # CAN_CLASSES: lista com os ID(s) COCO considerados como "lata" (ex.: garrafa/recipiente).
 CAN_CLASSES = [39, 41]
 
+# ============================
+# Regras e resultados tipados
+# ============================
+# ObjectRule descreve um objeto "lógico" que queremos reconhecer:
+# - name: nome da regra (ex.: "book", "can")
+# - classes: IDs COCO aceites para esta regra
+# - min_ratio: razão mínima altura/largura da bounding box
+# - min_w / min_h: tamanho mínimo da box em pixels
+ObjectRule = namedtuple("ObjectRule", ["name", "classes", "min_ratio", "min_w", "min_h"])
 
-def detect_book(frame):
+# Cada deteção que passa os filtros de uma regra é devolvida como um
+# results.Detection (cls, conf, xyxy).
+
+# Lado (px) dos recortes usados para confirmar a aparência das boxes seguidas
+PATCH_SIZE = 24
+
+
+class TrackerState:
     """
-    Deteta se existe um "livro" no frame usando YOLO.
+    Estado de uma sequência de frames (uma câmara) entre chamadas a ObjectDetector.detect.
 
-    Estratégia:
-    - Corre o modelo YOLO no frame com conf=0.25.
-    - Percorre todas as bounding boxes detetadas.
-    - Filtra apenas as boxes cuja classe esteja em BOOK_CLASS.
-    - Aplica filtros geométricos para reduzir falsos positivos:
-      - Razão altura/largura: exige que o objeto seja relativamente "alto" (h/w >= 1.1)
-      - Tamanho mínimo em pixels: w >= 60 e h >= 90
-    - Se encontrar uma box válida, devolve True.
+    O detector (modelo, regras, cadência) pode ser partilhado por várias câmaras;
+    cada uma passa o seu TrackerState (ver Inference), para que o cache do último
+    frame e as boxes seguidas de uma nunca se misturem com as de outra.
 
-    Retorno:
-    - bool: True se detetar um livro que passe os filtros, False caso contrário.
+    - last_frame / last_result: cache do último frame processado (comparado por identidade)
+    - prev_small: miniatura cinzenta do frame anterior (optical flow / movimento)
+    - since_run: frames desde a última execução do YOLO
+    - patches: recortes (cinzento, PATCH_SIZE) de cada box no frame em que o YOLO
+      correu: { nome_da_regra: [recorte, ...] }, pela ordem das deteções
     """
-    # Executa deteção no frame
-    results = model(frame, verbose=False, conf=0.25)
-
-    # Percorre resultados (pode haver vários "r" dependendo da API/execução)
-    for r in results:
-        # Percorre todas as bounding boxes detetadas
-        for box in r.boxes:
-            # Classe prevista (convertida para int)
-            cls = int(box.cls[0])
-
-            # Ignora classes que não sejam "livro"
-            if cls not in BOOK_CLASS:
-                continue
 
-            # Coordenadas da bounding box (x1, y1, x2, y2)
-            x1, y1, x2, y2 = box.xyxy[0]
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.last_frame = None
+        self.last_result = None
+        self.prev_small = None
+        self.since_run = 0
+        self.patches = {}
+
+
+class ObjectDetector:
+    """
+    Detector de objetos que corre o YOLO UMA única vez por frame.
+
+    Ideia geral:
+    - Cada objeto que nos interessa é registado como uma ObjectRule.
+    - O modelo é chamado apenas com a união das classes de todas as regras
+      (ex.: 73, 39 e 41), o que também reduz o trabalho do NMS.
+    - Cada box é depois testada contra todas as regras e o resultado é um
+      dicionário { nome_da_regra: [Detection, ...] }.
+    - O último resultado fica em cache para o mesmo objeto frame, por isso
+      detect_book/detect_can podem ser chamados sobre o mesmo frame sem
+      voltar a correr a inferência.
+    - O estado entre frames (cache, tracking) vive num TrackerState: cada câmara
+      passa o seu a detect(); sem nenhum, é usado o do próprio detector (tracker).
+
+    Cadência adaptativa (interval > 1):
+    - O YOLO só corre a cada 'interval' frames, ou mais cedo se a cena mudar
+      muito (diferença média entre miniaturas >= motion_threshold).
+    - Entre execuções, as boxes da última deteção são deslocadas com optical
+      flow (Lucas-Kanade) sobre miniaturas em tons de cinzento, por isso os
+      timers que dependem delas (hold do livro, spray da lata) continuam a ver
+      o objeto em todos os frames.
+    - Em cada box seguida, o recorte atual é comparado (correlação normalizada)
+      com o recorte guardado quando o YOLO a detetou. Se o objeto saiu do frame,
+      o optical flow costuma continuar a "seguir" o fundo, mas a aparência muda:
+      nesse caso (ou se o optical flow falhar) o YOLO volta a correr logo nesse
+      frame, para que os timers nunca vejam uma box sem objeto.
+    """
+
+    def __init__(
+        self,
+        model,
+        rules=(),
+        conf=0.25,
+        interval=1,
+        motion_threshold=None,
+        track_width=160,
+        min_correlation=0.5,
+    ):
+        """
+        Parâmetros:
+        - model: backend YOLO já carregado (ver yolo_backends.py).
+        - rules: regras (ObjectRule) a registar de início.
+        - conf: confiança mínima passada ao YOLO.
+        - interval: corre o YOLO no máximo a cada N frames (1 = todos os frames).
+        - motion_threshold: diferença média (0..255) entre miniaturas que força
+          uma nova inferência (None = só pelo intervalo).
+        - track_width: largura das miniaturas usadas no tracking/movimento.
+        - min_correlation: correlação mínima (-1..1) entre o recorte atual de uma
+          box seguida e o recorte da deteção; abaixo disso o YOLO volta a correr.
+        """
+        self.model = model
+        self.conf = conf
+        self.interval = interval
+        self.motion_threshold = motion_threshold
+        self.track_width = track_width
+        self.min_correlation = min_correlation
+
+        # Nº de inferências YOLO feitas e de frames processados (para medir a cadência)
+        self.runs = 0
+        self.frames = 0
+
+        # rules: dicionário { nome: ObjectRule }
+        self.rules = {}
+
+        # classes: união ordenada das classes COCO de todas as regras
+        self.classes = []
+
+        # Estado por omissão (detect_book/detect_can, benchmarks)
+        self.tracker = TrackerState()
+
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule):
+        """
+        Regista (ou substitui) uma regra e atualiza o filtro de classes do modelo.
+        """
+        self.rules[rule.name] = rule
+        self.classes = sorted({c for r in self.rules.values() for c in r.classes})
+
+        # As regras mudaram: o resultado em cache deixa de ser válido
+        # (as regras são registadas antes de haver outros TrackerState)
+        self.tracker.reset()
+
+    def detect(self, frame, scale=1.0, state=None):
+        """
+        Devolve as deteções do frame, aplicando todas as regras registadas.
+
+        Corre o YOLO (uma vez) ou, com cadência adaptativa, propaga as boxes da
+        última execução até ao frame atual.
+
+        Parâmetros:
+        - frame: imagem BGR onde corre o modelo
+        - scale: escala do frame recebido em relação ao canvas (ex.: 0.5 se o frame
+          foi reduzido para metade). As boxes são devolvidas no espaço do canvas e
+          os filtros de tamanho (min_w/min_h) são aplicados nesse espaço.
+        - state: TrackerState da câmara (None = self.tracker)
+
+        Retorno:
+        - dict { nome_da_regra: lista de Detection } (lista vazia se nada passou os filtros)
+        """
+        if state is None:
+            state = self.tracker
+
+        # Mesmo frame que a última chamada: reutiliza o resultado
+        if frame is state.last_frame:
+            return state.last_result
+
+        self.frames += 1
+
+        if self.interval <= 1:
+            detections = self._infer(frame, scale)
+            # Sem tracking: se a cadência passar a adaptativa, começa por correr o YOLO
+            state.prev_small = None
+        else:
+            detections = self._detect_adaptive(frame, scale, state)
+
+        state.last_frame = frame
+        state.last_result = detections
+        return detections
+
+    def _detect_adaptive(self, frame, frame_scale, state):
+        """
+        Decide entre correr o YOLO ou propagar as boxes anteriores por optical flow.
+        """
+        h, w = frame.shape[:2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(
+            gray,
+            (self.track_width, max(1, int(h * self.track_width / w))),
+            interpolation=cv2.INTER_AREA,
+        )
+
+        # Escala da miniatura em relação ao canvas (onde estão as boxes)
+        scale = self.track_width / w * frame_scale
+        prev = state.prev_small
+        state.prev_small = small
+        state.since_run += 1
+
+        run = prev is None or prev.shape != small.shape or state.since_run >= self.interval
+        if not run and self.motion_threshold is not None:
+            motion = cv2.absdiff(prev, small).mean()
+            run = motion >= self.motion_threshold
+
+        if not run:
+            # Entre execuções: desloca cada box pelo movimento dos seus pontos
+            # e confirma que o objeto continua lá
+            tracked = self._track_all(state, prev, small, gray, scale, frame_scale)
+            if tracked is not None:
+                return tracked
+
+        # YOLO neste frame (também quando o tracking se perdeu: a box antiga
+        # nunca é devolvida sem confirmação)
+        state.since_run = 0
+        detections = self._infer(frame, frame_scale)
+        state.patches = {
+            name: [self._patch(gray, d.xyxy, frame_scale) for d in dets]
+            for name, dets in detections.items()
+        }
+        return detections
 
+    def _track_all(self, state, prev, small, gray, scale, frame_scale):
+        """
+        Segue todas as boxes do último resultado até ao frame atual.
+
+        Devolve None se alguma se perder (optical flow falhou ou a aparência mudou).
+        """
+        tracked = {}
+        for name, dets in state.last_result.items():
+            tracked[name] = []
+            for det, patch in zip(dets, state.patches[name]):
+                det = self._track(det, prev, small, scale)
+                if det is None or self._correlation(gray, det.xyxy, frame_scale, patch) < self.min_correlation:
+                    return None
+                tracked[name].append(det)
+        return tracked
+
+    @staticmethod
+    def _patch(gray, xyxy, scale):
+        """
+        Recorte da box (espaço do canvas) na imagem cinzenta do frame, reduzido a PATCH_SIZE.
+        """
+        fh, fw = gray.shape
+        x1, y1, x2, y2 = (int(v * scale) for v in xyxy)
+        x1, y1 = min(max(x1, 0), fw - 1), min(max(y1, 0), fh - 1)
+        x2, y2 = min(max(x2, x1 + 1), fw), min(max(y2, y1 + 1), fh)
+        return cv2.resize(gray[y1:y2, x1:x2], (PATCH_SIZE, PATCH_SIZE), interpolation=cv2.INTER_AREA)
+
+    def _correlation(self, gray, xyxy, scale, patch):
+        """
+        Correlação normalizada (-1..1) entre o recorte atual da box e o recorte da deteção.
+        """
+        score = cv2.matchTemplate(self._patch(gray, xyxy, scale), patch, cv2.TM_CCOEFF_NORMED)[0, 0]
+        # Recortes uniformes (sem textura) não têm correlação definida
+        return float(score) if np.isfinite(score) else 0.0
+
+    def _track(self, det, prev, small, scale):
+        """
+        Desloca a box de uma deteção pela mediana do optical flow dos pontos no seu interior.
+
+        Devolve None se o tracking falhar (o YOLO volta a correr neste frame).
+        """
+        x1, y1, x2, y2 = det.xyxy
+        sh, sw = small.shape
+        bx1 = min(max(int(x1 * scale), 0), sw - 1)
+        by1 = min(max(int(y1 * scale), 0), sh - 1)
+        bx2 = min(max(int(x2 * scale), bx1 + 1), sw)
+        by2 = min(max(int(y2 * scale), by1 + 1), sh)
+
+        # Pontos a seguir: cantos "bons" dentro da box (ou uma grelha, se não houver)
+        mask = np.zeros_like(prev)
+        mask[by1:by2, bx1:bx2] = 255
+        points = cv2.goodFeaturesToTrack(prev, 20, 0.01, 2, mask=mask)
+        if points is None:
+            gx, gy = np.meshgrid(np.linspace(bx1, bx2 - 1, 4), np.linspace(by1, by2 - 1, 4))
+            points = np.stack([gx.ravel(), gy.ravel()], axis=1).reshape(-1, 1, 2)
+        points = points.astype(np.float32)
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(prev, small, points, None, winSize=(9, 9), maxLevel=2)
+        ok = status.ravel() == 1
+        if ok.sum() < max(3, len(points) // 2):
+            return None
+
+        dx, dy = np.median((moved - points).reshape(-1, 2)[ok], axis=0) / scale
+        return det._replace(xyxy=(x1 + dx, y1 + dy, x2 + dx, y2 + dy))
+
+    def _infer(self, frame, scale=1.0):
+        """
+        Corre o YOLO no frame, converte as boxes para o espaço do canvas e aplica os filtros das regras.
+        """
+        self.runs += 1
+        detections = {name: [] for name in self.rules}
+
+        # Executa deteção apenas para as classes que alguma regra usa
+        xyxy, cls, conf = self.model.predict(frame, self.conf, self.classes)
+
+        # Frame reduzido -> espaço do canvas
+        if scale != 1.0:
+            xyxy = xyxy / scale
+
+        # Converte as boxes para listas Python de uma só vez
+        # (evita acessos elemento a elemento dentro do ciclo)
+        for (x1, y1, x2, y2), c, p in zip(xyxy.tolist(), cls.tolist(), conf.tolist()):
             # Largura e altura da box
             w = x2 - x1
             h = y2 - y1
-
-            # Filtro por formato: livros devem ser relativamente mais altos do que largos
-            if h / w < 1.1:
+            if w <= 0:
                 continue
 
-            # Filtro por tamanho mínimo (evita deteções muito pequenas/ruído)
-            if w < 60 or h < 90:
-                continue
+            for rule in self.rules.values():
+                # Ignora classes que não pertencem a esta regra
+                if c not in rule.classes:
+                    continue
 
-            # Encontrou um livro "válido"
-            return True
+                # Filtro por formato (razão altura/largura)
+                if h / w < rule.min_ratio:
+                    continue
 
-    # Não encontrou livro
-    return False
+                # Filtro por tamanho mínimo (evita deteções muito pequenas/ruído)
+                if w < rule.min_w or h < rule.min_h:
+                    continue
 
+                detections[rule.name].append(Detection(c, p, (x1, y1, x2, y2)))
 
-def detect_can(frame):
-    """
-    Deteta se existe uma "lata" no frame usando YOLO.
+        return detections
 
-    Estratégia:
-    - Corre o modelo YOLO no frame com conf=0.25.
-    - Percorre todas as bounding boxes detetadas.
-    - Filtra apenas as boxes cuja classe esteja em CAN_CLASSES.
-    - Aplica filtros geométricos para reduzir falsos positivos:
-      - Razão altura/largura: exige um objeto mais estreito e alto (h/w >= 1.3)
-      - Tamanho mínimo em pixels: w >= 30 e h >= 60
-    - Se encontrar uma box válida, devolve True.
 
-    Retorno:
-    - bool: True se detetar uma lata que passe os filtros, False caso contrário.
+# ============================
+# Detector partilhado
+# ============================
+# Regras usadas pela aplicação:
+# - livro: relativamente "alto" (h/w >= 1.1) e com pelo menos 60x90 px
+# - lata: mais estreita e alta (h/w >= 1.3) e com pelo menos 30x60 px
+# A cadência (YOLO_INTERVAL / YOLO_MOTION_THRESHOLD / YOLO_TRACK_MIN_CORRELATION) vem de config.py.
+detector = ObjectDetector(
+    model,
+    [
+        ObjectRule("book", BOOK_CLASS, 1.1, 60, 90),
+        ObjectRule("can", CAN_CLASSES, 1.3, 30, 60),
+    ],
+    interval=cfg.YOLO_INTERVAL,
+    motion_threshold=cfg.YOLO_MOTION_THRESHOLD,
+    min_correlation=cfg.YOLO_TRACK_MIN_CORRELATION,
+)
+
+
+def detect_book(frame):
     """
-    # Executa deteção no frame
-    results = model(frame, verbose=False, conf=0.25)
-
-    # Percorre resultados
-    for r in results:
-        # Percorre todas as bounding boxes detetadas
-        for box in r.boxes:
-            # Classe prevista
-            cls = int(box.cls[0])
-
-            # Ignora classes que não sejam as pretendidas
-            if cls not in CAN_CLASSES:
-                continue
+    Deteta se existe um "livro" no frame usando YOLO.
 
-            # Coordenadas da bounding box
-            x1, y1, x2, y2 = box.xyxy[0]
+    É apenas uma vista sobre detector.detect(frame): a inferência é partilhada
+    com detect_can quando ambos recebem o mesmo frame.
 
-            # Largura e altura da box
-            w = x2 - x1
-            h = y2 - y1
+    Retorno:
+    - bool: True se detetar um livro que passe os filtros, False caso contrário.
+    """
+    return bool(detector.detect(frame)["book"])
 
-            # Filtro por formato: latas tendem a ser mais altas e estreitas
-            if h / w < 1.3:
-                continue
 
-            # Filtro por tamanho mínimo
-            if w < 30 or h < 60:
-                continue
+def detect_can(frame):
+    """
+    Deteta se existe uma "lata" no frame usando YOLO.
 
-            # Encontrou uma lata "válida"
-            return True
+    É apenas uma vista sobre detector.detect(frame): a inferência é partilhada
+    com detect_book quando ambos recebem o mesmo frame.
 
-    # Não encontrou lata
-    return False
\ No newline at end of file
+    Retorno:
+    - bool: True se detetar uma lata que passe os filtros, False caso contrário.
+    """
+    return bool(detector.detect(frame)["can"])